@@ -116,9 +116,15 @@ async def refresh_user_display_names():
         raise HTTPException(status_code=500, detail="Channel exporter not initialized")
 
     metadata = export_repo.get_metadata_config()
+    slack_client = channel_exporter.slack_client
+    # users.list で名簿を取り直してから名簿で解決する (取り直せなかった場合だけ users.info で1人ずつ取得)
+    prefetched = await slack_client.prefetch_users(force=True)
+    display_names = await slack_client.resolve_user_display_names(
+        (user.user_id for user in metadata.users), refresh=not prefetched
+    )
     refreshed_users = []
     for user in metadata.users:
-        display_name = await channel_exporter.slack_client.get_user_display_name(user.user_id)
+        display_name = display_names.get(user.user_id)
         refreshed_users.append(
             UserMetadata(
                 user_id=user.user_id,
@@ -170,6 +170,15 @@ async def get_slack_auth_status():
     }
 
 
+@router.get("/slack-client-stats")
+async def get_slack_client_stats():
+    """Slack HTTPクライアントの接続プール統計を取得 (診断用)"""
+    if slack_client is None:
+        raise HTTPException(status_code=500, detail="Slack client not initialized")
+
+    return slack_client.get_pool_stats()
+
+
 @router.put("/slack-credentials", response_model=AppConfig)
 async def update_slack_credentials(request: SlackCredentialsRequest):
     """Slack認証情報を更新し、テスト後に反映"""
@@ -190,20 +199,26 @@ async def update_slack_credentials(request: SlackCredentialsRequest):
     config_repo.save(config)
 
     # SlackClientとサービスを再初期化
-    reinitialize_func(
+    await reinitialize_func(
         xoxc_token=request.xoxc_token,
         cookie=request.cookie,
         workspace=config.slack.workspace
     )
 
-    # 新しい認証情報でテスト
+    # 新しい認証情報でテスト (接続先・カセットはアプリのクライアントと同じ設定を使う)
     from services.slack_client import SlackClient
-    test_client = SlackClient(
-        xoxc_token=request.xoxc_token,
-        cookie=request.cookie,
-        workspace=config.slack.workspace
-    )
-    auth_ok = await test_client.test_auth()
+    if slack_client is not None:
+        test_client = slack_client.with_credentials(
+            request.xoxc_token, request.cookie, config.slack.workspace
+        )
+    else:
+        test_client = SlackClient(
+            xoxc_token=request.xoxc_token,
+            cookie=request.cookie,
+            workspace=config.slack.workspace
+        )
+    async with test_client:
+        auth_ok = await test_client.test_auth()
 
     # テスト結果をグローバルのslack_clientに反映
     if slack_client is not None:
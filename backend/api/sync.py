@@ -1,14 +1,16 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from typing import List, Optional
 
 from models.config import SyncConfig
+from models.sync_job import SyncJobStatus
 
 router = APIRouter(prefix="/api/sync", tags=["sync"])
 
 # 依存性注入用のグローバル変数
 thread_manager = None
 config_repo = None
+sync_job_runner = None
 
 
 def set_thread_manager(manager):
@@ -23,26 +25,92 @@ def set_config_repository(repo):
     config_repo = repo
 
 
-class SyncAllResponse(BaseModel):
-    """全スレッド同期レスポンス"""
-    total_threads: int
-    synced: int
-    failed: int
-    new_messages_total: int
-    errors: List[Dict[str, Any]]
+def set_sync_job_runner(runner):
+    """SyncJobRunnerを設定"""
+    global sync_job_runner
+    sync_job_runner = runner
 
 
-@router.post("/all", response_model=SyncAllResponse)
-async def sync_all_threads():
-    """全スレッドを同期"""
+@router.post("/all", response_model=SyncJobStatus)
+async def sync_all_threads(full: Optional[bool] = None):
+    """全スレッドの同期を開始（バックグラウンド、full=true で全件取得を強制）
+
+    実行中のジョブが要求を兼ねる場合は新しく開始せず、そのジョブを返す。
+    兼ねない場合 (定期同期の期限到来分のみの同期中など) は、その終了後に始まる
+    ジョブ (status="pending") を返す。
+    進捗は GET /api/sync/jobs/{job_id} で確認する。
+    """
+    if thread_manager is None:
+        raise HTTPException(status_code=500, detail="Thread manager not initialized")
+    if sync_job_runner is None:
+        raise HTTPException(status_code=500, detail="Sync job runner not initialized")
+
+    return sync_job_runner.start(thread_manager, full=full, trigger="manual")
+
+
+@router.get("/jobs", response_model=List[SyncJobStatus])
+async def list_sync_jobs():
+    """同期ジョブ一覧 (新しい順)"""
+    if sync_job_runner is None:
+        raise HTTPException(status_code=500, detail="Sync job runner not initialized")
+    return sync_job_runner.list_jobs()
+
+
+@router.get("/jobs/current", response_model=Optional[SyncJobStatus])
+async def get_current_sync_job():
+    """実行中の同期ジョブ (無ければ最後のジョブ、一度も実行していなければnull)"""
+    if sync_job_runner is None:
+        raise HTTPException(status_code=500, detail="Sync job runner not initialized")
+    return sync_job_runner.get_current_job()
+
+
+@router.get("/jobs/{job_id}", response_model=SyncJobStatus)
+async def get_sync_job(job_id: str):
+    """同期ジョブのステータスを取得"""
+    if sync_job_runner is None:
+        raise HTTPException(status_code=500, detail="Sync job runner not initialized")
+
+    job = sync_job_runner.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Sync job not found")
+    return job
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=SyncJobStatus)
+async def cancel_sync_job(job_id: str):
+    """同期ジョブを取り消す (同期中のスレッドが終わり次第止まる)"""
+    if sync_job_runner is None:
+        raise HTTPException(status_code=500, detail="Sync job runner not initialized")
+
+    job = sync_job_runner.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Sync job not found")
+    return job
+
+
+class ScheduleEntry(BaseModel):
+    """スレッドごとの同期スケジュール"""
+    thread_id: str
+    title: str
+    tier: str  # new | hot | active | dormant
+    activity: float
+    idle_streak: int
+    interval_minutes: Optional[float] = None
+    last_checked_at: Optional[str] = None
+    next_due_at: Optional[str] = None
+    due: bool
+
+
+@router.get("/schedule", response_model=List[ScheduleEntry])
+async def get_sync_schedule():
+    """スレッドごとの次回同期日時を取得 (近い順、アーカイブ済みは除外)"""
     if thread_manager is None:
         raise HTTPException(status_code=500, detail="Thread manager not initialized")
+    if thread_manager.scheduler is None:
+        raise HTTPException(status_code=404, detail="Sync scheduler not enabled")
 
-    try:
-        result = await thread_manager.sync_all_threads()
-        return SyncAllResponse(**result)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    threads = [t for t in thread_manager.thread_repo.get_all() if not t.is_archived]
+    return thread_manager.scheduler.get_schedule(threads)
 
 
 @router.get("/config", response_model=SyncConfig)
@@ -64,4 +132,11 @@ async def update_sync_config(sync_config: SyncConfig):
     app_config = config_repo.get_or_create_default()
     app_config.sync = sync_config
     config_repo.save(app_config)
+    if thread_manager is not None:
+        thread_manager.full_reconcile_hours = sync_config.full_reconcile_hours
+        thread_manager.sync_concurrency = sync_config.sync_concurrency
+        if thread_manager.scheduler is not None:
+            thread_manager.scheduler.base_interval_minutes = sync_config.sync_interval_minutes
+            thread_manager.scheduler.min_interval_minutes = sync_config.min_sync_interval_minutes
+            thread_manager.scheduler.max_interval_hours = sync_config.max_sync_interval_hours
     return app_config.sync
@@ -38,6 +38,8 @@ class SyncResponse(BaseModel):
     thread_id: str
     total_messages: int
     new_messages: int
+    mode: str = "full"  # "full" (全件同期) または "incremental" (差分同期)
+    modified: bool = True  # False の場合は前回から変化が無く書き込みを省略した
     synced_at: str
 
 
@@ -202,31 +204,22 @@ async def get_thread_user_mappings(thread_id: str):
         mentions = mention_pattern.findall(message.text)
         user_ids.update(mentions)
 
-    # 各ユーザーIDの表示名を取得
-    user_mappings = {}
+    # 各ユーザーIDの表示名を取得 (ユーザー名簿に無いものだけSlackに問い合わせる)
     slack_client = thread_manager.slack_client
-
-    for user_id in user_ids:
-        try:
-            display_name = await slack_client.get_user_display_name(user_id)
-            user_mappings[user_id] = display_name
-        except Exception as e:
-            logger.warning(f"Failed to get display name for {user_id}: {e}")
-            # エラー時はIDをそのまま使用
-            user_mappings[user_id] = user_id
+    user_mappings = await slack_client.resolve_user_display_names(sorted(user_ids))
 
     logger.info(f"Retrieved {len(user_mappings)} user mappings for thread {thread_id}")
     return user_mappings
 
 
 @router.post("/{thread_id}/sync", response_model=SyncResponse)
-async def sync_thread(thread_id: str):
-    """個別スレッドのメッセージを同期"""
+async def sync_thread(thread_id: str, full: Optional[bool] = None):
+    """個別スレッドのメッセージを同期 (full=true で全件取得を強制)"""
     if thread_manager is None:
         raise HTTPException(status_code=500, detail="Thread manager not initialized")
 
     try:
-        result = await thread_manager.sync_thread_messages(thread_id)
+        result = await thread_manager.sync_thread_messages(thread_id, full=full)
         return SyncResponse(**result)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
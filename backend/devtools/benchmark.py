@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+同期・エクスポートの性能計測
+
+データディレクトリのコピーに対して ThreadManager.sync_all_threads と
+ChannelExporter.download_channel を実行し、所要時間とSlack APIの
+リクエスト数を表示する。カセットを再生すればSlackに接続せずに
+毎回同じ条件で計測できる。
+
+使い方:
+    # 実際のワークスペースでの通信をカセットに記録
+    uv run python -m devtools.benchmark --mode record --cassette bench.jsonl.gz
+    # 記録した通信を最大速度で再生して計測
+    uv run python -m devtools.benchmark --mode replay --cassette bench.jsonl.gz --timing fast --no-rate-limit
+    # devtools.fake_slack に対して計測
+    uv run python -m devtools.benchmark --base-url http://127.0.0.1:8765/api
+"""
+import argparse
+import asyncio
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models.config import Settings
+from repositories.channel_export_repository import ChannelExportRepository
+from repositories.config_repository import ConfigRepository
+from repositories.storage import STORAGE_BACKENDS, create_repositories
+from repositories.user_directory_repository import UserDirectoryRepository
+from services.channel_exporter import ChannelExporter
+from services.rate_limiter import SlackRateLimiter
+from services.slack_cassette import CASSETTE_TIMINGS, CassetteConfig
+from services.slack_client import SlackClient
+from services.thread_manager import ThreadManager
+from utils.file_handler import FileHandler
+from utils.logger import setup_logger
+
+
+async def run_benchmark(
+    data_dir: Path,
+    storage_backend: str,
+    target: str,
+    cassette: Optional[CassetteConfig],
+    base_url: str,
+    rate_limit: bool,
+    full: Optional[bool],
+    sync_concurrency: Optional[int] = None,
+) -> Dict[str, Any]:
+    """data_dir (コピー済みであること) に対して同期・エクスポートを実行"""
+    storage = create_repositories(data_dir, storage_backend)
+    app_config = ConfigRepository(data_dir).get_or_create_default()
+    export_repo = ChannelExportRepository(data_dir)
+
+    slack_client = SlackClient(
+        xoxc_token=app_config.slack.xoxc_token,
+        cookie=app_config.slack.cookie,
+        workspace=app_config.slack.workspace,
+        rate_limiter=SlackRateLimiter(enabled=rate_limit),
+        user_directory=UserDirectoryRepository(data_dir),
+        base_url=base_url,
+        cassette=cassette,
+    )
+    results: Dict[str, Any] = {}
+
+    async with slack_client:
+        if target in ("sync", "all"):
+            thread_manager = ThreadManager(
+                thread_repo=storage.thread_repo,
+                message_repo=storage.message_repo,
+                slack_client=slack_client,
+                summary_repo=storage.summary_repo,
+                full_reconcile_hours=app_config.sync.full_reconcile_hours,
+                sync_concurrency=sync_concurrency or app_config.sync.sync_concurrency,
+            )
+            started = time.perf_counter()
+            sync_result = await thread_manager.sync_all_threads(full=full)
+            results["sync_all_threads"] = {
+                "seconds": round(time.perf_counter() - started, 3),
+                "threads": sync_result["total_threads"],
+                "failed": sync_result["failed"],
+                "modified": sync_result["modified"],
+                "new_messages": sync_result["new_messages_total"],
+            }
+
+        if target in ("export", "all"):
+            exporter = ChannelExporter(
+                slack_client=slack_client,
+                export_repo=export_repo,
+                data_dir=data_dir,
+            )
+            channels = [ch for ch in export_repo.get_config().channels if ch.enabled]
+            started = time.perf_counter()
+            for channel in channels:
+                await exporter.download_channel(channel.channel_id, channel.channel_name)
+            results["download_channel"] = {
+                "seconds": round(time.perf_counter() - started, 3),
+                "channels": len(channels),
+            }
+
+        FileHandler.flush_pending_writes()
+        stats = slack_client.get_pool_stats()
+        results["slack_api"] = {
+            "requests": stats["requests"],
+            "shared_requests": stats["shared_requests"],
+            "retries": stats["retries"],
+            "per_method": {
+                method: method_stats["requests"]
+                for method, method_stats in stats["rate_limits"].items()
+            },
+        }
+        transport = slack_client._client._transport
+        if hasattr(transport, "stats"):
+            results["cassette"] = dict(transport.stats)
+
+    storage.close()
+    return results
+
+
+def main() -> None:
+    settings = Settings()
+
+    parser = argparse.ArgumentParser(description="Benchmark thread sync and channel export")
+    parser.add_argument("--data-dir", default=settings.data_dir,
+                        help="計測元のデータディレクトリ (コピーして使うため変更されない)")
+    parser.add_argument("--storage-backend", default=settings.storage_backend, choices=STORAGE_BACKENDS)
+    parser.add_argument("--target", default="all", choices=("sync", "export", "all"))
+    parser.add_argument("--mode", default="live", choices=("live", "record", "replay"))
+    parser.add_argument("--cassette", help="カセットのパス (record / replay 時に必須)")
+    parser.add_argument("--timing", default="original", choices=CASSETTE_TIMINGS)
+    parser.add_argument("--base-url", default=settings.slack_api_base_url)
+    parser.add_argument("--no-rate-limit", action="store_true", help="クライアント側のレート制限を無効にする")
+    parser.add_argument("--full", action="store_true", help="全スレッドを全件同期する")
+    parser.add_argument("--sync-concurrency", type=int, help="同時に同期するスレッド数 (省略時は config.json の値)")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args()
+
+    setup_logger("slack_thread_manager", args.log_level)
+
+    cassette = None
+    if args.mode != "live":
+        if not args.cassette:
+            parser.error("--cassette is required for record / replay")
+        cassette = CassetteConfig(mode=args.mode, path=Path(args.cassette), timing=args.timing)
+
+    with tempfile.TemporaryDirectory(prefix="stm-bench-") as tmp:
+        data_dir = Path(tmp) / "data"
+        source = Path(args.data_dir)
+        if source.exists():
+            shutil.copytree(source, data_dir)
+        else:
+            data_dir.mkdir()
+
+        results = asyncio.run(run_benchmark(
+            data_dir=data_dir,
+            storage_backend=args.storage_backend,
+            target=args.target,
+            cassette=cassette,
+            base_url=args.base_url,
+            rate_limit=not args.no_rate_limit,
+            full=True if args.full else None,
+            sync_concurrency=args.sync_concurrency,
+        ))
+
+    for name, values in results.items():
+        print(f"{name}:")
+        for key, value in values.items():
+            print(f"  {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+ローカルで動くSlack APIの代替サーバー (負荷・性能テスト用)
+
+合成したワークスペース (チャンネル・スレッド・ユーザー) を返す。
+レイテンシと429を注入でき、本物のワークスペースに負荷をかけずに
+同期・エクスポートの処理量を測れる。
+
+使い方:
+    uv run python -m devtools.fake_slack --port 8765 --channels 5 --threads-per-channel 200
+    SLACK_API_BASE_URL=http://127.0.0.1:8765/api uv run uvicorn main:app
+"""
+import argparse
+import asyncio
+import random
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+# 1ページあたりの件数の上限 (Slackと同じ)
+MAX_PAGE_SIZE = 1000
+
+
+@dataclass
+class FakeSlackOptions:
+    """合成ワークスペースの規模と注入する遅延・エラー"""
+    channels: int = 3
+    threads_per_channel: int = 50
+    replies_per_thread: int = 20
+    messages_per_channel: int = 500  # スレッド親を含むトップレベルのメッセージ数
+    users: int = 50
+    days: int = 30  # メッセージを散らばらせる期間 (end_date から遡る日数)
+    end_date: str = ""  # 期間の終わり (YYYY-MM-DD、空の場合は今日の0時)
+    seed: int = 0
+    latency_ms: float = 0.0  # 1リクエストあたりの平均遅延
+    latency_jitter_ms: float = 0.0  # 遅延のばらつき (一様分布の幅)
+    rate_limit_ratio: float = 0.0  # 429を返す確率 (0〜1)
+    retry_after_seconds: int = 1  # 429の Retry-After
+
+
+class FakeSlackCorpus:
+    """乱数シードから決定的に生成するワークスペース"""
+
+    def __init__(self, options: FakeSlackOptions):
+        self.options = options
+        rng = random.Random(options.seed)
+
+        self.users: List[Dict[str, Any]] = [
+            {
+                "id": f"U{i:08d}",
+                "name": f"user{i}",
+                "real_name": f"User {i}",
+                "profile": {"display_name": f"user{i}", "real_name": f"User {i}"},
+            }
+            for i in range(options.users)
+        ]
+        self.users_by_id = {user["id"]: user for user in self.users}
+
+        self.channels: List[Dict[str, str]] = [
+            {"id": f"C{i:08d}", "name": f"channel-{i}"} for i in range(options.channels)
+        ]
+        # channel_id -> トップレベルのメッセージ (新しい順)
+        self.history: Dict[str, List[Dict[str, Any]]] = {}
+        # (channel_id, thread_ts) -> 親メッセージ + 返信 (古い順)
+        self.replies: Dict[tuple, List[Dict[str, Any]]] = {}
+
+        # 同じシード・end_date からは同じ ts のデータを生成する
+        if options.end_date:
+            end_dt = datetime.fromisoformat(options.end_date)
+        else:
+            end_dt = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        end = end_dt.timestamp()
+        start = (end_dt - timedelta(days=options.days)).timestamp()
+        for channel in self.channels:
+            self._generate_channel(rng, channel["id"], start, end)
+
+    def _make_message(self, rng: random.Random, ts: float, **extra: Any) -> Dict[str, Any]:
+        user = rng.choice(self.users)
+        text = f"message {ts:.6f} from <@{user['id']}>"
+        if rng.random() < 0.1:
+            text += f" cc <@{rng.choice(self.users)['id']}>"
+        message = {"type": "message", "ts": f"{ts:.6f}", "user": user["id"], "text": text}
+        if rng.random() < 0.2:
+            message["reactions"] = [{"name": "thumbsup", "count": rng.randint(1, 5), "users": []}]
+        message.update(extra)
+        return message
+
+    def _generate_channel(self, rng: random.Random, channel_id: str, start: float, end: float) -> None:
+        options = self.options
+        count = max(options.messages_per_channel, options.threads_per_channel)
+        timestamps = sorted(rng.uniform(start, end) for _ in range(count))
+        parents = set(rng.sample(range(count), options.threads_per_channel))
+
+        messages = []
+        for i, ts in enumerate(timestamps):
+            if i not in parents:
+                messages.append(self._make_message(rng, ts))
+                continue
+
+            thread_ts = f"{ts:.6f}"
+            reply_times = sorted(
+                rng.uniform(ts, min(end, ts + 3 * 86400)) for _ in range(options.replies_per_thread)
+            )
+            replies = [self._make_message(rng, t, thread_ts=thread_ts) for t in reply_times]
+            parent = self._make_message(
+                rng, ts,
+                thread_ts=thread_ts,
+                reply_count=len(replies),
+                latest_reply=replies[-1]["ts"] if replies else thread_ts,
+            )
+            messages.append(parent)
+            self.replies[(channel_id, thread_ts)] = [parent] + replies
+
+        self.history[channel_id] = list(reversed(messages))
+
+    def all_messages(self) -> List[Dict[str, Any]]:
+        """検索用に全メッセージを列挙"""
+        result = []
+        for channel_id, messages in self.history.items():
+            for message in messages:
+                result.append((channel_id, message))
+        for (channel_id, _), messages in self.replies.items():
+            for message in messages[1:]:
+                result.append((channel_id, message))
+        return result
+
+
+def _page(items: List[Any], params: Dict[str, str], default_limit: int) -> tuple:
+    """カーソル (先頭からのオフセット) で1ページ分を切り出す"""
+    limit = min(int(params.get("limit") or default_limit), MAX_PAGE_SIZE)
+    offset = int(params.get("cursor") or 0)
+    page = items[offset:offset + limit]
+    next_offset = offset + limit
+    has_more = next_offset < len(items)
+    return page, has_more, str(next_offset) if has_more else ""
+
+
+def create_fake_slack_app(options: Optional[FakeSlackOptions] = None) -> FastAPI:
+    """Slack Web APIの一部を模したASGIアプリを作成"""
+    options = options or FakeSlackOptions()
+    corpus = FakeSlackCorpus(options)
+    rng = random.Random(options.seed)
+    stats: Dict[str, int] = {}
+
+    app = FastAPI(title="Fake Slack API")
+    app.state.corpus = corpus
+    app.state.stats = stats
+
+    def ok(**body: Any) -> JSONResponse:
+        return JSONResponse({"ok": True, **body})
+
+    def error(code: str) -> JSONResponse:
+        return JSONResponse({"ok": False, "error": code})
+
+    @app.middleware("http")
+    async def inject_faults(request: Request, call_next):
+        method = request.url.path.rsplit("/", 1)[-1]
+        stats[method] = stats.get(method, 0) + 1
+
+        if options.latency_ms or options.latency_jitter_ms:
+            delay = options.latency_ms + rng.uniform(0, options.latency_jitter_ms)
+            await asyncio.sleep(max(delay, 0) / 1000)
+        if options.rate_limit_ratio and rng.random() < options.rate_limit_ratio:
+            stats["rate_limited"] = stats.get("rate_limited", 0) + 1
+            return JSONResponse(
+                {"ok": False, "error": "ratelimited"},
+                status_code=429,
+                headers={"Retry-After": str(options.retry_after_seconds)},
+            )
+        return await call_next(request)
+
+    @app.api_route("/api/auth.test", methods=["GET", "POST"])
+    async def auth_test():
+        return ok(url="https://fake.slack.com/", team="fake", user="user0",
+                  team_id="T00000000", user_id=corpus.users[0]["id"])
+
+    @app.api_route("/api/conversations.history", methods=["GET", "POST"])
+    async def conversations_history(request: Request):
+        params = dict(request.query_params)
+        messages = corpus.history.get(params.get("channel", ""))
+        if messages is None:
+            return error("channel_not_found")
+
+        oldest = float(params.get("oldest") or 0)
+        latest = float(params.get("latest") or "inf")
+        if params.get("inclusive") in ("true", "1"):
+            in_range = [m for m in messages if oldest <= float(m["ts"]) <= latest]
+        else:
+            in_range = [m for m in messages if oldest < float(m["ts"]) < latest]
+        page, has_more, next_cursor = _page(in_range, params, 100)
+        return ok(messages=page, has_more=has_more,
+                  response_metadata={"next_cursor": next_cursor})
+
+    @app.api_route("/api/conversations.replies", methods=["GET", "POST"])
+    async def conversations_replies(request: Request):
+        params = dict(request.query_params)
+        thread = corpus.replies.get((params.get("channel", ""), params.get("ts", "")))
+        if thread is None:
+            return error("thread_not_found")
+
+        # 親メッセージは oldest に関係なく毎ページの先頭に含める (Slackと同じ)
+        parent, replies = thread[0], thread[1:]
+        oldest = float(params.get("oldest") or 0)
+        replies = [m for m in replies if float(m["ts"]) > oldest]
+        page, has_more, next_cursor = _page(replies, params, 1000)
+        return ok(messages=[parent] + page, has_more=has_more,
+                  response_metadata={"next_cursor": next_cursor})
+
+    @app.api_route("/api/users.info", methods=["GET", "POST"])
+    async def users_info(request: Request):
+        user = corpus.users_by_id.get(request.query_params.get("user", ""))
+        if user is None:
+            return error("user_not_found")
+        return ok(user=user)
+
+    @app.api_route("/api/users.list", methods=["GET", "POST"])
+    async def users_list(request: Request):
+        page, _, next_cursor = _page(corpus.users, dict(request.query_params), 200)
+        return ok(members=page, response_metadata={"next_cursor": next_cursor})
+
+    @app.api_route("/api/search.messages", methods=["GET", "POST"])
+    async def search_messages(request: Request):
+        query = request.query_params.get("query", "")
+        count = int(request.query_params.get("count") or 20)
+        channel_ids = set(re.findall(r"<#(C[0-9A-Z]+)>", query))
+        terms = [
+            t for t in re.sub(r"in:<#C[0-9A-Z]+>|after:\S+|before:\S+", "", query).split() if t
+        ]
+
+        matches = []
+        for channel_id, message in corpus.all_messages():
+            if channel_ids and channel_id not in channel_ids:
+                continue
+            if all(term in message["text"] for term in terms):
+                matches.append({**message, "channel": {"id": channel_id}})
+        matches.sort(key=lambda m: float(m["ts"]), reverse=True)
+        return ok(messages={"matches": matches[:count], "total": len(matches)})
+
+    @app.get("/_stats")
+    async def get_stats():
+        """メソッドごとのリクエスト数 (429を返した回数を含む)"""
+        return stats
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fake Slack API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    defaults = FakeSlackOptions()
+    for name, value in vars(defaults).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    options = FakeSlackOptions(**{
+        name: getattr(args, name) for name in vars(defaults)
+    })
+    uvicorn.run(create_fake_slack_app(options), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,15 +9,16 @@ import sys
 sys.path.insert(0, str(Path(__file__).parent))
 
 from models.config import Settings
-from repositories.thread_repository import ThreadRepository
-from repositories.message_repository import MessageRepository
 from repositories.config_repository import ConfigRepository
-from repositories.summary_repository import SummaryRepository
-from repositories.view_repository import ViewRepository
-from repositories.tag_repository import TagRepository
 from repositories.channel_export_repository import ChannelExportRepository
+from repositories.storage import create_repositories
+from repositories.user_directory_repository import UserDirectoryRepository
+from repositories.sync_schedule_repository import SyncScheduleRepository
+from services.slack_cassette import CassetteConfig
 from services.slack_client import SlackClient
 from services.thread_manager import ThreadManager
+from services.sync_scheduler import SyncScheduler
+from services.sync_job_runner import SyncJobRunner
 from services.chatgpt_client import ChatGPTClient
 from services.summary_generator import SummaryGenerator
 
@@ -25,7 +26,9 @@ from services.channel_exporter import ChannelExporter
 from services.channel_rollup_builder import ChannelRollupBuilder
 from api import threads, sync, config as config_api, summaries, search, views, tags
 from api import channel_export as channel_export_api
+from tools import thread_tools
 from services.claude_agent import ClaudeAgentClient
+from utils.file_handler import FileHandler
 from utils.logger import setup_logger
 
 # 設定読み込み
@@ -42,13 +45,30 @@ logger = setup_logger("slack_thread_manager", settings.log_level)
 data_dir = Path(settings.data_dir)
 
 # リポジトリ初期化
-thread_repo = ThreadRepository(data_dir)
-message_repo = MessageRepository(data_dir)
+FileHandler.set_pretty_output(settings.pretty_json)
+storage = create_repositories(data_dir, settings.storage_backend)
+thread_repo = storage.thread_repo
+message_repo = storage.message_repo
+summary_repo = storage.summary_repo
+view_repo = storage.view_repo
+tag_repo = storage.tag_repo
 config_repo = ConfigRepository(data_dir)
-summary_repo = SummaryRepository(data_dir)
-view_repo = ViewRepository(data_dir)
-tag_repo = TagRepository(data_dir)
 export_repo = ChannelExportRepository(data_dir)
+user_directory = UserDirectoryRepository(
+    data_dir,
+    ttl_hours=settings.user_directory_ttl_hours,
+    retry_minutes=settings.user_directory_retry_minutes
+)
+
+# Slack APIの通信の記録・再生 (性能テスト用)
+slack_cassette = None
+if settings.slack_cassette_mode:
+    slack_cassette = CassetteConfig(
+        mode=settings.slack_cassette_mode,
+        path=Path(settings.slack_cassette_path) if settings.slack_cassette_path else data_dir / "cassettes" / "slack.jsonl.gz",
+        timing=settings.slack_cassette_timing,
+    )
+    logger.warning(f"Slack API cassette enabled: {slack_cassette.mode} {slack_cassette.path}")
 
 # 設定を取得または作成
 app_config = config_repo.get_or_create_default(
@@ -61,7 +81,12 @@ app_config = config_repo.get_or_create_default(
 slack_client = SlackClient(
     xoxc_token=app_config.slack.xoxc_token,
     cookie=app_config.slack.cookie,
-    workspace=app_config.slack.workspace
+    workspace=app_config.slack.workspace,
+    http2=settings.slack_http2,
+    replies_page_size=settings.slack_replies_page_size,
+    user_directory=user_directory,
+    base_url=settings.slack_api_base_url,
+    cassette=slack_cassette
 )
 
 # チャンネルエクスポートサービス初期化
@@ -77,30 +102,63 @@ channel_exporter = ChannelExporter(
 )
 logger.info("チャンネルエクスポートサービス初期化完了")
 
+# スレッドごとの同期スケジュール (Slack クライアントの再初期化後も引き継ぐ)
+sync_scheduler = SyncScheduler(
+    schedule_repo=SyncScheduleRepository(data_dir),
+    base_interval_minutes=app_config.sync.sync_interval_minutes,
+    min_interval_minutes=app_config.sync.min_sync_interval_minutes,
+    max_interval_hours=app_config.sync.max_sync_interval_hours
+)
+
+# 全スレッド同期ジョブ (手動・定期で共有し、同時に1つだけ実行する)
+sync_job_runner = SyncJobRunner()
+
 # スレッド管理サービス初期化（グローバル変数として管理）
 thread_manager = ThreadManager(
     thread_repo=thread_repo,
     message_repo=message_repo,
-    slack_client=slack_client
+    slack_client=slack_client,
+    summary_repo=summary_repo,
+    full_reconcile_hours=app_config.sync.full_reconcile_hours,
+    sync_concurrency=app_config.sync.sync_concurrency,
+    scheduler=sync_scheduler
 )
 
 
-def reinitialize_slack_client(xoxc_token: str, cookie: str, workspace: str):
+# 再初期化で置き換えたクライアントを閉じるタスク (完了まで参照を保持する)
+retired_client_tasks: set = set()
+
+
+async def close_when_idle(client: SlackClient, exporter: ChannelExporter, job_id: str = None):
+    """置き換えたクライアントを、それを使っている同期ジョブとダウンロードの終了後に閉じる"""
+    try:
+        if job_id is not None:
+            await sync_job_runner.wait(job_id)
+        await exporter.wait_idle()
+    finally:
+        await client.aclose()
+        logger.info("置き換えた Slack クライアントを閉じました")
+
+
+async def reinitialize_slack_client(xoxc_token: str, cookie: str, workspace: str):
     """Slack クライアントとそれに依存するサービスを再初期化"""
     global slack_client, thread_manager, channel_exporter, rollup_builder
 
-    # 新しいSlackクライアントを作成
-    slack_client = SlackClient(
-        xoxc_token=xoxc_token,
-        cookie=cookie,
-        workspace=workspace
-    )
+    old_client = slack_client
+    old_exporter = channel_exporter
+
+    # 新しいSlackクライアントを作成 (接続先・カセット・レート制限は引き継ぐ)
+    slack_client = old_client.with_credentials(xoxc_token, cookie, workspace)
 
     # ThreadManagerを再初期化
     thread_manager = ThreadManager(
         thread_repo=thread_repo,
         message_repo=message_repo,
-        slack_client=slack_client
+        slack_client=slack_client,
+        summary_repo=summary_repo,
+        full_reconcile_hours=thread_manager.full_reconcile_hours,
+        sync_concurrency=thread_manager.sync_concurrency,
+        scheduler=sync_scheduler
     )
 
     rollup_builder = ChannelRollupBuilder(
@@ -124,6 +182,13 @@ def reinitialize_slack_client(xoxc_token: str, cookie: str, workspace: str):
     channel_export_api.set_channel_exporter(channel_exporter)
     channel_export_api.set_rollup_builder(rollup_builder)
 
+    # 古いクライアントの接続プールは、実行中の同期ジョブ・ダウンロードが終わってから閉じる
+    running_job = sync_job_runner.get_current_job()
+    running_job_id = running_job.job_id if running_job and running_job.status == "running" else None
+    task = asyncio.create_task(close_when_idle(old_client, old_exporter, running_job_id))
+    retired_client_tasks.add(task)
+    task.add_done_callback(retired_client_tasks.discard)
+
     logger.info("Slack クライアントとサービスを再初期化しました")
 
 # ChatGPT クライアント初期化
@@ -171,6 +236,7 @@ threads.set_thread_manager(thread_manager)
 threads.set_claude_agent(claude_agent_client)
 sync.set_thread_manager(thread_manager)
 sync.set_config_repository(config_repo)
+sync.set_sync_job_runner(sync_job_runner)
 config_api.set_config_repository(config_repo)
 config_api.set_reinitialize_function(reinitialize_slack_client)
 config_api.set_slack_client(slack_client)
@@ -179,6 +245,7 @@ tags.set_tag_repository(tag_repo)
 channel_export_api.set_export_repository(export_repo)
 channel_export_api.set_channel_exporter(channel_exporter)
 channel_export_api.set_rollup_builder(rollup_builder)
+thread_tools.set_storage(storage)
 
 # 要約機能が有効な場合のみ登録
 if summary_generator:
@@ -238,13 +305,18 @@ async def scheduled_thread_sync_loop():
     while True:
         try:
             sync_config = config_repo.get_or_create_default().sync
+            adaptive = sync_config.adaptive_sync_enabled
             if sync_config.auto_sync_enabled and slack_client.auth_valid:
                 logger.info("Starting scheduled thread sync")
-                result = await thread_manager.sync_all_threads()
+                # 適応スケジューリングでは次回同期日時を過ぎたスレッドだけを同期する
+                # 手動の同期ジョブが実行中ならそれと共有する (兼ねない場合は後続として予約される)
+                job = sync_job_runner.start(thread_manager, due_only=adaptive, trigger="scheduled")
+                job = await sync_job_runner.wait(job.job_id)
                 logger.info(
-                    f"Scheduled thread sync completed: "
-                    f"{result['synced']} synced, {result['failed']} failed, "
-                    f"{result['new_messages_total']} new messages"
+                    f"Scheduled thread sync {job.status}: "
+                    f"{job.synced} synced, {job.failed} failed, "
+                    f"{job.deferred} not due, "
+                    f"{job.new_messages_total} new messages"
                 )
                 # last_sync_at を更新
                 from datetime import datetime
@@ -253,7 +325,11 @@ async def scheduled_thread_sync_loop():
                 config_repo.save(app_cfg)
             elif not slack_client.auth_valid:
                 logger.warning("Skipping scheduled thread sync: Slack auth invalid")
-            interval = sync_config.sync_interval_minutes * 60
+            if adaptive:
+                # 最短間隔ごとに期限の来たスレッドを確認する
+                interval = max(sync_config.min_sync_interval_minutes, 1) * 60
+            else:
+                interval = sync_config.sync_interval_minutes * 60
         except Exception as e:
             logger.error(f"Scheduled thread sync failed: {e}")
             interval = 1800  # エラー時は30分後にリトライ
@@ -265,6 +341,7 @@ async def startup_event():
     """起動時の処理"""
     logger.info("Starting Slack Thread Manager API")
     logger.info(f"Data directory: {data_dir}")
+    logger.info(f"Storage backend: {storage.backend}")
     logger.info(f"Loaded {len(thread_repo.get_all())} threads")
 
     # 定期エクスポートタスクを起動
@@ -278,6 +355,11 @@ async def startup_event():
 async def shutdown_event():
     """終了時の処理"""
     logger.info("Shutting down Slack Thread Manager API")
+    FileHandler.flush_pending_writes()
+    for task in list(retired_client_tasks):
+        task.cancel()
+    await slack_client.aclose()
+    storage.close()
 
 
 if __name__ == "__main__":
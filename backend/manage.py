@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+メンテナンス用コマンド
+
+使い方:
+    uv run python manage.py rebuild-thread-index
+    uv run python manage.py rebuild-summary-index
+    uv run python manage.py migrate-storage --from json --to sqlite
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).parent))
+
+from models.config import Settings
+from repositories.storage import STORAGE_BACKENDS, migrate_storage
+from repositories.summary_repository import SummaryRepository
+from repositories.thread_repository import ThreadRepository
+from utils.logger import setup_logger
+
+
+def rebuild_thread_index(data_dir: Path) -> None:
+    """threads/ から (channel_id, thread_ts) インデックスを再構築"""
+    thread_repo = ThreadRepository(data_dir)
+    count = thread_repo.rebuild_index()
+    print(f"Rebuilt thread index: {count} entries -> {thread_repo.index_path}")
+
+
+def rebuild_summary_index(data_dir: Path) -> None:
+    """summaries/ から要約インデックスを再構築"""
+    summary_repo = SummaryRepository(data_dir)
+    count = summary_repo.rebuild_index()
+    print(f"Rebuilt summary index: {count} entries -> {summary_repo.index_path}")
+
+
+def migrate(data_dir: Path, source: str, target: str) -> None:
+    """ストレージバックエンド間でデータを移行"""
+    counts = migrate_storage(data_dir, source, target)
+    print(f"Migrated {source} -> {target}:")
+    for name, count in counts.items():
+        print(f"  {name}: {count}")
+    print(f"Set STORAGE_BACKEND={target} to use the migrated data.")
+
+
+def main() -> None:
+    settings = Settings()
+    setup_logger("slack_thread_manager", settings.log_level)
+
+    parser = argparse.ArgumentParser(description="Slack Thread Manager maintenance commands")
+    parser.add_argument(
+        "--data-dir",
+        default=settings.data_dir,
+        help="データディレクトリ (デフォルト: DATA_DIR)",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser(
+        "rebuild-thread-index",
+        help="threads/ から thread_index.json を再生成する",
+    )
+
+    subparsers.add_parser(
+        "rebuild-summary-index",
+        help="summaries/ から summary_index.json を再生成する",
+    )
+
+    migrate_parser = subparsers.add_parser(
+        "migrate-storage",
+        help="ストレージバックエンド間でデータを移行する",
+    )
+    migrate_parser.add_argument("--from", dest="source", choices=STORAGE_BACKENDS, required=True)
+    migrate_parser.add_argument("--to", dest="target", choices=STORAGE_BACKENDS, required=True)
+
+    args = parser.parse_args()
+    data_dir = Path(args.data_dir)
+
+    if args.command == "rebuild-thread-index":
+        rebuild_thread_index(data_dir)
+    elif args.command == "rebuild-summary-index":
+        rebuild_summary_index(data_dir)
+    elif args.command == "migrate-storage":
+        migrate(data_dir, args.source, args.target)
+
+
+if __name__ == "__main__":
+    main()
@@ -57,7 +57,17 @@ class DownloadJobStatus(BaseModel):
     job_id: str
     started_at: str
     completed_at: Optional[str] = None
-    status: str = "pending"  # pending | running | completed | error
+    status: str = "pending"  # pending | running | completed | error | interrupted
     channels: List[ChannelDownloadState] = []
     current_channel: Optional[str] = None
     progress_percent: float = 0.0
+    # 詳細な進捗 (チャンク・ページ単位)
+    current_channel_name: Optional[str] = None
+    total_channels: int = 0
+    completed_channels: int = 0
+    chunks_completed: int = 0
+    total_chunks: int = 0
+    pages_fetched: int = 0
+    messages_fetched: int = 0
+    threads_fetched: int = 0
+    updated_at: Optional[str] = None
@@ -25,6 +25,11 @@ class SyncConfig(BaseModel):
     auto_sync_enabled: bool = True
     sync_interval_minutes: int = 30
     last_sync_at: Optional[str] = None
+    full_reconcile_hours: int = 24  # 全件取得で編集・削除・リアクションを反映する間隔 (0で常に全件)
+    sync_concurrency: int = 4  # 全スレッド同期で同時に処理するスレッド数
+    adaptive_sync_enabled: bool = True  # スレッドごとの活動度に応じて同期間隔を変える
+    min_sync_interval_minutes: int = 5  # 活発なスレッドの最短間隔 (定期同期の確認間隔も兼ねる)
+    max_sync_interval_hours: int = 24  # 休眠中のスレッドの最長間隔
 
 
 class LLMConfig(BaseModel):
@@ -56,6 +61,14 @@ class Settings(BaseSettings):
     slack_workspace: str = ""
     slack_xoxc_token: str = ""
     slack_cookie: str = ""
+    slack_http2: bool = True  # h2 パッケージがインストールされている場合のみ有効
+    slack_replies_page_size: int = 200  # conversations.replies の1ページあたりの件数
+    user_directory_ttl_hours: int = 24  # users.list でユーザー名簿を取り直す間隔
+    user_directory_retry_minutes: int = 60  # users.list が失敗した後に再試行するまでの間隔
+    slack_api_base_url: str = ""  # 空の場合は https://slack.com/api (devtools.fake_slack 用)
+    slack_cassette_mode: str = ""  # record | replay (空の場合は無効)
+    slack_cassette_path: str = ""  # 空の場合は {data_dir}/cassettes/slack.jsonl.gz
+    slack_cassette_timing: str = "original"  # original | fast (replay時の待ち時間)
 
     # ChatGPT
     openai_api_key: str = ""
@@ -67,6 +80,8 @@ class Settings(BaseSettings):
 
     # Application
     data_dir: str = "./data"
+    storage_backend: str = "json"  # json | sqlite
+    pretty_json: bool = False  # Trueで機械向けJSONも整形して保存 (デバッグ用)
     sync_interval_minutes: int = 30
     log_level: str = "INFO"
 
@@ -0,0 +1,31 @@
+from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, Field
+
+
+class SyncJobStatus(BaseModel):
+    """全スレッド同期ジョブのステータス"""
+    job_id: str
+    trigger: str = "manual"  # manual | scheduled
+    full: Optional[bool] = None
+    due_only: bool = False
+    status: str = "pending"  # pending | running | completed | cancelled | error
+    started_at: str
+    completed_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    cancel_requested: bool = False
+    # 進捗 (target_threads は返信を取得する対象のスレッド数)
+    target_threads: int = 0
+    done_threads: int = 0
+    progress_percent: float = 0.0
+    current_threads: List[str] = Field(default_factory=list)  # 同期中のスレッドID
+    # 結果 (sync_all_threads の戻り値と同じ項目)
+    total_threads: int = 0
+    synced: int = 0  # 返信を取得したスレッド数 (変化の有無を問わない)
+    modified: int = 0  # メッセージまたは統計を書き込んだスレッド数
+    failed: int = 0
+    skipped: int = 0
+    deferred: int = 0
+    cancelled: int = 0
+    new_messages_total: int = 0
+    errors: List[Dict[str, Any]] = Field(default_factory=list)
+    error_message: Optional[str] = None
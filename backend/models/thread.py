@@ -22,6 +22,8 @@ class Thread(BaseModel):
     last_message_ts: Optional[str] = None
     message_count: int = 0
     new_message_count: int = 0
+    last_full_sync_at: Optional[datetime] = None  # 最後に全件取得で同期した日時
+    message_digest: Optional[str] = None  # 全件同期で保存したメッセージ一覧のダイジェスト (差分同期で追記すると None)
     is_read: bool = True
     is_archived: bool = False
     has_daily_summary: bool = False
@@ -14,6 +14,12 @@ from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# 実行中ジョブの進捗をディスクに書き出す最短間隔（秒）
+JOB_FLUSH_INTERVAL_SECONDS = 5.0
+
+# 終了状態のジョブステータス
+TERMINAL_JOB_STATUSES = ("completed", "error", "interrupted")
+
 
 class ChannelExportRepository:
     """チャンネルエクスポート設定・状態のデータアクセス層"""
@@ -24,8 +30,12 @@ class ChannelExportRepository:
         self.config_path = self.export_dir / "config.json"
         self.metadata_path = self.export_dir / "metadata.json"
         self.state_path = self.export_dir / "state.json"
+        self.state_dir = self.export_dir / "state"
         self.job_path = self.export_dir / "job.json"
-        FileHandler.ensure_dir(self.export_dir)
+        # ジョブ進捗はメモリ上の値を正とし、job.json はクラッシュ復旧用
+        self._current_job: Optional[DownloadJobStatus] = None
+        FileHandler.ensure_dir(self.state_dir)
+        self._migrate_legacy_state()
 
     # --- Config ---
 
@@ -82,49 +92,99 @@ class ChannelExportRepository:
 
     # --- Download State ---
 
+    def _get_state_path(self, channel_id: str) -> Path:
+        """チャンネルのダウンロード状態ファイルのパスを取得"""
+        return self.state_dir / f"{channel_id}.json"
+
+    def _migrate_legacy_state(self) -> None:
+        """旧形式の state.json (全チャンネル分の配列) をチャンネルごとのファイルに分割する"""
+        if not self.state_path.exists():
+            return
+
+        data = FileHandler.read_json(self.state_path) or []
+        for item in data:
+            state = ChannelDownloadState(**item)
+            state_path = self._get_state_path(state.channel_id)
+            if not state_path.exists():
+                FileHandler.write_json(state_path, state.model_dump(), pretty=False)
+        FileHandler.delete_file(self.state_path)
+        logger.info(f"Split state.json into {len(data)} per-channel state files")
+
     def get_all_states(self) -> List[ChannelDownloadState]:
         """全チャンネルのダウンロード状態を取得"""
-        data = FileHandler.read_json(self.state_path)
-        if data is None:
-            return []
-        return [ChannelDownloadState(**s) for s in data]
+        states = []
+        for file_path in FileHandler.list_files(self.state_dir):
+            try:
+                data = FileHandler.read_json(file_path)
+            except (ValueError, IOError) as e:
+                logger.error(f"Failed to load download state from {file_path}: {e}")
+                continue
+            if data:
+                states.append(ChannelDownloadState(**data))
+        return states
 
     def get_state(self, channel_id: str) -> Optional[ChannelDownloadState]:
         """特定チャンネルのダウンロード状態を取得"""
-        states = self.get_all_states()
-        for state in states:
-            if state.channel_id == channel_id:
-                return state
-        return None
+        data = FileHandler.read_json(self._get_state_path(channel_id))
+        if data is None:
+            return None
+        return ChannelDownloadState(**data)
 
     def save_state(self, state: ChannelDownloadState) -> None:
         """チャンネルのダウンロード状態を保存（upsert）"""
-        states = self.get_all_states()
-        updated = False
-        for i, s in enumerate(states):
-            if s.channel_id == state.channel_id:
-                states[i] = state
-                updated = True
-                break
-        if not updated:
-            states.append(state)
-        FileHandler.write_json(self.state_path, [s.model_dump() for s in states])
+        FileHandler.write_json(
+            self._get_state_path(state.channel_id),
+            state.model_dump(),
+            coalesce=True,
+            pretty=False,
+        )
 
     def delete_state(self, channel_id: str) -> None:
         """チャンネルのダウンロード状態を削除"""
-        states = self.get_all_states()
-        states = [s for s in states if s.channel_id != channel_id]
-        FileHandler.write_json(self.state_path, [s.model_dump() for s in states])
+        FileHandler.delete_file(self._get_state_path(channel_id))
 
     # --- Job Status ---
 
     def get_current_job(self) -> Optional[DownloadJobStatus]:
-        """現在のジョブステータスを取得"""
+        """現在のジョブステータスを取得 (メモリ上の値、無ければ job.json)"""
+        if self._current_job is None:
+            self._current_job = self._load_persisted_job()
+        if self._current_job is None:
+            return None
+        return self._current_job.model_copy(deep=True)
+
+    def _load_persisted_job(self) -> Optional[DownloadJobStatus]:
+        """job.json から前回のジョブを読み込む
+
+        実行中のまま残っているジョブはプロセスが途中で終了したものとして
+        interrupted に変更する。
+        """
         data = FileHandler.read_json(self.job_path)
         if data is None:
             return None
-        return DownloadJobStatus(**data)
 
-    def save_job(self, job: DownloadJobStatus) -> None:
-        """ジョブステータスを保存"""
-        FileHandler.write_json(self.job_path, job.model_dump())
+        job = DownloadJobStatus(**data)
+        if job.status == "running":
+            job.status = "interrupted"
+            job.current_channel = None
+            FileHandler.write_json(self.job_path, job, pretty=False)
+            logger.warning(f"Download job {job.job_id} was interrupted")
+        return job
+
+    def save_job(self, job: DownloadJobStatus, force: bool = False) -> None:
+        """ジョブステータスを更新
+
+        メモリ上の値は即座に置き換え、ディスクへは JOB_FLUSH_INTERVAL_SECONDS
+        に1回まで書き出す。終了状態または force=True の場合は即座に書き込む。
+        """
+        self._current_job = job
+        if force or job.status in TERMINAL_JOB_STATUSES:
+            FileHandler.write_json(self.job_path, job, pretty=False)
+        else:
+            FileHandler.write_json(
+                self.job_path,
+                job,
+                coalesce=True,
+                pretty=False,
+                delay=JOB_FLUSH_INTERVAL_SECONDS,
+            )
@@ -1,42 +1,242 @@
+import hashlib
+import json
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterator, List, Optional
 from datetime import datetime
 
 from models.message import MessageList, Message
-from utils.file_handler import FileHandler
+from utils.file_handler import FileHandler, loads_json
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# ログ中の無効エントリ (上書き・削除済み) がこの件数を超え、かつ
+# 有効メッセージ数を上回ったらコンパクションする
+COMPACTION_MIN_DEAD_ENTRIES = 100
+
 
 class MessageRepository:
-    """メッセージデータのデータアクセス層"""
+    """メッセージデータのデータアクセス層
+
+    メッセージはスレッドごとの追記専用JSONLログ ({thread_id}_messages.jsonl) に
+    1行1メッセージで保存する。同じtsの行は後勝ちの上書き、"_deleted" 付きの行は
+    削除を表す。last_fetched_at などのヘッダ情報はサイドカー
+    ({thread_id}_messages.meta.json) に保持する。各行の ts -> ダイジェストは
+    ログと同じく追記専用の {thread_id}_messages.digests に記録し、差分の判定では
+    ログを読まずにこれと比較する。追記時に書き込むのは新しい行と件数だけ。
+    """
 
     def __init__(self, data_dir: Path):
+        self._init_state(data_dir)
+        FileHandler.ensure_dir(self.messages_dir)
+
+    def _init_state(self, data_dir: Path) -> None:
+        """保存先に依存しない状態を初期化 (SQLite版と共通)"""
         self.data_dir = data_dir
         self.messages_dir = data_dir / "messages"
-        FileHandler.ensure_dir(self.messages_dir)
 
     def _get_messages_path(self, thread_id: str) -> Path:
-        """メッセージファイルのパスを取得"""
+        """旧形式 (単一JSON) のメッセージファイルのパスを取得"""
         return self.messages_dir / f"{thread_id}_messages.json"
 
+    def _get_log_path(self, thread_id: str) -> Path:
+        """メッセージログ (JSONL) のパスを取得"""
+        return self.messages_dir / f"{thread_id}_messages.jsonl"
+
+    def _get_meta_path(self, thread_id: str) -> Path:
+        """メッセージログのヘッダ (サイドカー) のパスを取得"""
+        return self.messages_dir / f"{thread_id}_messages.meta.json"
+
+    def _get_digests_path(self, thread_id: str) -> Path:
+        """ダイジェストのログ (1行に "ts ダイジェスト"、削除は "ts -") のパスを取得"""
+        return self.messages_dir / f"{thread_id}_messages.digests"
+
+    def _read_meta(self, thread_id: str) -> Optional[dict]:
+        """ヘッダを読み込む (旧形式のファイルがあれば先に変換する)
+
+        旧形式の確認はスレッドごとに1回だけ行い、済んだことをヘッダに記録する。
+        """
+        meta = FileHandler.read_json(self._get_meta_path(thread_id))
+        if meta is not None and meta.get("legacy_checked"):
+            return meta
+
+        if self._migrate_legacy(thread_id):
+            return FileHandler.read_json(self._get_meta_path(thread_id))
+        if meta is not None:
+            meta["legacy_checked"] = True
+            self._write_meta(thread_id, meta)
+        return meta
+
+    def _write_meta(self, thread_id: str, meta: dict) -> None:
+        """ヘッダを保存"""
+        FileHandler.write_json(self._get_meta_path(thread_id), meta, pretty=False)
+
+    def _migrate_legacy(self, thread_id: str) -> bool:
+        """旧形式の {thread_id}_messages.json をJSONLログに変換する
+
+        Returns:
+            旧形式のファイルがあった場合 True
+        """
+        legacy_path = self._get_messages_path(thread_id)
+        if not legacy_path.exists():
+            return False
+
+        data = FileHandler.read_json(legacy_path)
+        if data is not None:
+            self._rewrite(MessageList(**data))
+        FileHandler.delete_file(legacy_path)
+        logger.info(f"Converted messages of thread {thread_id} to JSONL log")
+        return True
+
+    @staticmethod
+    def _digest(line: str) -> str:
+        """ログの1行 (メッセージのJSON) のダイジェスト"""
+        return hashlib.blake2b(line.encode("utf-8"), digest_size=8).hexdigest()
+
+    def _load_digests(self, thread_id: str, meta: dict) -> Dict[str, str]:
+        """有効なメッセージの ts -> ダイジェスト
+
+        ダイジェストのログが無い旧いデータは、ヘッダに残っている値かログから作って
+        書き出しておく。
+        """
+        digests_path = self._get_digests_path(thread_id)
+        if digests_path.exists():
+            digests: Dict[str, str] = {}
+            with open(digests_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    ts, _, digest = line.strip().partition(" ")
+                    if not digest:
+                        continue  # 末尾の書きかけ行
+                    if digest == "-":
+                        digests.pop(ts, None)
+                    else:
+                        digests[ts] = digest
+            return digests
+
+        digests = meta.pop("digests", None)
+        if digests is None:
+            digests = {
+                ts: self._digest(msg.model_dump_json())
+                for ts, msg in self._load_messages(thread_id).items()
+            }
+        self._write_digests(thread_id, digests)
+        return digests
+
+    def _write_digests(self, thread_id: str, digests: Dict[str, str]) -> None:
+        """ダイジェストのログを有効なメッセージの分だけで書き直す"""
+        with FileHandler.atomic_open(self._get_digests_path(thread_id)) as f:
+            for ts, digest in digests.items():
+                f.write(f"{ts} {digest}\n")
+
+    def _append_digests(self, thread_id: str, changes: Dict[str, Optional[str]]) -> None:
+        """ダイジェストのログに追記 (None は削除)"""
+        if not changes:
+            return
+        with open(self._get_digests_path(thread_id), "a", encoding="utf-8") as f:
+            f.write("".join(f"{ts} {digest or '-'}\n" for ts, digest in changes.items()))
+
+    def _read_log(self, thread_id: str) -> Iterator[dict]:
+        """ログの各行を順に読み込む (末尾の書きかけ行は無視する)"""
+        log_path = self._get_log_path(thread_id)
+        if not log_path.exists():
+            return
+
+        with open(log_path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield loads_json(line)
+                except json.JSONDecodeError as e:
+                    logger.warning(f"Skipping broken line {line_no} in {log_path}: {e}")
+
+    def _load_messages(self, thread_id: str) -> Dict[str, Message]:
+        """ログを畳み込んで ts -> Message の辞書を構築"""
+        messages: Dict[str, Message] = {}
+        for entry in self._read_log(thread_id):
+            if entry.get("_deleted"):
+                messages.pop(entry.get("ts"), None)
+            else:
+                messages[entry["ts"]] = Message(**entry)
+        return messages
+
+    def _append(self, thread_id: str, lines: List[str]) -> None:
+        """ログに行を追記"""
+        if not lines:
+            return
+        with open(self._get_log_path(thread_id), "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def _rewrite(self, message_list: MessageList) -> None:
+        """有効なメッセージだけでログを書き直す (コンパクション)"""
+        digests = {}
+        with FileHandler.atomic_open(self._get_log_path(message_list.thread_id)) as f:
+            for msg in message_list.messages:
+                line = msg.model_dump_json()
+                digests[msg.ts] = self._digest(line)
+                f.write(line + "\n")
+        self._write_digests(message_list.thread_id, digests)
+
+        self._write_meta(message_list.thread_id, {
+            "thread_id": message_list.thread_id,
+            "channel_id": message_list.channel_id,
+            "thread_ts": message_list.thread_ts,
+            "last_fetched_at": message_list.last_fetched_at,
+            "entries": len(message_list.messages),
+            "live": len(message_list.messages),
+            "legacy_checked": True,
+        })
+
+    def _maybe_compact(self, thread_id: str, meta: dict) -> None:
+        """無効エントリが溜まっていればコンパクションする"""
+        dead = meta.get("entries", 0) - meta.get("live", 0)
+        if dead > COMPACTION_MIN_DEAD_ENTRIES and dead > meta.get("live", 0):
+            self.compact(thread_id)
+
+    def iter_messages(self, thread_id: str) -> Iterator[Message]:
+        """スレッドのメッセージを順に返す
+
+        ログに無効エントリが無ければファイルから1行ずつストリームで返す。
+        """
+        meta = self._read_meta(thread_id)
+        if meta is None:
+            return
+
+        if meta.get("entries", 0) == meta.get("live", 0):
+            for entry in self._read_log(thread_id):
+                if not entry.get("_deleted"):
+                    yield Message(**entry)
+            return
+
+        yield from sorted(self._load_messages(thread_id).values(), key=lambda m: float(m.ts))
+
     def get_by_thread_id(self, thread_id: str) -> Optional[MessageList]:
         """スレッドIDでメッセージ一覧を取得"""
-        file_path = self._get_messages_path(thread_id)
-        data = FileHandler.read_json(file_path)
-
-        if data is None:
+        meta = self._read_meta(thread_id)
+        if meta is None:
             return None
 
-        return MessageList(**data)
+        return MessageList(
+            thread_id=thread_id,
+            channel_id=meta["channel_id"],
+            thread_ts=meta["thread_ts"],
+            messages=list(self.iter_messages(thread_id)),
+            last_fetched_at=meta.get("last_fetched_at"),
+        )
+
+    def save(self, message_list: MessageList, touch_fetched_at: bool = True) -> None:
+        """メッセージ一覧を保存 (ログ全体を書き直す)
 
-    def save(self, message_list: MessageList) -> None:
-        """メッセージ一覧を保存"""
-        file_path = self._get_messages_path(message_list.thread_id)
-        message_list.last_fetched_at = datetime.now()
+        Args:
+            message_list: 保存するメッセージ一覧
+            touch_fetched_at: Falseの場合はlast_fetched_atを更新しない (移行時など)
+        """
+        if touch_fetched_at:
+            message_list.last_fetched_at = datetime.now()
 
-        FileHandler.write_json(file_path, message_list.model_dump())
+        self._migrate_legacy(message_list.thread_id)
+        self._rewrite(message_list)
         logger.debug(f"Saved messages for thread: {message_list.thread_id}")
 
     def create_or_update(
@@ -46,7 +246,10 @@ class MessageRepository:
         thread_ts: str,
         messages: list[Message]
     ) -> MessageList:
-        """メッセージ一覧を作成または更新"""
+        """メッセージ一覧を作成または更新
+
+        既存ログとの差分 (新規・変更・削除されたメッセージ) だけを追記する。
+        """
         message_list = MessageList(
             thread_id=thread_id,
             channel_id=channel_id,
@@ -54,16 +257,123 @@ class MessageRepository:
             messages=messages
         )
 
-        self.save(message_list)
+        meta = self._read_meta(thread_id)
+        if meta is None:
+            self.save(message_list)
+            logger.info(f"Saved {len(messages)} messages for thread: {thread_id}")
+            return message_list
+
+        existing = self._load_digests(thread_id, meta)
+        live = set()
+        lines = []
+        changes: Dict[str, Optional[str]] = {}
+        for msg in messages:
+            line = msg.model_dump_json()
+            digest = self._digest(line)
+            live.add(msg.ts)
+            if existing.get(msg.ts) != digest:
+                lines.append(line)
+                changes[msg.ts] = digest
+        for ts in existing.keys() - live:
+            lines.append(json.dumps({"ts": ts, "_deleted": True}))
+            changes[ts] = None
+        self._append(thread_id, lines)
+        self._append_digests(thread_id, changes)
+
+        message_list.last_fetched_at = datetime.now()
+        meta.update({
+            "channel_id": channel_id,
+            "thread_ts": thread_ts,
+            "last_fetched_at": message_list.last_fetched_at,
+            "entries": meta.get("entries", 0) + len(lines),
+            "live": len(live),
+        })
+        self._write_meta(thread_id, meta)
+        self._maybe_compact(thread_id, meta)
+
         logger.info(
-            f"Saved {len(messages)} messages for thread: {thread_id}"
+            f"Saved {len(messages)} messages for thread: {thread_id} "
+            f"({len(lines)} log entries appended)"
         )
         return message_list
 
+    def append_messages(
+        self,
+        thread_id: str,
+        channel_id: str,
+        thread_ts: str,
+        messages: list[Message]
+    ) -> int:
+        """メッセージを追記 (同じtsは上書き)。既存メッセージは削除しない
+
+        Returns:
+            追記後の有効メッセージ数
+        """
+        meta = self._read_meta(thread_id)
+        if meta is None:
+            self.save(MessageList(
+                thread_id=thread_id,
+                channel_id=channel_id,
+                thread_ts=thread_ts,
+                messages=messages
+            ))
+            return len(messages)
+
+        digests = self._load_digests(thread_id, meta) if meta.get("live", 0) else {}
+        lines = []
+        changes: Dict[str, Optional[str]] = {}
+        for msg in messages:
+            line = msg.model_dump_json()
+            digest = self._digest(line)
+            if digests.get(msg.ts) != digest:
+                digests[msg.ts] = digest
+                lines.append(line)
+                changes[msg.ts] = digest
+        self._append(thread_id, lines)
+        self._append_digests(thread_id, changes)
+
+        live = len(digests)
+        meta.update({
+            "last_fetched_at": datetime.now(),
+            "entries": meta.get("entries", 0) + len(lines),
+            "live": live,
+        })
+        self._write_meta(thread_id, meta)
+        self._maybe_compact(thread_id, meta)
+
+        logger.debug(f"Appended {len(lines)} messages for thread: {thread_id}")
+        return live
+
+    def compact(self, thread_id: str) -> bool:
+        """ログから無効エントリを取り除く"""
+        meta = self._read_meta(thread_id)
+        if meta is None:
+            return False
+
+        message_list = MessageList(
+            thread_id=thread_id,
+            channel_id=meta["channel_id"],
+            thread_ts=meta["thread_ts"],
+            messages=sorted(self._load_messages(thread_id).values(), key=lambda m: float(m.ts)),
+            last_fetched_at=meta.get("last_fetched_at"),
+        )
+        self._rewrite(message_list)
+        logger.info(
+            f"Compacted message log for thread {thread_id}: "
+            f"{meta.get('entries', 0)} -> {len(message_list.messages)} entries"
+        )
+        return True
+
     def delete(self, thread_id: str) -> bool:
         """メッセージ一覧を削除"""
-        file_path = self._get_messages_path(thread_id)
-        success = FileHandler.delete_file(file_path)
+        success = False
+        for file_path in (
+            self._get_messages_path(thread_id),
+            self._get_log_path(thread_id),
+            self._get_meta_path(thread_id),
+            self._get_digests_path(thread_id),
+        ):
+            success = FileHandler.delete_file(file_path) or success
 
         if success:
             logger.info(f"Deleted messages for thread: {thread_id}")
@@ -75,12 +385,7 @@ class MessageRepository:
         since_ts: str
     ) -> int:
         """指定タイムスタンプ以降の新規メッセージ数を取得"""
-        message_list = self.get_by_thread_id(thread_id)
-        if message_list is None:
-            return 0
-
-        new_count = sum(
-            1 for msg in message_list.messages
+        return sum(
+            1 for msg in self.iter_messages(thread_id)
             if msg.ts > since_ts
         )
-        return new_count
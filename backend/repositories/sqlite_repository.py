@@ -0,0 +1,521 @@
+"""SQLiteストレージバックエンド
+
+JSONファイル版のリポジトリと同じインターフェースをSQLite (WALモード) 上に
+実装する。検索に使う列 (is_read, is_archived, updated_at, (channel_id, thread_ts),
+タグ) はインデックス付きの列として保持し、エンティティ本体はJSONで格納する。
+"""
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from models.message import Message, MessageList
+from models.summary import ThreadSummary
+from models.thread import Thread
+from models.view import ThreadView
+from repositories.message_repository import MessageRepository
+from repositories.summary_repository import SummaryRepository
+from repositories.tag_repository import TagRepository
+from repositories.thread_repository import ThreadRepository
+from repositories.view_repository import ViewRepository
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS threads (
+    id TEXT PRIMARY KEY,
+    channel_id TEXT NOT NULL,
+    thread_ts TEXT NOT NULL,
+    is_read INTEGER NOT NULL,
+    is_archived INTEGER NOT NULL,
+    updated_at TEXT NOT NULL,
+    data TEXT NOT NULL,
+    UNIQUE (channel_id, thread_ts)
+);
+CREATE INDEX IF NOT EXISTS idx_threads_is_read ON threads (is_read);
+CREATE INDEX IF NOT EXISTS idx_threads_is_archived ON threads (is_archived);
+CREATE INDEX IF NOT EXISTS idx_threads_updated_at ON threads (updated_at);
+
+CREATE TABLE IF NOT EXISTS thread_tags (
+    thread_id TEXT NOT NULL REFERENCES threads (id) ON DELETE CASCADE,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (thread_id, tag)
+);
+CREATE INDEX IF NOT EXISTS idx_thread_tags_tag ON thread_tags (tag);
+
+CREATE TABLE IF NOT EXISTS message_lists (
+    thread_id TEXT PRIMARY KEY,
+    channel_id TEXT NOT NULL,
+    thread_ts TEXT NOT NULL,
+    last_fetched_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS messages (
+    thread_id TEXT NOT NULL REFERENCES message_lists (thread_id) ON DELETE CASCADE,
+    ts TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (thread_id, ts)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS summaries (
+    thread_id TEXT PRIMARY KEY,
+    last_updated TEXT NOT NULL,
+    has_daily_summary INTEGER NOT NULL,
+    has_topic_summary INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS views (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS tag_definitions (
+    name TEXT PRIMARY KEY,
+    position INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class SQLiteDatabase:
+    """SQLite接続の管理 (WALモード・スキーマ作成)"""
+
+    DEFAULT_FILENAME = "slack_thread_manager.db"
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+        logger.info(f"Opened SQLite database: {db_path}")
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """トランザクション内で接続を使用する"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                yield self._conn
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def query(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        """SELECT文を実行して全行を返す"""
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def close(self) -> None:
+        """接続を閉じる"""
+        with self._lock:
+            self._conn.close()
+
+
+class SQLiteThreadRepository(ThreadRepository):
+    """スレッド情報のデータアクセス層 (SQLite版)"""
+
+    def __init__(self, db: SQLiteDatabase):
+        self._init_state(db.db_path.parent)
+        self.db = db
+
+    def _to_thread(self, row: sqlite3.Row) -> Thread:
+        """行をThreadに変換 (未書き込みの統計更新も反映)"""
+        return self._with_pending(Thread.model_validate_json(row["data"]))
+
+    def get_all(self) -> List[Thread]:
+        """全スレッドを取得"""
+        rows = self.db.query("SELECT data FROM threads ORDER BY id")
+        return [self._to_thread(row) for row in rows]
+
+    def get_by_id(self, thread_id: str) -> Optional[Thread]:
+        """IDでスレッドを取得"""
+        rows = self.db.query("SELECT data FROM threads WHERE id = ?", (thread_id,))
+        return self._to_thread(rows[0]) if rows else None
+
+    def get_by_channel_and_ts(self, channel_id: str, thread_ts: str) -> Optional[Thread]:
+        """チャンネルIDとスレッドタイムスタンプでスレッドを取得"""
+        rows = self.db.query(
+            "SELECT data FROM threads WHERE channel_id = ? AND thread_ts = ?",
+            (channel_id, thread_ts),
+        )
+        return self._to_thread(rows[0]) if rows else None
+
+    def find(
+        self,
+        tags: Optional[List[str]] = None,
+        is_read: Optional[bool] = None,
+        is_archived: Optional[bool] = None,
+        updated_from: Optional[datetime] = None,
+        updated_to: Optional[datetime] = None
+    ) -> List[Thread]:
+        """インデックス対象の項目でスレッドを絞り込む (tagsはいずれかに一致)"""
+        clauses = []
+        params: list = []
+
+        if tags:
+            placeholders = ",".join("?" for _ in tags)
+            clauses.append(
+                f"id IN (SELECT thread_id FROM thread_tags WHERE tag IN ({placeholders}))"
+            )
+            params.extend(tags)
+        # 統計更新の未書き込み分は既読状態を変えうるため、その間はPython側で絞り込む
+        filter_read_in_sql = not self._pending_stats
+        if is_read is not None and filter_read_in_sql:
+            clauses.append("is_read = ?")
+            params.append(int(is_read))
+        if is_archived is not None:
+            clauses.append("is_archived = ?")
+            params.append(int(is_archived))
+        if updated_from is not None:
+            clauses.append("updated_at >= ?")
+            params.append(updated_from.isoformat())
+        if updated_to is not None:
+            clauses.append("updated_at <= ?")
+            params.append(updated_to.isoformat())
+
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self.db.query(f"SELECT data FROM threads{where} ORDER BY id", tuple(params))
+        threads = [self._to_thread(row) for row in rows]
+        if is_read is not None and not filter_read_in_sql:
+            threads = [t for t in threads if t.is_read == is_read]
+        return threads
+
+    def save(self, thread: Thread, touch_updated_at: bool = True) -> None:
+        """スレッドを保存"""
+        if touch_updated_at:
+            thread.updated_at = datetime.now()
+
+        with self.db.transaction() as conn:
+            self._write_thread(conn, thread)
+        self._pending_stats.pop(thread.id, None)
+        logger.debug(f"Saved thread: {thread.id}")
+
+    def _save_many(self, threads: List[Thread], touch_updated_at: bool = True) -> None:
+        """複数スレッドを1トランザクションで保存"""
+        if not threads:
+            return
+        now = datetime.now()
+        with self.db.transaction() as conn:
+            for thread in threads:
+                if touch_updated_at:
+                    thread.updated_at = now
+                self._write_thread(conn, thread)
+
+    @staticmethod
+    def _write_thread(conn: sqlite3.Connection, thread: Thread) -> None:
+        """スレッド行とタグを書き込む"""
+        conn.execute(
+            """
+            INSERT INTO threads (id, channel_id, thread_ts, is_read, is_archived, updated_at, data)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (id) DO UPDATE SET
+                channel_id = excluded.channel_id,
+                thread_ts = excluded.thread_ts,
+                is_read = excluded.is_read,
+                is_archived = excluded.is_archived,
+                updated_at = excluded.updated_at,
+                data = excluded.data
+            """,
+            (
+                thread.id,
+                thread.channel_id,
+                thread.thread_ts,
+                int(thread.is_read),
+                int(thread.is_archived),
+                thread.updated_at.isoformat(),
+                thread.model_dump_json(),
+            ),
+        )
+        conn.execute("DELETE FROM thread_tags WHERE thread_id = ?", (thread.id,))
+        conn.executemany(
+            "INSERT OR IGNORE INTO thread_tags (thread_id, tag) VALUES (?, ?)",
+            [(thread.id, tag) for tag in thread.tags],
+        )
+
+    def delete(self, thread_id: str) -> bool:
+        """スレッドを削除"""
+        with self.db.transaction() as conn:
+            cursor = conn.execute("DELETE FROM threads WHERE id = ?", (thread_id,))
+
+        self._pending_stats.pop(thread_id, None)
+        success = cursor.rowcount > 0
+        if success:
+            logger.info(f"Deleted thread: {thread_id}")
+        return success
+
+    def rebuild_index(self) -> int:
+        """(channel_id, thread_ts) はテーブルのUNIQUE制約で管理されるため件数のみ返す"""
+        return self.db.query("SELECT COUNT(*) AS n FROM threads")[0]["n"]
+
+
+class SQLiteMessageRepository(MessageRepository):
+    """メッセージデータのデータアクセス層 (SQLite版)"""
+
+    def __init__(self, db: SQLiteDatabase):
+        self._init_state(db.db_path.parent)
+        self.db = db
+
+    def get_by_thread_id(self, thread_id: str) -> Optional[MessageList]:
+        """スレッドIDでメッセージ一覧を取得"""
+        header = self.db.query("SELECT * FROM message_lists WHERE thread_id = ?", (thread_id,))
+        if not header:
+            return None
+
+        rows = self.db.query(
+            "SELECT data FROM messages WHERE thread_id = ? ORDER BY ts",
+            (thread_id,),
+        )
+        return MessageList(
+            thread_id=thread_id,
+            channel_id=header[0]["channel_id"],
+            thread_ts=header[0]["thread_ts"],
+            messages=[Message.model_validate_json(row["data"]) for row in rows],
+            last_fetched_at=header[0]["last_fetched_at"],
+        )
+
+    def save(self, message_list: MessageList, touch_fetched_at: bool = True) -> None:
+        """メッセージ一覧を保存"""
+        if touch_fetched_at:
+            message_list.last_fetched_at = datetime.now()
+
+        last_fetched_at = message_list.last_fetched_at.isoformat() if message_list.last_fetched_at else None
+        with self.db.transaction() as conn:
+            conn.execute(
+                """
+                INSERT INTO message_lists (thread_id, channel_id, thread_ts, last_fetched_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (thread_id) DO UPDATE SET
+                    channel_id = excluded.channel_id,
+                    thread_ts = excluded.thread_ts,
+                    last_fetched_at = excluded.last_fetched_at
+                """,
+                (message_list.thread_id, message_list.channel_id, message_list.thread_ts, last_fetched_at),
+            )
+            conn.execute("DELETE FROM messages WHERE thread_id = ?", (message_list.thread_id,))
+            conn.executemany(
+                "INSERT OR REPLACE INTO messages (thread_id, ts, data) VALUES (?, ?, ?)",
+                [(message_list.thread_id, msg.ts, msg.model_dump_json()) for msg in message_list.messages],
+            )
+        logger.debug(f"Saved messages for thread: {message_list.thread_id}")
+
+    def create_or_update(
+        self,
+        thread_id: str,
+        channel_id: str,
+        thread_ts: str,
+        messages: list[Message]
+    ) -> MessageList:
+        """メッセージ一覧を作成または更新"""
+        message_list = MessageList(
+            thread_id=thread_id,
+            channel_id=channel_id,
+            thread_ts=thread_ts,
+            messages=messages
+        )
+        self.save(message_list)
+        logger.info(f"Saved {len(messages)} messages for thread: {thread_id}")
+        return message_list
+
+    def append_messages(
+        self,
+        thread_id: str,
+        channel_id: str,
+        thread_ts: str,
+        messages: list[Message]
+    ) -> int:
+        """メッセージを追記 (同じtsは上書き)。既存メッセージは削除しない"""
+        with self.db.transaction() as conn:
+            conn.execute(
+                """
+                INSERT INTO message_lists (thread_id, channel_id, thread_ts, last_fetched_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (thread_id) DO UPDATE SET last_fetched_at = excluded.last_fetched_at
+                """,
+                (thread_id, channel_id, thread_ts, datetime.now().isoformat()),
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO messages (thread_id, ts, data) VALUES (?, ?, ?)",
+                [(thread_id, msg.ts, msg.model_dump_json()) for msg in messages],
+            )
+            live = conn.execute(
+                "SELECT COUNT(*) FROM messages WHERE thread_id = ?", (thread_id,)
+            ).fetchone()[0]
+        logger.debug(f"Appended {len(messages)} messages for thread: {thread_id}")
+        return live
+
+    def iter_messages(self, thread_id: str) -> Iterator[Message]:
+        """スレッドのメッセージを順に返す"""
+        for row in self.db.query(
+            "SELECT data FROM messages WHERE thread_id = ? ORDER BY ts",
+            (thread_id,),
+        ):
+            yield Message.model_validate_json(row["data"])
+
+    def compact(self, thread_id: str) -> bool:
+        """SQLiteでは行単位で更新されるためコンパクションは不要"""
+        return bool(self.db.query("SELECT 1 FROM message_lists WHERE thread_id = ?", (thread_id,)))
+
+    def delete(self, thread_id: str) -> bool:
+        """メッセージ一覧を削除"""
+        with self.db.transaction() as conn:
+            cursor = conn.execute("DELETE FROM message_lists WHERE thread_id = ?", (thread_id,))
+
+        success = cursor.rowcount > 0
+        if success:
+            logger.info(f"Deleted messages for thread: {thread_id}")
+        return success
+
+    def get_new_messages_count(self, thread_id: str, since_ts: str) -> int:
+        """指定タイムスタンプ以降の新規メッセージ数を取得"""
+        rows = self.db.query(
+            "SELECT COUNT(*) AS n FROM messages WHERE thread_id = ? AND ts > ?",
+            (thread_id, since_ts),
+        )
+        return rows[0]["n"]
+
+
+class SQLiteSummaryRepository(SummaryRepository):
+    """要約データの永続化を管理 (SQLite版)"""
+
+    def __init__(self, db: SQLiteDatabase):
+        self._init_state(db.db_path.parent)
+        self.db = db
+
+    def save(self, summary: ThreadSummary) -> None:
+        """要約データを保存"""
+        with self.db.transaction() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO summaries
+                    (thread_id, last_updated, has_daily_summary, has_topic_summary, data)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (
+                    summary.thread_id,
+                    summary.last_updated.isoformat(),
+                    int(bool(summary.daily_summaries)),
+                    int(bool(summary.topic_summaries)),
+                    summary.model_dump_json(),
+                ),
+            )
+        logger.info(f"要約データ保存成功: {summary.thread_id}")
+
+    def get(self, thread_id: str) -> Optional[ThreadSummary]:
+        """要約データを取得"""
+        rows = self.db.query("SELECT data FROM summaries WHERE thread_id = ?", (thread_id,))
+        if not rows:
+            return None
+
+        try:
+            return ThreadSummary.model_validate_json(rows[0]["data"])
+        except Exception as e:
+            logger.error(f"要約データ取得エラー: {str(e)}")
+            return None
+
+    def get_index(self) -> Dict[str, dict]:
+        """全要約の概要を取得 (要約本体はデコードしない)"""
+        rows = self.db.query(
+            """
+            SELECT thread_id, last_updated, has_daily_summary, has_topic_summary,
+                   json_extract(data, '$.message_count_at_summary') AS message_count_at_summary
+            FROM summaries
+            """
+        )
+        return {
+            row["thread_id"]: {
+                "last_updated": row["last_updated"],
+                "message_count_at_summary": row["message_count_at_summary"],
+                "has_daily_summary": bool(row["has_daily_summary"]),
+                "has_topic_summary": bool(row["has_topic_summary"]),
+            }
+            for row in rows
+        }
+
+    def rebuild_index(self) -> int:
+        """要約の概要はテーブルの列で管理されるため件数のみ返す"""
+        return self.db.query("SELECT COUNT(*) AS n FROM summaries")[0]["n"]
+
+    def delete(self, thread_id: str) -> bool:
+        """要約データを削除"""
+        with self.db.transaction() as conn:
+            cursor = conn.execute("DELETE FROM summaries WHERE thread_id = ?", (thread_id,))
+
+        if cursor.rowcount > 0:
+            logger.info(f"要約データ削除成功: {thread_id}")
+            return True
+        return False
+
+    def exists(self, thread_id: str) -> bool:
+        """要約データが存在するか確認"""
+        return bool(self.db.query("SELECT 1 FROM summaries WHERE thread_id = ?", (thread_id,)))
+
+
+class SQLiteViewRepository(ViewRepository):
+    """ビューのリポジトリ (SQLite版)"""
+
+    def __init__(self, db: SQLiteDatabase):
+        self._init_state(db.db_path.parent)
+        self.db = db
+
+    def _save_views(self, views: List[ThreadView]):
+        """ビュー一覧を保存"""
+        with self.db.transaction() as conn:
+            conn.execute("DELETE FROM views")
+            conn.executemany(
+                "INSERT INTO views (id, position, data) VALUES (?, ?, ?)",
+                [(view.id, i, view.model_dump_json()) for i, view in enumerate(views)],
+            )
+
+    def _load_views(self) -> List[ThreadView]:
+        """ビュー一覧を読み込み"""
+        rows = self.db.query("SELECT data FROM views ORDER BY position")
+        return [ThreadView.model_validate_json(row["data"]) for row in rows]
+
+
+class SQLiteTagRepository(TagRepository):
+    """タグの永続化を管理するリポジトリ (SQLite版)"""
+
+    def __init__(self, db: SQLiteDatabase):
+        self._init_state(db.db_path.parent)
+        self.db = db
+        self._initialize_tags()
+
+    def _initialize_tags(self):
+        """初回のみデフォルトタグを登録"""
+        if self.db.query("SELECT 1 FROM meta WHERE key = 'tags_updated_at'"):
+            return
+        self._save_tags(list(self.DEFAULT_TAGS))
+
+    def _load_tags(self) -> List[str]:
+        """タグ一覧を読み込み"""
+        rows = self.db.query("SELECT name FROM tag_definitions ORDER BY position")
+        return [row["name"] for row in rows]
+
+    def _save_tags(self, tags: List[str]):
+        """タグ一覧を保存"""
+        with self.db.transaction() as conn:
+            conn.execute("DELETE FROM tag_definitions")
+            conn.executemany(
+                "INSERT OR IGNORE INTO tag_definitions (name, position) VALUES (?, ?)",
+                [(tag, i) for i, tag in enumerate(tags)],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('tags_updated_at', ?)",
+                (datetime.now().isoformat(),),
+            )
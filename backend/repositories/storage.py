@@ -0,0 +1,129 @@
+"""ストレージバックエンドの選択と移行"""
+from pathlib import Path
+from typing import Dict
+
+from repositories.message_repository import MessageRepository
+from repositories.summary_repository import SummaryRepository
+from repositories.tag_repository import TagRepository
+from repositories.thread_repository import ThreadRepository
+from repositories.view_repository import ViewRepository
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+STORAGE_BACKENDS = ("json", "sqlite")
+
+
+class StorageRepositories:
+    """1つのバックエンド上に構築されたリポジトリ一式"""
+
+    def __init__(
+        self,
+        backend: str,
+        thread_repo: ThreadRepository,
+        message_repo: MessageRepository,
+        summary_repo: SummaryRepository,
+        view_repo: ViewRepository,
+        tag_repo: TagRepository,
+        db=None,
+    ):
+        self.backend = backend
+        self.thread_repo = thread_repo
+        self.message_repo = message_repo
+        self.summary_repo = summary_repo
+        self.view_repo = view_repo
+        self.tag_repo = tag_repo
+        self.db = db
+
+    def close(self) -> None:
+        """バックエンドの接続を閉じる"""
+        if self.db is not None:
+            self.db.close()
+
+
+def create_repositories(data_dir: Path, backend: str = "json") -> StorageRepositories:
+    """指定バックエンドのリポジトリ一式を生成する
+
+    Args:
+        data_dir: データディレクトリ
+        backend: "json" (デフォルト、従来のファイル構成) または "sqlite"
+    """
+    if backend == "json":
+        return StorageRepositories(
+            backend=backend,
+            thread_repo=ThreadRepository(data_dir),
+            message_repo=MessageRepository(data_dir),
+            summary_repo=SummaryRepository(data_dir),
+            view_repo=ViewRepository(data_dir),
+            tag_repo=TagRepository(data_dir),
+        )
+
+    if backend == "sqlite":
+        from repositories.sqlite_repository import (
+            SQLiteDatabase,
+            SQLiteMessageRepository,
+            SQLiteSummaryRepository,
+            SQLiteTagRepository,
+            SQLiteThreadRepository,
+            SQLiteViewRepository,
+        )
+
+        db = SQLiteDatabase(data_dir / SQLiteDatabase.DEFAULT_FILENAME)
+        return StorageRepositories(
+            backend=backend,
+            thread_repo=SQLiteThreadRepository(db),
+            message_repo=SQLiteMessageRepository(db),
+            summary_repo=SQLiteSummaryRepository(db),
+            view_repo=SQLiteViewRepository(db),
+            tag_repo=SQLiteTagRepository(db),
+            db=db,
+        )
+
+    raise ValueError(f"Unknown storage backend: {backend} (expected one of {STORAGE_BACKENDS})")
+
+
+def migrate_storage(data_dir: Path, source: str, target: str) -> Dict[str, int]:
+    """source バックエンドの全データを target バックエンドへコピーする
+
+    既存データはIDをキーに上書きされる。タイムスタンプは移行元の値を保持する。
+
+    Returns:
+        エンティティ種別ごとの移行件数
+    """
+    if source == target:
+        raise ValueError("Source and target storage backends must differ")
+
+    src = create_repositories(data_dir, source)
+    dst = create_repositories(data_dir, target)
+    counts = {"threads": 0, "messages": 0, "summaries": 0, "views": 0, "tags": 0}
+
+    try:
+        # スレッドの索引はまとめて1回だけ書き込む
+        with dst.thread_repo.batch():
+            for thread in src.thread_repo.get_all():
+                dst.thread_repo.save(thread, touch_updated_at=False)
+                counts["threads"] += 1
+
+                message_list = src.message_repo.get_by_thread_id(thread.id)
+                if message_list is not None:
+                    dst.message_repo.save(message_list, touch_fetched_at=False)
+                    counts["messages"] += len(message_list.messages)
+
+                summary = src.summary_repo.get(thread.id)
+                if summary is not None:
+                    dst.summary_repo.save(summary)
+                    counts["summaries"] += 1
+
+        views = src.view_repo.get_all()
+        dst.view_repo.replace_all(views)
+        counts["views"] = len(views)
+
+        tags = src.tag_repo.get_all_tags()
+        dst.tag_repo.replace_all(tags)
+        counts["tags"] = len(tags)
+    finally:
+        src.close()
+        dst.close()
+
+    logger.info(f"Migrated storage {source} -> {target}: {counts}")
+    return counts
@@ -1,31 +1,152 @@
 """要約データのリポジトリ"""
-import json
+import os
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional
-from datetime import datetime
+from typing import Dict, Optional, Tuple
 from models.summary import ThreadSummary
+from utils.file_handler import FileHandler
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# LRUキャッシュに保持する要約の最大件数
+SUMMARY_CACHE_SIZE = 128
+
 
 class SummaryRepository:
-    """要約データの永続化を管理"""
+    """要約データの永続化を管理
+
+    読み込んだ要約は (thread_id, mtime) をキーにLRUキャッシュに保持する。
+    各要約の有無・更新日時・日次/トピック別要約の有無は summary_index.json に
+    まとめて保持し、一覧表示では要約ファイルを開かずに済むようにする。
+    """
+
+    INDEX_VERSION = 1
+
+    def __init__(self, data_dir: Path, cache_size: int = SUMMARY_CACHE_SIZE):
+        self._init_state(data_dir, cache_size)
+        self.summaries_dir.mkdir(parents=True, exist_ok=True)
+        self._load_index()
 
-    def __init__(self, data_dir: Path):
+    def _init_state(self, data_dir: Path, cache_size: int = SUMMARY_CACHE_SIZE) -> None:
+        """保存先に依存しない状態を初期化 (SQLite版と共通)"""
         self.data_dir = data_dir
         self.summaries_dir = data_dir / "summaries"
-        self.summaries_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = data_dir / "summary_index.json"
+
+        self.cache_size = cache_size
+        # thread_id -> (mtime_ns, ThreadSummary)
+        self._cache: "OrderedDict[str, Tuple[int, ThreadSummary]]" = OrderedDict()
+        # thread_id -> 要約の概要 (_make_index_entry を参照)
+        self._index: Dict[str, dict] = {}
+
+    def _get_summary_path(self, thread_id: str) -> Path:
+        """要約ファイルのパスを取得"""
+        return self.summaries_dir / f"{thread_id}_summary.json"
+
+    @staticmethod
+    def _make_index_entry(summary: ThreadSummary) -> dict:
+        """インデックスに保持する要約の概要を生成"""
+        return {
+            "last_updated": summary.last_updated.isoformat(),
+            "message_count_at_summary": summary.message_count_at_summary,
+            "has_daily_summary": bool(summary.daily_summaries),
+            "has_topic_summary": bool(summary.topic_summaries),
+        }
+
+    def _scan_thread_ids(self) -> set:
+        """summaries/ 配下の要約ファイルのスレッドID一覧 (statのみ、読み込みなし)"""
+        suffix = "_summary.json"
+        with os.scandir(self.summaries_dir) as entries:
+            return {
+                entry.name[:-len(suffix)]
+                for entry in entries
+                if entry.name.endswith(suffix) and entry.is_file()
+            }
+
+    def _load_index(self) -> None:
+        """インデックスを読み込み、ファイルの増減があれば差分だけ反映する"""
+        try:
+            data = FileHandler.read_json(self.index_path)
+        except (ValueError, IOError) as e:
+            logger.warning(f"要約インデックスの読み込みに失敗したため再構築します: {e}")
+            data = None
+
+        if not data or data.get("version") != self.INDEX_VERSION:
+            self.rebuild_index()
+            return
+
+        self._index = dict(data.get("summaries", {}))
+        thread_ids = self._scan_thread_ids()
+        changed = False
+
+        for thread_id in self._index.keys() - thread_ids:
+            del self._index[thread_id]
+            changed = True
+        for thread_id in thread_ids - self._index.keys():
+            summary = self._read_summary_file(thread_id)
+            if summary is not None:
+                self._index[thread_id] = self._make_index_entry(summary)
+                changed = True
+
+        if changed:
+            self._save_index()
+
+    def _save_index(self) -> None:
+        """インデックスを保存"""
+        FileHandler.write_json(self.index_path, {
+            "version": self.INDEX_VERSION,
+            "summaries": self._index,
+        }, pretty=False)
+
+    def rebuild_index(self) -> int:
+        """summaries/ の内容からインデックスを再構築する
+
+        Returns:
+            インデックスに登録した要約数
+        """
+        self._index = {}
+        for thread_id in sorted(self._scan_thread_ids()):
+            summary = self._read_summary_file(thread_id)
+            if summary is not None:
+                self._index[thread_id] = self._make_index_entry(summary)
+
+        self._save_index()
+        logger.info(f"要約インデックス再構築: {len(self._index)}件")
+        return len(self._index)
+
+    def _read_summary_file(self, thread_id: str) -> Optional[ThreadSummary]:
+        """要約ファイルを読み込む (失敗時はNone)"""
+        try:
+            data = FileHandler.read_json(self._get_summary_path(thread_id))
+            if data is None:
+                return None
+            return ThreadSummary(**data)
+        except Exception as e:
+            logger.error(f"要約データ取得エラー: {str(e)}")
+            return None
+
+    def _remember(self, thread_id: str, mtime_ns: int, summary: ThreadSummary) -> None:
+        """LRUキャッシュに登録"""
+        self._cache[thread_id] = (mtime_ns, summary)
+        self._cache.move_to_end(thread_id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
 
     def save(self, summary: ThreadSummary) -> None:
         """要約データを保存"""
-        file_path = self.summaries_dir / f"{summary.thread_id}_summary.json"
+        file_path = self._get_summary_path(summary.thread_id)
 
         try:
-            data = summary.model_dump(mode='json')
+            FileHandler.write_json(file_path, summary)
 
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            self._remember(
+                summary.thread_id,
+                file_path.stat().st_mtime_ns,
+                summary.model_copy(deep=True),
+            )
+            self._index[summary.thread_id] = self._make_index_entry(summary)
+            self._save_index()
 
             logger.info(f"要約データ保存成功: {summary.thread_id}")
 
@@ -35,30 +156,38 @@ class SummaryRepository:
 
     def get(self, thread_id: str) -> Optional[ThreadSummary]:
         """要約データを取得"""
-        file_path = self.summaries_dir / f"{thread_id}_summary.json"
+        file_path = self._get_summary_path(thread_id)
 
-        if not file_path.exists():
+        try:
+            mtime_ns = file_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._cache.pop(thread_id, None)
             return None
 
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+        cached = self._cache.get(thread_id)
+        if cached is not None and cached[0] == mtime_ns:
+            self._cache.move_to_end(thread_id)
+            return cached[1].model_copy(deep=True)
 
-            # datetimeフィールドをパース
-            if "last_updated" in data:
-                data["last_updated"] = datetime.fromisoformat(data["last_updated"])
+        summary = self._read_summary_file(thread_id)
+        if summary is None:
+            return None
 
-            summary = ThreadSummary(**data)
-            logger.info(f"要約データ取得成功: {thread_id}")
-            return summary
+        self._remember(thread_id, mtime_ns, summary)
+        logger.debug(f"要約データ取得成功: {thread_id}")
+        return summary.model_copy(deep=True)
 
-        except Exception as e:
-            logger.error(f"要約データ取得エラー: {str(e)}")
-            return None
+    def get_index(self) -> Dict[str, dict]:
+        """全要約の概要を取得 (thread_id -> last_updated, message_count_at_summary,
+        has_daily_summary, has_topic_summary)"""
+        return {thread_id: dict(entry) for thread_id, entry in self._index.items()}
 
     def delete(self, thread_id: str) -> bool:
         """要約データを削除"""
-        file_path = self.summaries_dir / f"{thread_id}_summary.json"
+        file_path = self._get_summary_path(thread_id)
+        self._cache.pop(thread_id, None)
+        if self._index.pop(thread_id, None) is not None:
+            self._save_index()
 
         if not file_path.exists():
             return False
@@ -73,6 +202,5 @@ class SummaryRepository:
             return False
 
     def exists(self, thread_id: str) -> bool:
-        """要約データが存在するか確認"""
-        file_path = self.summaries_dir / f"{thread_id}_summary.json"
-        return file_path.exists()
+        """要約データが存在するか確認 (インデックスを参照)"""
+        return thread_id in self._index
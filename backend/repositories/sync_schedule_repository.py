@@ -0,0 +1,77 @@
+"""スレッドごとの同期スケジュールのリポジトリ"""
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from utils.file_handler import FileHandler
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class SyncScheduleRepository:
+    """スレッドID -> 同期スケジュールの対応を data_dir/sync_schedule.json に保持する
+
+    値の中身 (活動度・次回同期日時など) は SyncScheduler が決める。
+    同期のたびに更新されるため、書き込みはまとめて行う。
+    """
+
+    VERSION = 1
+
+    def __init__(self, data_dir: Path):
+        self.data_dir = data_dir
+        self.schedule_path = data_dir / "sync_schedule.json"
+        FileHandler.ensure_dir(data_dir)
+
+        self._entries: Dict[str, dict] = {}
+        self._load()
+
+    def _load(self) -> None:
+        """スケジュールを読み込む (壊れている場合は空から作り直す)"""
+        try:
+            data = FileHandler.read_json(self.schedule_path)
+        except (ValueError, IOError) as e:
+            logger.warning(f"同期スケジュールの読み込みに失敗したため破棄します: {e}")
+            data = None
+
+        if not data or data.get("version") != self.VERSION:
+            return
+
+        self._entries = dict(data.get("threads", {}))
+        logger.info(f"同期スケジュール読み込み: {len(self._entries)}件")
+
+    def _save(self) -> None:
+        """スケジュールを保存 (書き込みはまとめて行う)"""
+        FileHandler.write_json(self.schedule_path, {
+            "version": self.VERSION,
+            "threads": self._entries,
+        }, coalesce=True, pretty=False)
+
+    def get(self, thread_id: str) -> Optional[dict]:
+        """スレッドのスケジュールを取得 (未登録はNone)"""
+        return self._entries.get(thread_id)
+
+    def put(self, thread_id: str, entry: dict) -> None:
+        """スレッドのスケジュールを保存"""
+        self._entries[thread_id] = entry
+        self._save()
+
+    def delete(self, thread_id: str) -> bool:
+        """スレッドのスケジュールを削除"""
+        if self._entries.pop(thread_id, None) is None:
+            return False
+        self._save()
+        return True
+
+    def prune(self, thread_ids: Iterable[str]) -> int:
+        """thread_ids に含まれないスレッド (削除済み) のスケジュールを削除
+
+        Returns:
+            削除した件数
+        """
+        keep = set(thread_ids)
+        removed = [thread_id for thread_id in self._entries if thread_id not in keep]
+        for thread_id in removed:
+            del self._entries[thread_id]
+        if removed:
+            self._save()
+        return len(removed)
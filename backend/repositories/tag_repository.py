@@ -1,19 +1,35 @@
 """タグリポジトリ"""
 from pathlib import Path
-import json
 from typing import List, Optional
 from datetime import datetime
 
+from utils.file_handler import FileHandler
+
 
 class TagRepository:
     """タグの永続化を管理するリポジトリ"""
 
+    DEFAULT_TAGS = (
+        "実運用",
+        "テスト",
+        "バグ",
+        "機能追加",
+        "質問",
+        "議論",
+        "決定事項",
+        "TODO",
+    )
+
     def __init__(self, data_dir: Path):
-        self.data_dir = data_dir
-        self.tags_file = data_dir / "tags.json"
+        self._init_state(data_dir)
         self._ensure_data_dir()
         self._initialize_tags()
 
+    def _init_state(self, data_dir: Path) -> None:
+        """保存先に依存しない状態を初期化 (SQLite版と共通)"""
+        self.data_dir = data_dir
+        self.tags_file = data_dir / "tags.json"
+
     def _ensure_data_dir(self):
         """データディレクトリが存在することを確認"""
         self.data_dir.mkdir(parents=True, exist_ok=True)
@@ -21,26 +37,15 @@ class TagRepository:
     def _initialize_tags(self):
         """タグファイルが存在しない場合は初期化"""
         if not self.tags_file.exists():
-            default_tags = [
-                "実運用",
-                "テスト",
-                "バグ",
-                "機能追加",
-                "質問",
-                "議論",
-                "決定事項",
-                "TODO",
-            ]
-            self._save_tags(default_tags)
+            self._save_tags(list(self.DEFAULT_TAGS))
 
     def _load_tags(self) -> List[str]:
         """タグ一覧をファイルから読み込み"""
         try:
-            with open(self.tags_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data.get('tags', [])
-        except (FileNotFoundError, json.JSONDecodeError):
+            data = FileHandler.read_json(self.tags_file)
+        except ValueError:
             return []
+        return data.get('tags', []) if data else []
 
     def _save_tags(self, tags: List[str]):
         """タグ一覧をファイルに保存"""
@@ -48,8 +53,7 @@ class TagRepository:
             'tags': tags,
             'updated_at': datetime.now().isoformat()
         }
-        with open(self.tags_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        FileHandler.write_json(self.tags_file, data)
 
     def get_all_tags(self) -> List[str]:
         """全てのタグを取得"""
@@ -107,6 +111,10 @@ class TagRepository:
         self._save_tags(tags)
         return True
 
+    def replace_all(self, tags: List[str]):
+        """タグ一覧を丸ごと置き換える (ストレージ移行用)"""
+        self._save_tags(list(tags))
+
     def tag_exists(self, tag: str) -> bool:
         """タグが存在するか確認"""
         return tag in self._load_tags()
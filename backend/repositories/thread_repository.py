@@ -1,6 +1,9 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
+import os
 import uuid
 
 from models.thread import Thread, ThreadCreate, ThreadUpdate
@@ -11,50 +14,373 @@ logger = get_logger(__name__)
 
 
 class ThreadRepository:
-    """スレッド情報のデータアクセス層"""
+    """スレッド情報のデータアクセス層
+
+    読み込んだThreadはメモリ上のインデックスに常駐させ、ファイルの
+    mtime/サイズが変わったものだけを再読み込みする。
+    (channel_id, thread_ts) -> thread_id の対応は thread_index.json に
+    永続化し、重複チェックを定数時間で行う。
+
+    batch() の中ではメッセージ統計の更新をメモリ上に溜め、変更のあった
+    スレッドだけをブロック終了時 (またはチェックポイント) にまとめて書き込む。
+    バッチはブロックを開始したタスク (とそこから作られたタスク) にだけ
+    効き、並行する他のリクエストの書き込みは遅延しない。
+    """
+
+    INDEX_VERSION = 1
+    # バッチ中に溜める統計更新の上限 (超えたら途中で書き出す)
+    BATCH_CHECKPOINT_SIZE = 50
 
     def __init__(self, data_dir: Path):
+        self._init_state(data_dir)
+        FileHandler.ensure_dir(self.threads_dir)
+
+        index_loaded = self._load_index()
+        self._refresh_cache()
+        if not index_loaded:
+            self.rebuild_index()
+
+    def _init_state(self, data_dir: Path) -> None:
+        """保存先に依存しない状態を初期化 (SQLite版と共通)"""
         self.data_dir = data_dir
         self.threads_dir = data_dir / "threads"
-        FileHandler.ensure_dir(self.threads_dir)
+        self.index_path = data_dir / "thread_index.json"
+
+        # 常駐インデックス (thread_id -> Thread)
+        self._cache: Dict[str, Thread] = {}
+        # 読み込み時点のファイルシグネチャ (thread_id -> (mtime_ns, size))
+        self._signatures: Dict[str, Tuple[int, int]] = {}
+        # 二次インデックス ("channel_id/thread_ts" -> thread_id)
+        self._key_index: Dict[str, str] = {}
+        self._init_batch()
 
     def _get_thread_path(self, thread_id: str) -> Path:
         """スレッドファイルのパスを取得"""
         return self.threads_dir / f"{thread_id}.json"
 
+    @staticmethod
+    def _make_key(channel_id: str, thread_ts: str) -> str:
+        """二次インデックスのキーを生成"""
+        return f"{channel_id}/{thread_ts}"
+
+    def _load_index(self) -> bool:
+        """永続化された二次インデックスを読み込む"""
+        try:
+            data = FileHandler.read_json(self.index_path)
+        except (ValueError, IOError) as e:
+            logger.warning(f"Thread index is unreadable, it will be rebuilt: {e}")
+            return False
+
+        if not data or data.get("version") != self.INDEX_VERSION:
+            return False
+
+        self._key_index = dict(data.get("keys", {}))
+        return True
+
+    def _save_index(self) -> None:
+        """二次インデックスを保存
+
+        batch() の中ではブロック終了時まで遅延する。それ以外でも短時間の
+        連続した登録・削除は1回の書き込みにまとめる。
+        """
+        if self._in_batch():
+            self._index_dirty = True
+            return
+
+        self._index_dirty = False
+        FileHandler.write_json(self.index_path, {
+            "version": self.INDEX_VERSION,
+            "keys": self._key_index,
+        }, coalesce=True, pretty=False)
+
+    def _index_thread(self, thread: Thread) -> bool:
+        """二次インデックスにスレッドを登録 (変更があった場合True)"""
+        key = self._make_key(thread.channel_id, thread.thread_ts)
+        if self._key_index.get(key) == thread.id:
+            return False
+        self._key_index[key] = thread.id
+        return True
+
+    def _unindex_thread(self, thread_id: str, thread: Optional[Thread] = None) -> bool:
+        """二次インデックスからスレッドを除去 (変更があった場合True)"""
+        if thread is not None:
+            key = self._make_key(thread.channel_id, thread.thread_ts)
+            if self._key_index.get(key) == thread_id:
+                del self._key_index[key]
+                return True
+            return False
+
+        keys = [key for key, value in self._key_index.items() if value == thread_id]
+        for key in keys:
+            del self._key_index[key]
+        return bool(keys)
+
+    def rebuild_index(self) -> int:
+        """threads/ の内容から二次インデックスを再構築する
+
+        Returns:
+            インデックスに登録したスレッド数
+        """
+        self._refresh_cache()
+        self._key_index = {}
+        for thread_id in sorted(self._cache):
+            thread = self._cache[thread_id]
+            key = self._make_key(thread.channel_id, thread.thread_ts)
+            if key in self._key_index:
+                logger.warning(
+                    f"Duplicate thread for {key}: {self._key_index[key]} and {thread_id}"
+                )
+                continue
+            self._key_index[key] = thread_id
+
+        self._save_index()
+        logger.info(f"Rebuilt thread index: {len(self._key_index)} entries")
+        return len(self._key_index)
+
     def _generate_thread_id(self) -> str:
         """新しいスレッドIDを生成"""
         return f"thread_{uuid.uuid4().hex[:8]}"
 
-    def get_all(self) -> List[Thread]:
-        """全スレッドを取得"""
+    def _init_batch(self) -> None:
+        """バッチ更新の状態を初期化"""
+        # batch() のネストの深さ (コンテキストごと)
+        self._batch_depth: ContextVar[int] = ContextVar(f"thread_batch_depth_{id(self)}", default=0)
+        self._checkpoint_size = self.BATCH_CHECKPOINT_SIZE
+        # 未書き込みの統計更新 (thread_id -> {フィールド: 値})
+        self._pending_stats: Dict[str, dict] = {}
+        # 二次インデックスの保存を batch() の終了まで遅延しているか
+        self._index_dirty = False
+
+    def _in_batch(self) -> bool:
+        """現在のコンテキストが batch() の中か"""
+        return self._batch_depth.get() > 0
+
+    @staticmethod
+    def _apply_stats(thread: Thread, stats: dict) -> Thread:
+        """メッセージ統計をスレッドに反映 (stats に含まれる項目だけ)"""
+        for field in ("message_count", "new_message_count", "last_message_ts", "message_digest"):
+            if field in stats:
+                setattr(thread, field, stats[field])
+        if stats.get("last_full_sync_at") is not None:
+            thread.last_full_sync_at = stats["last_full_sync_at"]
+        if stats.get("new_message_count", 0) > 0:
+            thread.is_read = False
+        return thread
+
+    def _with_pending(self, thread: Thread) -> Thread:
+        """未書き込みの統計更新があれば反映する (threadはコピーであること)"""
+        stats = self._pending_stats.get(thread.id)
+        return self._apply_stats(thread, stats) if stats else thread
+
+    @contextmanager
+    def batch(self, checkpoint_size: Optional[int] = None) -> Iterator["ThreadRepository"]:
+        """メッセージ統計の更新をまとめて書き込むブロック
+
+        ブロック内の update_message_stats は即座に保存せずに溜めておき、
+        ブロック終了時か checkpoint_size 件溜まった時点で変更のあった
+        スレッドだけを書き込む。二次インデックス (thread_index.json) は
+        ブロック終了時に1回だけ書き込む。ネストした場合は最も外側の終了時に書き込む。
+
+        遅延するのはブロック内 (そこから作られたタスクを含む) の更新だけで、
+        同時に処理されている他のリクエストの更新はこれまで通りすぐに書き込む。
+        """
+        depth = self._batch_depth.get()
+        if depth == 0 and checkpoint_size is not None:
+            self._checkpoint_size = checkpoint_size
+        token = self._batch_depth.set(depth + 1)
+        try:
+            yield self
+        finally:
+            self._batch_depth.reset(token)
+            if depth == 0:
+                self._checkpoint_size = self.BATCH_CHECKPOINT_SIZE
+                self.flush()
+
+    def flush(self) -> int:
+        """溜めている統計更新を書き込む
+
+        Returns:
+            書き込んだスレッド数
+        """
+        pending, self._pending_stats = self._pending_stats, {}
         threads = []
-        for file_path in FileHandler.list_files(self.threads_dir):
+        # 全件同期の日時だけが変わったスレッドは内容が同じため updated_at を更新しない
+        untouched = []
+        for thread_id, stats in pending.items():
+            thread = self.get_by_id(thread_id)
+            if thread is None:
+                continue
+            if stats.keys() == {"last_full_sync_at"}:
+                untouched.append(self._apply_stats(thread, stats))
+            else:
+                threads.append(self._apply_stats(thread, stats))
+
+        self._save_many(threads)
+        self._save_many(untouched, touch_updated_at=False)
+        threads.extend(untouched)
+        if threads:
+            logger.info(f"Flushed message stats for {len(threads)} threads")
+        if self._index_dirty and not self._in_batch():
+            self._save_index()
+        return len(threads)
+
+    def mark_full_synced(self, thread_id: str, synced_at: datetime) -> Optional[Thread]:
+        """全件同期の日時だけを記録 (メッセージに変化が無かった場合)
+
+        内容は変わっていないため updated_at は更新しない。batch() の中では
+        統計更新と同様にブロック終了時まで遅延する。
+        """
+        thread = self.get_by_id(thread_id)
+        if thread is None:
+            return None
+
+        thread.last_full_sync_at = synced_at
+        if not self._in_batch():
+            self.save(thread, touch_updated_at=False)
+            return thread
+
+        self._pending_stats.setdefault(thread_id, {})["last_full_sync_at"] = synced_at
+        if len(self._pending_stats) >= self._checkpoint_size:
+            self.flush()
+        return thread
+
+    def _save_many(self, threads: List[Thread], touch_updated_at: bool = True) -> None:
+        """複数スレッドを保存"""
+        for thread in threads:
+            self.save(thread, touch_updated_at=touch_updated_at)
+
+    @staticmethod
+    def _copy(thread: Thread) -> Thread:
+        """キャッシュを呼び出し側の変更から守るためのコピーを作成"""
+        return thread.model_copy(update={
+            "tags": list(thread.tags),
+            "summary": thread.summary.model_copy(),
+        })
+
+    @staticmethod
+    def _stat_signature(file_path: Path) -> Optional[Tuple[int, int]]:
+        """ファイルの (mtime_ns, size) を取得"""
+        try:
+            st = file_path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _scan_signatures(self) -> Dict[str, Tuple[int, int]]:
+        """threads/ 配下の全ファイルのシグネチャを取得 (statのみ、読み込みなし)"""
+        signatures: Dict[str, Tuple[int, int]] = {}
+        with os.scandir(self.threads_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".json") or not entry.is_file():
+                    continue
+                st = entry.stat()
+                signatures[entry.name[:-len(".json")]] = (st.st_mtime_ns, st.st_size)
+        return signatures
+
+    def _load_thread_file(self, thread_id: str) -> Optional[Thread]:
+        """スレッドファイルを読み込む"""
+        data = FileHandler.read_json(self._get_thread_path(thread_id))
+        if not data:
+            return None
+        return Thread(**data)
+
+    def _refresh_cache(self) -> None:
+        """シグネチャが変化したファイルだけを再読み込みしてキャッシュを最新化"""
+        current = self._scan_signatures()
+        index_changed = False
+
+        for thread_id in self._cache.keys() - current.keys():
+            index_changed |= self._unindex_thread(thread_id, self._cache.pop(thread_id))
+
+        for thread_id, signature in current.items():
+            if self._signatures.get(thread_id) == signature:
+                continue
             try:
-                data = FileHandler.read_json(file_path)
-                if data:
-                    threads.append(Thread(**data))
+                thread = self._load_thread_file(thread_id)
             except Exception as e:
-                logger.error(f"Failed to load thread from {file_path}: {e}")
+                logger.error(f"Failed to load thread from {self._get_thread_path(thread_id)}: {e}")
+                thread = None
+            if thread is None:
+                old = self._cache.pop(thread_id, None)
+                if old is not None:
+                    index_changed |= self._unindex_thread(thread_id, old)
+            else:
+                self._cache[thread_id] = thread
+                index_changed |= self._index_thread(thread)
 
-        return threads
+        self._signatures = current
+        if index_changed:
+            self._save_index()
+
+    def get_all(self) -> List[Thread]:
+        """全スレッドを取得"""
+        self._refresh_cache()
+        return [
+            self._with_pending(self._copy(self._cache[thread_id]))
+            for thread_id in sorted(self._cache)
+        ]
 
     def get_by_id(self, thread_id: str) -> Optional[Thread]:
         """IDでスレッドを取得"""
-        file_path = self._get_thread_path(thread_id)
-        data = FileHandler.read_json(file_path)
-
-        if data is None:
+        signature = self._stat_signature(self._get_thread_path(thread_id))
+        if signature is None:
+            self._cache.pop(thread_id, None)
+            self._signatures.pop(thread_id, None)
             return None
 
-        return Thread(**data)
+        if self._signatures.get(thread_id) != signature or thread_id not in self._cache:
+            thread = self._load_thread_file(thread_id)
+            if thread is None:
+                return None
+            self._cache[thread_id] = thread
+            self._signatures[thread_id] = signature
+
+        return self._with_pending(self._copy(self._cache[thread_id]))
+
+    def find(
+        self,
+        tags: Optional[List[str]] = None,
+        is_read: Optional[bool] = None,
+        is_archived: Optional[bool] = None,
+        updated_from: Optional[datetime] = None,
+        updated_to: Optional[datetime] = None
+    ) -> List[Thread]:
+        """インデックス対象の項目でスレッドを絞り込む (tagsはいずれかに一致)"""
+        self._refresh_cache()
+        matched = []
+        for thread_id in sorted(self._cache):
+            thread = self._cache[thread_id]
+            if thread_id in self._pending_stats:
+                thread = self._with_pending(self._copy(thread))
+            if tags and not any(tag in thread.tags for tag in tags):
+                continue
+            if is_read is not None and thread.is_read != is_read:
+                continue
+            if is_archived is not None and thread.is_archived != is_archived:
+                continue
+            if updated_from is not None and thread.updated_at < updated_from:
+                continue
+            if updated_to is not None and thread.updated_at > updated_to:
+                continue
+            matched.append(self._copy(thread))
+        return matched
 
     def get_by_channel_and_ts(self, channel_id: str, thread_ts: str) -> Optional[Thread]:
         """チャンネルIDとスレッドタイムスタンプでスレッドを取得"""
-        for thread in self.get_all():
-            if thread.channel_id == channel_id and thread.thread_ts == thread_ts:
-                return thread
-        return None
+        key = self._make_key(channel_id, thread_ts)
+        thread_id = self._key_index.get(key)
+        if thread_id is None:
+            return None
+
+        thread = self.get_by_id(thread_id)
+        if thread is None or thread.channel_id != channel_id or thread.thread_ts != thread_ts:
+            # インデックスが実ファイルとずれている場合はエントリを破棄する
+            logger.warning(f"Stale thread index entry: {key} -> {thread_id}")
+            del self._key_index[key]
+            self._save_index()
+            return None
+
+        return thread
 
     def create(self, thread_create: ThreadCreate) -> Thread:
         """新しいスレッドを作成"""
@@ -87,12 +413,26 @@ class ThreadRepository:
         logger.info(f"Created thread: {thread.id} - {thread.title}")
         return thread
 
-    def save(self, thread: Thread) -> None:
-        """スレッドを保存"""
+    def save(self, thread: Thread, touch_updated_at: bool = True) -> None:
+        """スレッドを保存
+
+        Args:
+            thread: 保存するスレッド
+            touch_updated_at: Falseの場合はupdated_atを更新しない (移行時など)
+        """
         file_path = self._get_thread_path(thread.id)
-        thread.updated_at = datetime.now()
+        if touch_updated_at:
+            thread.updated_at = datetime.now()
 
-        FileHandler.write_json(file_path, thread.model_dump())
+        FileHandler.write_json(file_path, thread)
+        # 保存内容には溜めていた統計も含まれている
+        self._pending_stats.pop(thread.id, None)
+        self._cache[thread.id] = self._copy(thread)
+        signature = self._stat_signature(file_path)
+        if signature is not None:
+            self._signatures[thread.id] = signature
+        if self._index_thread(thread):
+            self._save_index()
         logger.debug(f"Saved thread: {thread.id}")
 
     def update(self, thread_id: str, thread_update: ThreadUpdate) -> Optional[Thread]:
@@ -123,6 +463,11 @@ class ThreadRepository:
         """スレッドを削除"""
         file_path = self._get_thread_path(thread_id)
         success = FileHandler.delete_file(file_path)
+        self._pending_stats.pop(thread_id, None)
+        cached = self._cache.pop(thread_id, None)
+        self._signatures.pop(thread_id, None)
+        if self._unindex_thread(thread_id, cached):
+            self._save_index()
 
         if success:
             logger.info(f"Deleted thread: {thread_id}")
@@ -145,19 +490,44 @@ class ThreadRepository:
         thread_id: str,
         message_count: int,
         new_message_count: int,
-        last_message_ts: str
+        last_message_ts: str,
+        last_full_sync_at: Optional[datetime] = None,
+        message_digest: Optional[str] = None
     ) -> Optional[Thread]:
-        """メッセージ統計を更新"""
+        """メッセージ統計を更新
+
+        値が変わらない場合は書き込まない。batch() の中では書き込みを
+        ブロック終了時まで遅延する。last_full_sync_at と message_digest は
+        全件同期時のみ指定する (差分同期では message_digest を None に戻す)。
+        """
         thread = self.get_by_id(thread_id)
         if thread is None:
             return None
 
-        thread.message_count = message_count
-        thread.new_message_count = new_message_count
-        thread.last_message_ts = last_message_ts
+        stats = {
+            "message_count": message_count,
+            "new_message_count": new_message_count,
+            "last_message_ts": last_message_ts,
+            "message_digest": message_digest,
+        }
+        if last_full_sync_at is not None:
+            stats["last_full_sync_at"] = last_full_sync_at
+        if (
+            last_full_sync_at is None
+            and thread.message_count == message_count
+            and thread.new_message_count == new_message_count
+            and thread.last_message_ts == last_message_ts
+            and thread.message_digest == message_digest
+            and not (new_message_count > 0 and thread.is_read)
+        ):
+            return thread
 
-        if new_message_count > 0:
-            thread.is_read = False
+        self._apply_stats(thread, stats)
+        if not self._in_batch():
+            self.save(thread)
+            return thread
 
-        self.save(thread)
+        self._pending_stats.setdefault(thread_id, {}).update(stats)
+        if len(self._pending_stats) >= self._checkpoint_size:
+            self.flush()
         return thread
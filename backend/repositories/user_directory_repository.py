@@ -0,0 +1,132 @@
+"""Slackユーザー名簿のリポジトリ"""
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from utils.file_handler import FileHandler
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# users.list による一括取得をやり直すまでの時間
+DEFAULT_USER_DIRECTORY_TTL_HOURS = 24
+# users.list が失敗した後、次に一括取得を試みるまでの時間
+DEFAULT_USER_DIRECTORY_RETRY_MINUTES = 60
+
+
+class UserDirectoryRepository:
+    """ユーザーID -> 表示名の対応を data_dir/user_directory.json に保持する
+
+    users.list の一括取得結果を丸ごと置き換えるほか、users.info で個別に
+    解決したユーザーを追記する。一括取得から ttl_hours 経過すると
+    is_stale() が True になり、次の一括取得の対象になる。一括取得に
+    失敗した場合は retry_minutes 経過するまで再試行しない。
+    """
+
+    VERSION = 1
+
+    def __init__(
+        self,
+        data_dir: Path,
+        ttl_hours: int = DEFAULT_USER_DIRECTORY_TTL_HOURS,
+        retry_minutes: int = DEFAULT_USER_DIRECTORY_RETRY_MINUTES
+    ):
+        self.data_dir = data_dir
+        self.directory_path = data_dir / "user_directory.json"
+        self.ttl = timedelta(hours=ttl_hours)
+        self.retry_interval = timedelta(minutes=retry_minutes)
+        FileHandler.ensure_dir(data_dir)
+
+        # user_id -> {"display_name", "name", "real_name", "updated_at"}
+        self._users: Dict[str, dict] = {}
+        self.fetched_at: Optional[datetime] = None
+        # 最後に一括取得に失敗した日時 (成功すると None に戻る)
+        self.failed_at: Optional[datetime] = None
+        self._load()
+
+    def _load(self) -> None:
+        """名簿を読み込む (壊れている場合は空から作り直す)"""
+        try:
+            data = FileHandler.read_json(self.directory_path)
+        except (ValueError, IOError) as e:
+            logger.warning(f"ユーザー名簿の読み込みに失敗したため破棄します: {e}")
+            data = None
+
+        if not data or data.get("version") != self.VERSION:
+            return
+
+        self._users = dict(data.get("users", {}))
+        fetched_at = data.get("fetched_at")
+        self.fetched_at = datetime.fromisoformat(fetched_at) if fetched_at else None
+        failed_at = data.get("failed_at")
+        self.failed_at = datetime.fromisoformat(failed_at) if failed_at else None
+        logger.info(f"ユーザー名簿読み込み: {len(self._users)}件")
+
+    def _save(self, coalesce: bool = False) -> None:
+        """名簿を保存"""
+        FileHandler.write_json(self.directory_path, {
+            "version": self.VERSION,
+            "fetched_at": self.fetched_at,
+            "failed_at": self.failed_at,
+            "users": self._users,
+        }, coalesce=coalesce, pretty=False)
+
+    @staticmethod
+    def _make_entry(display_name: str, name: str = "", real_name: str = "") -> dict:
+        return {
+            "display_name": display_name,
+            "name": name,
+            "real_name": real_name,
+            "updated_at": datetime.now().isoformat(),
+        }
+
+    def get_display_name(self, user_id: str) -> Optional[str]:
+        """表示名を取得 (未登録はNone)"""
+        entry = self._users.get(user_id)
+        return entry["display_name"] if entry else None
+
+    def get_display_names(self, user_ids: Iterable[str]) -> Dict[str, str]:
+        """登録済みのユーザーだけ表示名を返す"""
+        return {
+            user_id: self._users[user_id]["display_name"]
+            for user_id in user_ids
+            if user_id in self._users
+        }
+
+    def put(self, user_id: str, display_name: str, name: str = "", real_name: str = "") -> None:
+        """個別に解決したユーザーを登録 (書き込みはまとめて行う)"""
+        self._users[user_id] = self._make_entry(display_name, name, real_name)
+        self._save(coalesce=True)
+
+    def replace_all(self, users: Dict[str, dict]) -> None:
+        """一括取得の結果で名簿を置き換える
+
+        Args:
+            users: user_id -> {"display_name", "name", "real_name"}
+        """
+        self._users = {
+            user_id: self._make_entry(
+                entry["display_name"], entry.get("name", ""), entry.get("real_name", "")
+            )
+            for user_id, entry in users.items()
+        }
+        self.fetched_at = datetime.now()
+        self.failed_at = None
+        self._save()
+        logger.info(f"ユーザー名簿更新: {len(self._users)}件")
+
+    def mark_failed(self) -> None:
+        """一括取得の失敗を記録する (retry_minutes の間は is_stale() が False になる)"""
+        self.failed_at = datetime.now()
+        self._save()
+
+    def is_stale(self) -> bool:
+        """一括取得が未実施、または ttl を過ぎているか (直近の失敗から retry_minutes の間は除く)"""
+        now = datetime.now()
+        if self.failed_at is not None and now - self.failed_at < self.retry_interval:
+            return False
+        return self.fetched_at is None or now - self.fetched_at >= self.ttl
+
+    def count(self) -> int:
+        """登録ユーザー数"""
+        return len(self._users)
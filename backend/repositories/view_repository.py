@@ -1,10 +1,10 @@
-import json
 import uuid
 from pathlib import Path
 from typing import List, Optional
 from datetime import datetime
 
 from models.view import ThreadView, ViewFilters, ViewSort
+from utils.file_handler import FileHandler
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -14,9 +14,13 @@ class ViewRepository:
     """ビューのリポジトリ"""
 
     def __init__(self, data_dir: str = "./data"):
+        self._init_state(data_dir)
+        self._ensure_data_dir()
+
+    def _init_state(self, data_dir) -> None:
+        """保存先に依存しない状態を初期化 (SQLite版と共通)"""
         self.data_dir = Path(data_dir)
         self.views_file = self.data_dir / "views.json"
-        self._ensure_data_dir()
 
     def _ensure_data_dir(self):
         """データディレクトリの存在を確認"""
@@ -29,18 +33,15 @@ class ViewRepository:
         data = {
             "views": [view.model_dump() for view in views]
         }
-        with open(self.views_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        FileHandler.write_json(self.views_file, data)
 
     def _load_views(self) -> List[ThreadView]:
         """ビュー一覧をファイルから読み込み"""
-        if not self.views_file.exists():
-            return []
-
         try:
-            with open(self.views_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                return [ThreadView(**view) for view in data.get("views", [])]
+            data = FileHandler.read_json(self.views_file)
+            if data is None:
+                return []
+            return [ThreadView(**view) for view in data.get("views", [])]
         except Exception as e:
             logger.error(f"Failed to load views: {e}")
             return []
@@ -49,6 +50,10 @@ class ViewRepository:
         """全ビューを取得"""
         return self._load_views()
 
+    def replace_all(self, views: List[ThreadView]):
+        """ビュー一覧を丸ごと置き換える (ストレージ移行用)"""
+        self._save_views(list(views))
+
     def get_by_id(self, view_id: str) -> Optional[ThreadView]:
         """IDでビューを取得"""
         views = self._load_views()
@@ -1,5 +1,6 @@
 import asyncio
 import uuid
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
@@ -8,10 +9,11 @@ from collections import defaultdict
 from models.channel_export import (
     ChannelDownloadState,
     DownloadJobStatus,
+    ExportChannel,
 )
 from models.message import Message, Reaction
 from repositories.channel_export_repository import ChannelExportRepository
-from services.slack_client import SlackClient
+from services.slack_client import SlackClient, retry_budget
 from services.channel_rollup_builder import ChannelRollupBuilder
 from utils.file_handler import FileHandler
 from utils.logger import get_logger
@@ -24,9 +26,6 @@ INITIAL_DOWNLOAD_DAYS = 365
 # 初回ダウンロードのチャンクサイズ（日数）
 CHUNK_DAYS = 30
 
-# レート制限: API呼び出し間隔（秒）
-RATE_LIMIT_INTERVAL = 1.2
-
 
 class ChannelExporter:
     """チャンネルデータのダウンロード・エクスポートサービス"""
@@ -48,6 +47,27 @@ class ChannelExporter:
         FileHandler.ensure_dir(self.export_base_dir)
         self.rollup_builder = rollup_builder or ChannelRollupBuilder(self.export_base_dir)
 
+        # 実行中のダウンロード数 (Slack クライアントを閉じてよいかの判定用)
+        self._active_downloads = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    @contextmanager
+    def _in_use(self):
+        """ダウンロード中であることを記録する"""
+        self._active_downloads += 1
+        self._idle.clear()
+        try:
+            yield
+        finally:
+            self._active_downloads -= 1
+            if self._active_downloads == 0:
+                self._idle.set()
+
+    async def wait_idle(self) -> None:
+        """実行中のダウンロードが全て終わるまで待つ"""
+        await self._idle.wait()
+
     def _get_channel_dir(self, channel_id: str, channel_name: str) -> Path:
         """チャンネルの出力ディレクトリを取得"""
         safe_name = channel_name.replace("/", "_").replace(" ", "_")
@@ -63,26 +83,56 @@ class ChannelExporter:
             started_at=datetime.now().isoformat(),
             status="running",
             channels=[],
+            total_channels=len(enabled_channels),
         )
-        self.export_repo.save_job(job)
+        self.export_repo.save_job(job, force=True)
 
-        for i, channel in enumerate(enabled_channels):
-            job.current_channel = channel.channel_id
-            job.progress_percent = (i / len(enabled_channels)) * 100 if enabled_channels else 0
+        try:
+            with self._in_use(), retry_budget():
+                await self._download_channels(job, enabled_channels)
+        except Exception as e:
+            job.status = "error"
+            job.completed_at = datetime.now().isoformat()
             self.export_repo.save_job(job)
-
-            state = await self.download_channel(channel.channel_id, channel.channel_name)
-            job.channels.append(state)
+            logger.error(f"Download job {job.job_id} failed: {e}")
+            raise
 
         job.status = "completed"
         job.completed_at = datetime.now().isoformat()
         job.current_channel = None
+        job.current_channel_name = None
+        job.completed_channels = len(enabled_channels)
         job.progress_percent = 100.0
+        job.updated_at = job.completed_at
         self.export_repo.save_job(job)
 
         logger.info(f"Download job {job.job_id} completed: {len(job.channels)} channels")
         return job
 
+    async def _download_channels(self, job: DownloadJobStatus, channels: List[ExportChannel]) -> None:
+        """チャンネルを順にダウンロードしてジョブに反映"""
+        for i, channel in enumerate(channels):
+            job.current_channel = channel.channel_id
+            job.current_channel_name = channel.channel_name
+            job.completed_channels = i
+            job.chunks_completed = 0
+            job.total_chunks = 0
+            self._report_progress(job)
+
+            state = await self.download_channel(channel.channel_id, channel.channel_name, job=job)
+            job.channels.append(state)
+
+    def _report_progress(self, job: Optional[DownloadJobStatus]) -> None:
+        """ジョブの進捗率を再計算して反映 (ディスクへの書き出しは間引かれる)"""
+        if job is None:
+            return
+
+        if job.total_channels:
+            chunk_fraction = job.chunks_completed / job.total_chunks if job.total_chunks else 0.0
+            job.progress_percent = (job.completed_channels + chunk_fraction) / job.total_channels * 100
+        job.updated_at = datetime.now().isoformat()
+        self.export_repo.save_job(job)
+
     def _build_chunks(self, state: ChannelDownloadState) -> List[tuple]:
         """ダウンロード対象の時間チャンクを構築する。
 
@@ -118,8 +168,25 @@ class ChannelExporter:
         self,
         channel_id: str,
         channel_name: str,
+        job: Optional[DownloadJobStatus] = None,
     ) -> ChannelDownloadState:
-        """単一チャンネルをダウンロード（月単位チャンクで段階的に実行）"""
+        """単一チャンネルをダウンロード（月単位チャンクで段階的に実行）
+
+        job を渡した場合はチャンク・ページ単位の進捗を反映する。
+        Slack APIのリトライ枠はジョブ内で共有する。
+        """
+        with self._in_use(), retry_budget():
+            # ユーザー名簿が古ければ先に一括取得しておく (期限内なら何もしない)
+            await self.slack_client.prefetch_users()
+            return await self._download_channel(channel_id, channel_name, job)
+
+    async def _download_channel(
+        self,
+        channel_id: str,
+        channel_name: str,
+        job: Optional[DownloadJobStatus],
+    ) -> ChannelDownloadState:
+        """download_channel の本体"""
         state = self.export_repo.get_state(channel_id) or ChannelDownloadState(
             channel_id=channel_id,
             channel_name=channel_name,
@@ -131,6 +198,9 @@ class ChannelExporter:
         channel_dir = self._get_channel_dir(channel_id, channel_name)
         chunks = self._build_chunks(state)
         is_incremental = state.initial_fetch_done
+        if job is not None:
+            job.total_chunks = len(chunks)
+            self._report_progress(job)
 
         total_messages_in_session = 0
         total_threads_in_session = 0
@@ -144,12 +214,15 @@ class ChannelExporter:
                 )
 
                 # メッセージ取得
-                chunk_messages = await self._fetch_all_messages(channel_id, oldest, latest)
+                chunk_messages = await self._fetch_all_messages(channel_id, oldest, latest, job=job)
                 if not chunk_messages:
                     # 初回チャンクの進捗を保存して次へ
                     if not is_incremental:
                         state.initial_fetch_oldest = datetime.fromtimestamp(float(oldest)).isoformat()
                         self.export_repo.save_state(state)
+                    if job is not None:
+                        job.chunks_completed = chunk_idx + 1
+                        self._report_progress(job)
                     continue
 
                 # スレッド返信を取得
@@ -168,7 +241,9 @@ class ChannelExporter:
                     replies = await self._fetch_thread_replies(channel_id, thread_ts)
                     if replies:
                         thread_messages[thread_ts] = replies
-                    await asyncio.sleep(RATE_LIMIT_INTERVAL)
+                        if job is not None:
+                            job.threads_fetched += 1
+                            self._report_progress(job)
 
                 # チャンクのファイル出力（追記/上書き）
                 await self._save_json(
@@ -195,6 +270,9 @@ class ChannelExporter:
                 state.total_threads_downloaded += len(thread_messages)
                 state.last_downloaded_at = datetime.now().isoformat()
                 self.export_repo.save_state(state)
+                if job is not None:
+                    job.chunks_completed = chunk_idx + 1
+                    self._report_progress(job)
 
                 logger.info(
                     f"[{channel_name}] chunk {chunk_idx + 1} done: "
@@ -276,6 +354,7 @@ class ChannelExporter:
         channel_id: str,
         oldest: str,
         latest: str,
+        job: Optional[DownloadJobStatus] = None,
     ) -> List[Dict[str, Any]]:
         """ページネーション付きで全メッセージを取得"""
         all_messages: List[Dict[str, Any]] = []
@@ -294,13 +373,16 @@ class ChannelExporter:
 
             all_messages.extend(messages)
             logger.info(f"Fetched batch: {len(messages)} messages (total: {len(all_messages)})")
+            if job is not None:
+                job.pages_fetched += 1
+                job.messages_fetched += len(messages)
+                self._report_progress(job)
 
             if not has_more:
                 break
 
             # 次のページ: 取得した中で最も古いメッセージのtsをlatestにする
             current_latest = messages[-1]["ts"]
-            await asyncio.sleep(RATE_LIMIT_INTERVAL)
 
         # 時系列順にソート（古い順）
         all_messages.sort(key=lambda m: float(m["ts"]))
@@ -330,6 +412,11 @@ class ChannelExporter:
         messages_dir = channel_dir / "messages"
         threads_dir = channel_dir / "threads"
 
+        # ユーザー表示名はまとめて解決しておく
+        user_names = await self.slack_client.resolve_user_display_names(
+            msg.get("user", "") for msg in messages
+        )
+
         # 日別にグループ化
         daily_messages: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
         for msg in messages:
@@ -339,7 +426,7 @@ class ChannelExporter:
 
             # ユーザー表示名を付与
             user_id = msg.get("user", "")
-            user_name = await self.slack_client.get_user_display_name(user_id) if user_id else ""
+            user_name = user_names.get(user_id, "") if user_id else ""
 
             msg_data = {
                 "ts": msg["ts"],
@@ -0,0 +1,138 @@
+"""Slack API のレート制限 (ティア別トークンバケット)"""
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# ティアごとの上限 (1分あたりのリクエスト数, バースト許容数)
+# https://api.slack.com/apis/rate-limits
+TIER_LIMITS = {
+    1: (1, 1),
+    2: (20, 3),
+    3: (50, 5),
+    4: (100, 10),
+}
+
+# メソッドごとのティア
+METHOD_TIERS = {
+    "auth.test": 4,
+    "conversations.history": 3,
+    "conversations.replies": 3,
+    "search.messages": 2,
+    "users.info": 4,
+    "users.list": 2,
+}
+
+# 未登録メソッドのティア
+DEFAULT_TIER = 3
+
+
+class TokenBucket:
+    """非同期トークンバケット
+
+    rate_per_minute のペースでトークンを補充し、最大 capacity 個まで貯める。
+    トークンが無い場合は補充されるまで待つ (待ちは到着順)。
+    clock / sleep は時刻の取得と待機の関数 (テストで差し替える)。
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: float,
+        capacity: int,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep
+    ):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> float:
+        """トークンを1つ取得する
+
+        Returns:
+            待機した秒数
+        """
+        async with self._lock:
+            waited = 0.0
+            self._refill()
+            # 待っている間に defer() された場合は残高が戻るまで待ち直す
+            while self._tokens < 1:
+                wait = (1 - self._tokens) / self.rate
+                await self._sleep(wait)
+                waited += wait
+                self._refill()
+
+            self._tokens -= 1
+            return waited
+
+    def defer(self, seconds: float) -> None:
+        """次の取得を seconds 秒後まで待たせる (429 の Retry-After 用)"""
+        self._refill()
+        self._tokens = min(self._tokens, 1.0 - seconds * self.rate)
+
+
+class SlackRateLimiter:
+    """Slack APIメソッドごとのレート制限
+
+    同じティアでもSlackの上限はメソッド単位で数えられるため、
+    メソッドごとに独立したバケットを持つ。
+    """
+
+    def __init__(self, method_tiers: Optional[Dict[str, int]] = None, enabled: bool = True):
+        self.enabled = enabled  # False の場合は待たない (カセット再生・ベンチマーク用)
+        self.method_tiers = dict(METHOD_TIERS)
+        if method_tiers:
+            self.method_tiers.update(method_tiers)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def _get_bucket(self, method: str) -> TokenBucket:
+        bucket = self._buckets.get(method)
+        if bucket is None:
+            tier = self.method_tiers.get(method, DEFAULT_TIER)
+            rate_per_minute, capacity = TIER_LIMITS[tier]
+            bucket = TokenBucket(rate_per_minute, capacity)
+            self._buckets[method] = bucket
+            self._stats[method] = {"requests": 0, "throttled": 0, "wait_seconds": 0.0}
+        return bucket
+
+    async def acquire(self, method: str) -> None:
+        """メソッドの呼び出し枠を確保する (必要なら待つ)"""
+        bucket = self._get_bucket(method)
+        waited = await bucket.acquire() if self.enabled else 0.0
+
+        stats = self._stats[method]
+        stats["requests"] += 1
+        if waited > 0:
+            stats["throttled"] += 1
+            stats["wait_seconds"] += waited
+            logger.debug(f"Rate limited {method}: waited {waited:.2f}s")
+
+    def defer(self, method: str, seconds: float) -> None:
+        """メソッドの呼び出しを seconds 秒後まで止める"""
+        if self.enabled:
+            self._get_bucket(method).defer(seconds)
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """メソッドごとの呼び出し数・待機回数・待機秒数を取得"""
+        return {
+            method: {
+                "tier": self.method_tiers.get(method, DEFAULT_TIER),
+                "requests": stats["requests"],
+                "throttled": stats["throttled"],
+                "wait_seconds": round(stats["wait_seconds"], 3),
+            }
+            for method, stats in self._stats.items()
+        }
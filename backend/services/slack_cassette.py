@@ -0,0 +1,219 @@
+"""Slack APIの通信の記録・再生 (性能の回帰テスト用)
+
+記録モードでは SlackClient のリクエストとレスポンスを gzip 圧縮した
+JSONL (カセット) に書き出す。トークン・Cookie・メールアドレスなどの
+秘密情報は書き出す前に取り除く。再生モードではカセットから同じ
+リクエストへのレスポンスを返し、Slackには接続しない。
+"""
+import asyncio
+import gzip
+import json
+import re
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Deque, Dict, Optional, Tuple
+
+import httpx
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+CASSETTE_MODES = ("record", "replay")
+# original: 記録時のレイテンシを再現する / fast: 待たずに返す
+CASSETTE_TIMINGS = ("original", "fast")
+
+# 値を記録しないキー (リクエストのパラメータ・レスポンスの両方)
+SCRUBBED_KEYS = {"token", "access_token", "email", "phone", "skype"}
+SCRUBBED_VALUE = "REDACTED"
+_TOKEN_PATTERN = re.compile(r"xox[a-z]-[A-Za-z0-9-]+")
+
+# 記録するレスポンスヘッダ
+RECORDED_HEADERS = ("content-type", "retry-after")
+
+# 実行時刻によって変わるパラメータ。完全一致するエントリが無い場合は
+# これらを除いたキーで照合する
+TIME_DEPENDENT_PARAMS = ("oldest", "latest")
+
+
+@dataclass
+class CassetteConfig:
+    """カセットの設定"""
+    mode: str  # record | replay
+    path: Path
+    timing: str = "original"
+
+    def wrap(self, transport: httpx.AsyncBaseTransport) -> httpx.AsyncBaseTransport:
+        """SlackClient のトランスポートを記録・再生用に差し替える"""
+        if self.mode == "record":
+            return CassetteRecorder(transport, self.path)
+        if self.mode == "replay":
+            return CassettePlayer(self.path, timing=self.timing)
+        raise ValueError(f"Unknown cassette mode: {self.mode} (expected one of {CASSETTE_MODES})")
+
+
+def scrub(value: Any) -> Any:
+    """秘密情報を取り除く"""
+    if isinstance(value, dict):
+        return {
+            key: SCRUBBED_VALUE if key in SCRUBBED_KEYS else scrub(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [scrub(item) for item in value]
+    if isinstance(value, str):
+        return _TOKEN_PATTERN.sub(SCRUBBED_VALUE, value)
+    return value
+
+
+def _method_of(request: httpx.Request) -> str:
+    """URLからSlack APIのメソッド名を取り出す (例: conversations.replies)"""
+    return request.url.path.rsplit("/", 1)[-1]
+
+
+def _request_key(method: str, params: Dict[str, str], loose: bool = False) -> Tuple:
+    items = sorted(
+        (key, value) for key, value in params.items()
+        if not (loose and key in TIME_DEPENDENT_PARAMS)
+    )
+    return (method, tuple(items), loose)
+
+
+class CassetteRecorder(httpx.AsyncBaseTransport):
+    """実際に通信しつつ、リクエストとレスポンスをカセットに追記する"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, path: Path):
+        self.transport = transport
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = gzip.open(path, "at", encoding="utf-8")
+        self._started = time.monotonic()
+        self.recorded = 0
+        logger.info(f"Recording Slack API traffic to {path}")
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.monotonic()
+        response = await self.transport.handle_async_request(request)
+        try:
+            body = await response.aread()
+        finally:
+            await response.aclose()
+        elapsed = time.monotonic() - started
+
+        try:
+            payload: Any = json.loads(body)
+        except ValueError:
+            payload = body.decode("utf-8", errors="replace")
+
+        entry = {
+            "offset": round(started - self._started, 4),
+            "elapsed": round(elapsed, 4),
+            "method": _method_of(request),
+            "params": scrub(dict(request.url.params)),
+            "status": response.status_code,
+            "headers": {
+                name: response.headers[name]
+                for name in RECORDED_HEADERS
+                if name in response.headers
+            },
+            "body": scrub(payload),
+        }
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.recorded += 1
+
+        # 本文は読み込み済み (展開済み) のため、エンコーディング関連のヘッダは外して返す
+        headers = [
+            (name, value) for name, value in response.headers.multi_items()
+            if name.lower() not in ("content-encoding", "content-length", "transfer-encoding")
+        ]
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=headers,
+            content=body,
+            request=request,
+            extensions={"http_version": response.extensions.get("http_version", b"HTTP/1.1")},
+        )
+
+    async def aclose(self) -> None:
+        self._file.close()
+        await self.transport.aclose()
+        logger.info(f"Recorded {self.recorded} Slack API responses to {self.path}")
+
+
+class CassettePlayer(httpx.AsyncBaseTransport):
+    """カセットからレスポンスを返す (Slackには接続しない)
+
+    同じリクエストが複数記録されている場合は記録順に返し、使い切ったら
+    最後のレスポンスを繰り返す。完全一致が無ければ oldest/latest を除いて照合する。
+    """
+
+    def __init__(self, path: Path, timing: str = "original"):
+        if timing not in CASSETTE_TIMINGS:
+            raise ValueError(f"Unknown cassette timing: {timing} (expected one of {CASSETTE_TIMINGS})")
+        self.path = path
+        self.timing = timing
+        self._entries: Dict[Tuple, Deque[dict]] = defaultdict(deque)
+        self._last: Dict[Tuple, dict] = {}
+        self.stats = {"entries": 0, "served": 0, "misses": 0}
+
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                for loose in (False, True):
+                    key = _request_key(entry["method"], entry["params"], loose)
+                    self._entries[key].append(entry)
+                self.stats["entries"] += 1
+        logger.info(f"Replaying {self.stats['entries']} Slack API responses from {path}")
+
+    def _next_entry(self, method: str, params: Dict[str, str]) -> Optional[dict]:
+        for loose in (False, True):
+            key = _request_key(method, params, loose)
+            queue = self._entries.get(key)
+            # 各エントリは完全一致用・緩い照合用の両方のキューに入っているため、
+            # 片方で返したものは読み飛ばす
+            while queue and queue[0].get("_served"):
+                queue.popleft()
+            if queue:
+                entry = queue.popleft()
+                entry["_served"] = True
+                self._last[key] = entry
+                return entry
+            if key in self._last:
+                return self._last[key]
+        return None
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        method = _method_of(request)
+        entry = self._next_entry(method, scrub(dict(request.url.params)))
+        if entry is None:
+            self.stats["misses"] += 1
+            logger.warning(f"No recorded response for {method} {dict(request.url.params)}")
+            return httpx.Response(
+                200, json={"ok": False, "error": "cassette_miss"}, request=request
+            )
+
+        self.stats["served"] += 1
+        headers = dict(entry["headers"])
+        if self.timing == "original" and entry["elapsed"] > 0:
+            await asyncio.sleep(entry["elapsed"])
+        elif self.timing == "fast" and "retry-after" in headers:
+            headers["retry-after"] = "0"
+
+        body = entry["body"]
+        content = body.encode("utf-8") if isinstance(body, str) else json.dumps(body).encode("utf-8")
+        return httpx.Response(
+            status_code=entry["status"],
+            headers=headers,
+            content=content,
+            request=request,
+        )
+
+    async def aclose(self) -> None:
+        logger.info(
+            f"Cassette replay finished: {self.stats['served']} served, "
+            f"{self.stats['misses']} misses"
+        )
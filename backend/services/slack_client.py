@@ -1,12 +1,90 @@
+import asyncio
+import importlib.util
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
 import httpx
-from typing import List, Optional, Dict, Any, Tuple
+from typing import AsyncIterator, Iterable, Iterator, List, Optional, Dict, Any, Tuple
 from datetime import datetime, timedelta
 
 from models.message import Message, Reaction
+from repositories.user_directory_repository import UserDirectoryRepository
+from services.rate_limiter import SlackRateLimiter
+from services.slack_cassette import CassetteConfig
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Slack Web APIのURL (テスト時は devtools.fake_slack などに差し替える)
+DEFAULT_SLACK_API_BASE_URL = "https://slack.com/api"
+
+# 接続プールの設定
+MAX_CONNECTIONS = 20
+MAX_KEEPALIVE_CONNECTIONS = 10
+KEEPALIVE_EXPIRY_SECONDS = 60.0
+REQUEST_TIMEOUT_SECONDS = 30.0
+CONNECT_TIMEOUT_SECONDS = 10.0
+
+# HTTP/2 は h2 パッケージがある場合のみ有効 (pip install h2)
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# リトライ設定
+MAX_RETRIES = 5
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+# Retry-After が無い429の待機秒数
+DEFAULT_RETRY_AFTER_SECONDS = 30.0
+# 1ジョブ (全スレッド同期・チャンネルダウンロード) で許容するリトライ回数
+DEFAULT_JOB_RETRY_BUDGET = 50
+
+# conversations.replies の1ページあたりの件数 (Slackの推奨上限は200)
+DEFAULT_REPLIES_PAGE_SIZE = 200
+
+# users.info を同時に発行する上限
+USER_LOOKUP_CONCURRENCY = 8
+
+# users.list の1ページあたりの件数
+USERS_LIST_PAGE_SIZE = 200
+
+
+class RetryBudget:
+    """1ジョブ内で共有するリトライ回数の上限"""
+
+    def __init__(self, max_retries: int):
+        self.max_retries = max_retries
+        self.used = 0
+
+    def consume(self) -> bool:
+        """リトライ枠を1つ使う (使い切っていればFalse)"""
+        if self.used >= self.max_retries:
+            return False
+        self.used += 1
+        return True
+
+
+_current_retry_budget: ContextVar[Optional[RetryBudget]] = ContextVar(
+    "slack_retry_budget", default=None
+)
+
+
+@contextmanager
+def retry_budget(max_retries: int = DEFAULT_JOB_RETRY_BUDGET) -> Iterator[RetryBudget]:
+    """ブロック内のSlack APIリクエストでリトライ枠を共有する
+
+    既に外側で設定されている場合はその枠をそのまま使う。
+    """
+    current = _current_retry_budget.get()
+    if current is not None:
+        yield current
+        return
+
+    budget = RetryBudget(max_retries)
+    token = _current_retry_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _current_retry_budget.reset(token)
+
 
 class SlackAuthError(Exception):
     """Slack認証エラー"""
@@ -19,15 +97,194 @@ class SlackClient:
     # 認証エラーとみなすSlack APIエラーコード
     AUTH_ERROR_CODES = {"invalid_auth", "not_authed", "token_revoked", "token_expired", "account_inactive"}
 
-    def __init__(self, xoxc_token: str, cookie: str, workspace: str = ""):
+    def __init__(
+        self,
+        xoxc_token: str,
+        cookie: str,
+        workspace: str = "",
+        http2: bool = True,
+        rate_limiter: Optional[SlackRateLimiter] = None,
+        replies_page_size: int = DEFAULT_REPLIES_PAGE_SIZE,
+        user_directory: Optional[UserDirectoryRepository] = None,
+        base_url: str = DEFAULT_SLACK_API_BASE_URL,
+        cassette: Optional[CassetteConfig] = None
+    ):
         self.xoxc_token = xoxc_token
         self.cookie = cookie
         self.workspace = workspace
-        self.base_url = "https://slack.com/api"
+        self.base_url = (base_url or DEFAULT_SLACK_API_BASE_URL).rstrip("/")
         self.auth_valid = True
         self.auth_error_message: Optional[str] = None
         # ユーザー情報のキャッシュ (user_id -> display_name)
         self._user_cache: Dict[str, str] = {}
+        # 永続化したユーザー名簿 (クライアントを作り直す場合は引き継ぐ)
+        self.user_directory = user_directory
+        self._prefetch_lock = asyncio.Lock()
+        self._user_lookup_semaphore = asyncio.Semaphore(USER_LOOKUP_CONCURRENCY)
+        # メソッド別のレート制限 (クライアントを作り直す場合は引き継ぐ)
+        self.rate_limiter = rate_limiter or SlackRateLimiter()
+        self.replies_page_size = replies_page_size
+        self.cassette = cassette
+
+        # 全リクエストで共有する接続プール (keep-alive で接続を再利用する)
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self._limits = httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS,
+        )
+        timeout = httpx.Timeout(REQUEST_TIMEOUT_SECONDS, connect=CONNECT_TIMEOUT_SECONDS)
+        if cassette is None:
+            self._client = httpx.AsyncClient(limits=self._limits, timeout=timeout, http2=self.http2)
+        else:
+            # 通信の記録・再生 (services.slack_cassette を参照)
+            transport = cassette.wrap(httpx.AsyncHTTPTransport(limits=self._limits, http2=self.http2))
+            self._client = httpx.AsyncClient(transport=transport, timeout=timeout)
+        self._stats = {
+            "requests": 0,
+            "errors": 0,
+            "connections_opened": 0,
+            "tls_handshakes": 0,
+            "shared_requests": 0,
+        }
+        # 実行中のリクエスト ((メソッド, パラメータ) -> Task)。同じリクエストは結果を共有する
+        self._inflight: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], "asyncio.Task[Dict[str, Any]]"] = {}
+        # リトライ回数 (理由別) と待機秒数
+        self._retry_stats = {
+            "rate_limited": 0,
+            "server_error": 0,
+            "timeout": 0,
+            "transport_error": 0,
+            "wait_seconds": 0.0,
+            "budget_exhausted": 0,
+        }
+
+    def with_credentials(self, xoxc_token: str, cookie: str, workspace: str) -> "SlackClient":
+        """接続先・カセット・レート制限などの設定はそのままで、認証情報だけ替えたクライアントを作成"""
+        return SlackClient(
+            xoxc_token=xoxc_token,
+            cookie=cookie,
+            workspace=workspace,
+            http2=self.http2,
+            rate_limiter=self.rate_limiter,
+            replies_page_size=self.replies_page_size,
+            user_directory=self.user_directory,
+            base_url=self.base_url,
+            cassette=self.cassette
+        )
+
+    async def aclose(self) -> None:
+        """接続プールを閉じる"""
+        if not self._client.is_closed:
+            await self._client.aclose()
+            logger.info("Closed Slack HTTP client")
+
+    async def __aenter__(self) -> "SlackClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def _trace(self, event_name: str, info: Dict[str, Any]) -> None:
+        """httpcoreのトレースイベントから新規接続・TLSハンドシェイク数を数える"""
+        if event_name == "connection.connect_tcp.complete":
+            self._stats["connections_opened"] += 1
+        elif event_name == "connection.start_tls.complete":
+            self._stats["tls_handshakes"] += 1
+
+    async def _get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None
+    ) -> httpx.Response:
+        """共有クライアントでGETリクエストを送信"""
+        self._stats["requests"] += 1
+        try:
+            return await self._client.get(
+                url,
+                headers=self._get_headers(),
+                params=params,
+                timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+                extensions={"trace": self._trace},
+            )
+        except Exception:
+            self._stats["errors"] += 1
+            raise
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """接続プールの統計情報を取得 (診断用)"""
+        connections = []
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        if pool is not None:
+            connections = list(getattr(pool, "connections", []))
+
+        requests = self._stats["requests"]
+        opened = self._stats["connections_opened"]
+        return {
+            "http2": self.http2,
+            "closed": self._client.is_closed,
+            "max_connections": self._limits.max_connections,
+            "max_keepalive_connections": self._limits.max_keepalive_connections,
+            "keepalive_expiry": self._limits.keepalive_expiry,
+            "open_connections": len(connections),
+            "idle_connections": sum(1 for c in connections if c.is_idle()),
+            "requests": requests,
+            "errors": self._stats["errors"],
+            "connections_opened": opened,
+            "tls_handshakes": self._stats["tls_handshakes"],
+            "shared_requests": self._stats["shared_requests"],
+            "connection_reuse_ratio": round(1 - opened / requests, 3) if requests else None,
+            "rate_limits": self.rate_limiter.get_stats(),
+            "retries": {
+                key: round(value, 3) if isinstance(value, float) else value
+                for key, value in self._retry_stats.items()
+            },
+        }
+
+    @staticmethod
+    def _backoff_delay(attempt: int) -> float:
+        """ジッター付き指数バックオフの待機秒数"""
+        return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> float:
+        """Retry-After ヘッダーの秒数 (無い場合はデフォルト値)"""
+        try:
+            return max(0.0, float(response.headers["Retry-After"]))
+        except (KeyError, ValueError):
+            return DEFAULT_RETRY_AFTER_SECONDS
+
+    def _can_retry(self, attempt: int) -> bool:
+        """リトライ可能か (回数上限とジョブのリトライ枠を確認)"""
+        if attempt >= MAX_RETRIES:
+            return False
+        budget = _current_retry_budget.get()
+        if budget is not None and not budget.consume():
+            self._retry_stats["budget_exhausted"] += 1
+            logger.warning("Slack retry budget exhausted for this job")
+            return False
+        return True
+
+    async def _wait_before_retry(
+        self,
+        endpoint: str,
+        reason: str,
+        delay: float,
+        attempt: int
+    ) -> None:
+        """リトライ前の待機とメトリクス記録"""
+        self._retry_stats[reason] += 1
+        self._retry_stats["wait_seconds"] += delay
+        logger.warning(
+            f"Retrying {endpoint} after {delay:.1f}s "
+            f"({reason}, attempt {attempt + 1}/{MAX_RETRIES})"
+        )
+        if reason == "rate_limited" and self.rate_limiter.enabled:
+            # 同じメソッドを呼ぶ他の処理も Retry-After の間は待たせる
+            self.rate_limiter.defer(endpoint, delay)
+        else:
+            await asyncio.sleep(delay)
 
     def _get_headers(self) -> Dict[str, str]:
         """HTTPヘッダーを取得"""
@@ -42,25 +299,75 @@ class SlackClient:
         endpoint: str,
         params: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
-        """Slack APIリクエストを実行"""
+        """Slack APIリクエストを実行
+
+        同じメソッド・パラメータのリクエストが実行中であれば、新たに送らずに
+        その結果を共有する。共有された結果は読み取り専用として扱うこと。
+        """
+        key = (endpoint, tuple(sorted((k, str(v)) for k, v in (params or {}).items())))
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._request_with_retry(endpoint, params))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self._stats["shared_requests"] += 1
+            logger.debug(f"Sharing in-flight request: {endpoint}")
+        # 呼び出し元がキャンセルされても他の待機者のリクエストは続ける
+        return await asyncio.shield(task)
+
+    async def _request_with_retry(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Slack APIリクエストを実行 (429・5xx・通信エラーはリトライ)"""
         if not self.auth_valid:
             raise SlackAuthError(f"Slack認証が無効です: {self.auth_error_message}")
 
         url = f"{self.base_url}/{endpoint}"
 
-        async with httpx.AsyncClient() as client:
+        attempt = 0
+        while True:
+            await self.rate_limiter.acquire(endpoint)
+
             try:
-                response = await client.get(
-                    url,
-                    headers=self._get_headers(),
-                    params=params,
-                    timeout=30.0
+                response = await self._get(url, params=params)
+            except httpx.TransportError as e:
+                # タイムアウト・接続エラーはバックオフしてリトライ
+                if not self._can_retry(attempt):
+                    logger.error(f"Request failed: {e}")
+                    raise
+                reason = "timeout" if isinstance(e, httpx.TimeoutException) else "transport_error"
+                await self._wait_before_retry(endpoint, reason, self._backoff_delay(attempt), attempt)
+                attempt += 1
+                continue
+
+            if response.status_code == 429 and self._can_retry(attempt):
+                await self._wait_before_retry(
+                    endpoint, "rate_limited", self._retry_after(response), attempt
+                )
+                attempt += 1
+                continue
+            if response.status_code >= 500 and self._can_retry(attempt):
+                await self._wait_before_retry(
+                    endpoint, "server_error", self._backoff_delay(attempt), attempt
                 )
+                attempt += 1
+                continue
+
+            try:
                 response.raise_for_status()
                 data = response.json()
 
                 if not data.get("ok"):
                     error = data.get("error", "Unknown error")
+                    if error == "ratelimited" and self._can_retry(attempt):
+                        await self._wait_before_retry(
+                            endpoint, "rate_limited", self._retry_after(response), attempt
+                        )
+                        attempt += 1
+                        continue
                     if error in self.AUTH_ERROR_CODES:
                         self.auth_valid = False
                         self.auth_error_message = error
@@ -82,79 +389,50 @@ class SlackClient:
     async def test_auth(self) -> bool:
         """認証情報をテストし、auth_validフラグを更新する"""
         url = f"{self.base_url}/auth.test"
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    url,
-                    headers=self._get_headers(),
-                    timeout=10.0
-                )
-                data = response.json()
-                if data.get("ok"):
-                    self.auth_valid = True
-                    self.auth_error_message = None
-                    logger.info("Slack auth test succeeded")
-                    return True
-                else:
-                    error = data.get("error", "Unknown error")
-                    self.auth_valid = False
-                    self.auth_error_message = error
-                    logger.error(f"Slack auth test failed: {error}")
-                    return False
-            except Exception as e:
+        await self.rate_limiter.acquire("auth.test")
+        try:
+            response = await self._get(url, timeout=10.0)
+            data = response.json()
+            if data.get("ok"):
+                self.auth_valid = True
+                self.auth_error_message = None
+                logger.info("Slack auth test succeeded")
+                return True
+            else:
+                error = data.get("error", "Unknown error")
                 self.auth_valid = False
-                self.auth_error_message = str(e)
-                logger.error(f"Slack auth test error: {e}")
+                self.auth_error_message = error
+                logger.error(f"Slack auth test failed: {error}")
                 return False
+        except Exception as e:
+            self.auth_valid = False
+            self.auth_error_message = str(e)
+            logger.error(f"Slack auth test error: {e}")
+            return False
 
     async def get_thread_messages(
         self,
         channel_id: str,
-        thread_ts: str
+        thread_ts: str,
+        oldest: Optional[str] = None,
+        page_size: Optional[int] = None
     ) -> List[Message]:
-        """スレッドのメッセージを取得"""
+        """スレッドのメッセージを取得 (全ページ)
+
+        Args:
+            channel_id: チャンネルID
+            thread_ts: スレッドの親メッセージのts
+            oldest: 指定した場合はこのtsより新しいメッセージのみ取得
+            page_size: 1ページあたりの件数 (省略時は replies_page_size)
+        """
         logger.info(f"Fetching messages for thread: {channel_id}/{thread_ts}")
 
         try:
-            data = await self._make_request(
-                "conversations.replies",
-                params={
-                    "channel": channel_id,
-                    "ts": thread_ts,
-                    "limit": 1000  # 最大1000件
-                }
-            )
-
-            messages_data = data.get("messages", [])
-            messages = []
-
-            for msg_data in messages_data:
-                # リアクションを解析
-                reactions = []
-                for reaction_data in msg_data.get("reactions", []):
-                    reactions.append(Reaction(
-                        name=reaction_data.get("name", ""),
-                        count=reaction_data.get("count", 0)
-                    ))
-
-                # タイムスタンプを日時に変換
-                ts = msg_data.get("ts", "")
-                created_at = datetime.fromtimestamp(float(ts))
-
-                # ユーザーIDから表示名を取得
-                user_id = msg_data.get("user", "")
-                user_name = await self.get_user_display_name(user_id) if user_id else None
-
-                message = Message(
-                    ts=ts,
-                    user=user_id,
-                    user_name=user_name,
-                    text=msg_data.get("text", ""),
-                    reactions=reactions,
-                    files=msg_data.get("files", []),
-                    created_at=created_at
-                )
-                messages.append(message)
+            messages: List[Message] = []
+            async for page in self.iter_thread_message_pages(
+                channel_id, thread_ts, oldest=oldest, page_size=page_size
+            ):
+                messages.extend(page)
 
             logger.info(f"Fetched {len(messages)} messages")
             return messages
@@ -163,6 +441,84 @@ class SlackClient:
             logger.error(f"Failed to fetch thread messages: {e}")
             raise
 
+    async def iter_thread_message_pages(
+        self,
+        channel_id: str,
+        thread_ts: str,
+        oldest: Optional[str] = None,
+        page_size: Optional[int] = None
+    ) -> AsyncIterator[List[Message]]:
+        """スレッドのメッセージをページ単位で順に返す
+
+        next_cursor をたどって全ページを取得する。各ページを受け取った時点で
+        呼び出し側が保存を始められるよう、1ページずつ yield する。
+        """
+        params: Dict[str, Any] = {
+            "channel": channel_id,
+            "ts": thread_ts,
+            "limit": page_size or self.replies_page_size,
+        }
+        if oldest:
+            params["oldest"] = oldest
+
+        # 親メッセージはページごとに含まれることがあるため、tsで重複を除く
+        seen_ts = set()
+        cursor: Optional[str] = None
+
+        while True:
+            if cursor:
+                params["cursor"] = cursor
+            data = await self._make_request("conversations.replies", params=dict(params))
+
+            page_data = []
+            for msg_data in data.get("messages", []):
+                ts = msg_data.get("ts", "")
+                if ts in seen_ts or (oldest and float(ts) <= float(oldest)):
+                    continue
+                seen_ts.add(ts)
+                page_data.append(msg_data)
+
+            # ページ内の未知のユーザーをまとめて解決してからMessageを組み立てる
+            user_names = await self.resolve_user_display_names(
+                msg_data.get("user", "") for msg_data in page_data
+            )
+            page = [self._build_message(msg_data, user_names) for msg_data in page_data]
+
+            if page:
+                yield page
+
+            cursor = data.get("response_metadata", {}).get("next_cursor")
+            if not data.get("has_more") or not cursor:
+                break
+
+    @staticmethod
+    def _build_message(msg_data: Dict[str, Any], user_names: Dict[str, str]) -> Message:
+        """conversations.replies のメッセージをMessageに変換"""
+        # リアクションを解析
+        reactions = []
+        for reaction_data in msg_data.get("reactions", []):
+            reactions.append(Reaction(
+                name=reaction_data.get("name", ""),
+                count=reaction_data.get("count", 0)
+            ))
+
+        # タイムスタンプを日時に変換
+        ts = msg_data.get("ts", "")
+        created_at = datetime.fromtimestamp(float(ts))
+
+        user_id = msg_data.get("user", "")
+        user_name = user_names.get(user_id) if user_id else None
+
+        return Message(
+            ts=ts,
+            user=user_id,
+            user_name=user_name,
+            text=msg_data.get("text", ""),
+            reactions=reactions,
+            files=msg_data.get("files", []),
+            created_at=created_at
+        )
+
     async def get_user_info(self, user_id: str) -> Optional[Dict[str, Any]]:
         """ユーザー情報を取得"""
         try:
@@ -175,25 +531,134 @@ class SlackClient:
             logger.error(f"Failed to fetch user info for {user_id}: {e}")
             return None
 
-    async def get_user_display_name(self, user_id: str) -> str:
-        """ユーザーの表示名を取得（キャッシュ付き）"""
-        # キャッシュをチェック
+    @staticmethod
+    def _display_name_of(user_info: Dict[str, Any], user_id: str) -> str:
+        """表示名の優先順位: display_name > real_name > name > user_id"""
+        return (
+            user_info.get("profile", {}).get("display_name") or
+            user_info.get("real_name") or
+            user_info.get("name") or
+            user_id
+        )
+
+    def _cached_display_name(self, user_id: str) -> Optional[str]:
+        """メモリキャッシュ、次にユーザー名簿から表示名を引く"""
         if user_id in self._user_cache:
             return self._user_cache[user_id]
+        if self.user_directory is not None:
+            display_name = self.user_directory.get_display_name(user_id)
+            if display_name is not None:
+                self._user_cache[user_id] = display_name
+                return display_name
+        return None
+
+    async def prefetch_users(self, force: bool = False) -> int:
+        """users.list で全ユーザーを取得してユーザー名簿を更新する
+
+        名簿が有効期限内であれば何もしない。失敗した場合は名簿をそのまま使い、
+        未登録のユーザーは users.info で個別に解決する (失敗は記録し、
+        しばらくは一括取得をやり直さない)。
+
+        Returns:
+            取得したユーザー数 (取得しなかった場合は0)
+        """
+        if self.user_directory is None:
+            return 0
+
+        async with self._prefetch_lock:
+            if not force and not self.user_directory.is_stale():
+                return 0
+
+            users: Dict[str, dict] = {}
+            params: Dict[str, Any] = {"limit": USERS_LIST_PAGE_SIZE}
+            try:
+                while True:
+                    data = await self._make_request("users.list", params=dict(params))
+                    for member in data.get("members", []):
+                        user_id = member.get("id")
+                        if not user_id:
+                            continue
+                        users[user_id] = {
+                            "display_name": self._display_name_of(member, user_id),
+                            "name": member.get("name", ""),
+                            "real_name": member.get("real_name", ""),
+                        }
+                    cursor = data.get("response_metadata", {}).get("next_cursor")
+                    if not cursor:
+                        break
+                    params["cursor"] = cursor
+            except Exception as e:
+                logger.warning(f"Failed to prefetch users, falling back to users.info: {e}")
+                self.user_directory.mark_failed()
+                return 0
+
+            self.user_directory.replace_all(users)
+            self._user_cache.clear()
+            logger.info(f"Prefetched {len(users)} users")
+            return len(users)
+
+    async def resolve_user_display_names(
+        self,
+        user_ids: Iterable[str],
+        refresh: bool = False
+    ) -> Dict[str, str]:
+        """複数ユーザーの表示名をまとめて取得
+
+        重複を除き、キャッシュ・ユーザー名簿に無いユーザーだけを
+        USER_LOOKUP_CONCURRENCY 件まで並行して取得する。
+
+        Args:
+            user_ids: ユーザーIDの列
+            refresh: Trueの場合はキャッシュを使わず全員を users.info で取得し直す
+
+        Returns:
+            user_id -> 表示名
+        """
+        unique_ids = list(dict.fromkeys(user_id for user_id in user_ids if user_id))
+        names: Dict[str, str] = {}
+        if not refresh:
+            for user_id in unique_ids:
+                display_name = self._cached_display_name(user_id)
+                if display_name is not None:
+                    names[user_id] = display_name
+
+        missing = [user_id for user_id in unique_ids if user_id not in names]
+        if missing:
+            resolved = await asyncio.gather(
+                *(self.get_user_display_name(user_id, refresh=refresh) for user_id in missing)
+            )
+            names.update(zip(missing, resolved))
+        return names
+
+    async def get_user_display_name(self, user_id: str, refresh: bool = False) -> str:
+        """ユーザーの表示名を取得（キャッシュ・ユーザー名簿付き）
+
+        同じユーザーを同時に問い合わせた場合は _make_request により
+        1回の users.info を共有する。
+        """
+        if not refresh:
+            display_name = self._cached_display_name(user_id)
+            if display_name is not None:
+                return display_name
 
-        # ユーザー情報を取得
+        return await self._fetch_user_display_name(user_id)
+
+    async def _fetch_user_display_name(self, user_id: str) -> str:
+        """users.info から表示名を取得してキャッシュ・ユーザー名簿に保存する"""
         try:
-            user_info = await self.get_user_info(user_id)
+            async with self._user_lookup_semaphore:
+                user_info = await self.get_user_info(user_id)
             if user_info:
-                # 表示名の優先順位: display_name > real_name > name > user_id
-                display_name = (
-                    user_info.get("profile", {}).get("display_name") or
-                    user_info.get("real_name") or
-                    user_info.get("name") or
-                    user_id
-                )
+                display_name = self._display_name_of(user_info, user_id)
                 # キャッシュに保存
                 self._user_cache[user_id] = display_name
+                if self.user_directory is not None:
+                    self.user_directory.put(
+                        user_id,
+                        display_name,
+                        name=user_info.get("name", ""),
+                        real_name=user_info.get("real_name", ""),
+                    )
                 logger.info(f"Cached user: {user_id} -> {display_name}")
                 return display_name
             else:
@@ -276,6 +741,52 @@ class SlackClient:
             logger.error(f"Failed to fetch channel history with metadata: {e}")
             raise
 
+    async def get_thread_latest_replies(
+        self,
+        channel_id: str,
+        thread_ts_list: Iterable[str],
+        max_pages: int = 5,
+        page_size: int = 200
+    ) -> Tuple[Dict[str, str], bool]:
+        """チャンネル履歴から各スレッドの最新返信のtsを取得
+
+        最も古いスレッドの親メッセージまで conversations.history を新しい順に
+        たどり、親メッセージの latest_reply (返信が無ければ親のts) を集める。
+
+        Args:
+            channel_id: チャンネルID
+            thread_ts_list: 対象スレッドの親メッセージのts
+            max_pages: たどる最大ページ数
+
+        Returns:
+            (thread_ts -> 最新返信のts, 全スレッドの親メッセージを確認できたか)
+        """
+        remaining = set(thread_ts_list)
+        latest_replies: Dict[str, str] = {}
+        if not remaining:
+            return latest_replies, True
+
+        params: Dict[str, Any] = {
+            "channel": channel_id,
+            "oldest": min(remaining, key=float),
+            "inclusive": "true",
+            "limit": page_size,
+        }
+        for _ in range(max_pages):
+            data = await self._make_request("conversations.history", params=dict(params))
+            for message in data.get("messages", []):
+                ts = message.get("ts")
+                if ts in remaining:
+                    remaining.discard(ts)
+                    latest_replies[ts] = message.get("latest_reply") or ts
+
+            cursor = data.get("response_metadata", {}).get("next_cursor")
+            if not remaining or not data.get("has_more") or not cursor:
+                break
+            params["cursor"] = cursor
+
+        return latest_replies, not remaining
+
     async def find_threads_with_mention(
         self,
         channel_id: str,
@@ -0,0 +1,199 @@
+"""全スレッド同期のバックグラウンドジョブ"""
+import asyncio
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from models.sync_job import SyncJobStatus
+from services.thread_manager import ThreadManager
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 保持する終了済みジョブの数
+JOB_HISTORY_SIZE = 20
+
+TERMINAL_SYNC_JOB_STATUSES = ("completed", "cancelled", "error")
+
+
+def _covers_full(running: Optional[bool], requested: Optional[bool]) -> bool:
+    """running の取得方法で requested の同期を兼ねられるか
+
+    True (全件) は全てを兼ねる。None (自動判定) は False (差分) を兼ねる。
+    """
+    return running is True or running == requested or (requested is False and running is None)
+
+
+def _widen_full(a: Optional[bool], b: Optional[bool]) -> Optional[bool]:
+    """両方の要求を兼ねる取得方法"""
+    if a is True or b is True:
+        return True
+    if a is None or b is None:
+        return None
+    return False
+
+
+class SyncJobRunner:
+    """ThreadManager.sync_all_threads をバックグラウンドのジョブとして実行する
+
+    同時に実行するジョブは1つだけ。実行中に開始を要求された場合:
+
+    - 実行中のジョブが要求を兼ねる (同じ条件か、より広い条件) 場合はそれを返す
+    - 兼ねない場合 (定期同期の due_only 実行中に手動の全スレッド同期など) は
+      実行中のジョブの終了後に始める後続ジョブ (pending) を1つ予約して返す。
+      後続ジョブが既にあれば、両方の要求を兼ねるよう条件を広げて共有する
+
+    ジョブのステータスはメモリ上にのみ保持する。
+    """
+
+    def __init__(self):
+        self._jobs: "OrderedDict[str, SyncJobStatus]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._current_job_id: Optional[str] = None
+        self._queued_job_id: Optional[str] = None
+
+    def get_job(self, job_id: str) -> Optional[SyncJobStatus]:
+        """ジョブを取得 (終了済みは直近 JOB_HISTORY_SIZE 件まで)"""
+        return self._jobs.get(job_id)
+
+    def get_current_job(self) -> Optional[SyncJobStatus]:
+        """実行中のジョブ、無ければ最後に開始したジョブ"""
+        if self._current_job_id is not None:
+            return self._jobs[self._current_job_id]
+        return next(reversed(self._jobs.values()), None)
+
+    def list_jobs(self) -> List[SyncJobStatus]:
+        """ジョブ一覧 (新しい順)"""
+        return list(reversed(self._jobs.values()))
+
+    def start(
+        self,
+        thread_manager: ThreadManager,
+        full: Optional[bool] = None,
+        due_only: bool = False,
+        trigger: str = "manual"
+    ) -> SyncJobStatus:
+        """同期ジョブを開始
+
+        実行中のジョブが要求を兼ねる場合はそのジョブを、兼ねない場合は
+        実行中のジョブの終了後に始まる後続ジョブ (status="pending") を返す。
+        """
+        if self._current_job_id is not None:
+            running = self._jobs[self._current_job_id]
+            if _covers_full(running.full, full) and (due_only or not running.due_only):
+                logger.info(f"Sync job {running.job_id} already running, reusing it for {trigger} request")
+                return running
+            return self._queue(thread_manager, running, full, due_only, trigger)
+
+        job = self._new_job(full, due_only, trigger, status="running")
+        self._current_job_id = job.job_id
+        self._tasks[job.job_id] = asyncio.create_task(self._run(thread_manager, job))
+        logger.info(f"Sync job {job.job_id} started ({trigger})")
+        return job
+
+    def _new_job(self, full: Optional[bool], due_only: bool, trigger: str, status: str) -> SyncJobStatus:
+        now = datetime.now().isoformat()
+        job = SyncJobStatus(
+            job_id=uuid.uuid4().hex[:8],
+            trigger=trigger,
+            full=full,
+            due_only=due_only,
+            status=status,
+            started_at=now,
+            updated_at=now,
+        )
+        self._jobs[job.job_id] = job
+
+        # 古い終了済みジョブを捨てる
+        while len(self._jobs) > JOB_HISTORY_SIZE:
+            oldest_id = next(iter(self._jobs))
+            if oldest_id in (self._current_job_id, self._queued_job_id, job.job_id):
+                break
+            del self._jobs[oldest_id]
+        return job
+
+    def _queue(
+        self,
+        thread_manager: ThreadManager,
+        running: SyncJobStatus,
+        full: Optional[bool],
+        due_only: bool,
+        trigger: str
+    ) -> SyncJobStatus:
+        """実行中のジョブの後に続けて実行するジョブを予約する (予約済みなら条件を広げて共有)"""
+        if self._queued_job_id is not None:
+            queued = self._jobs[self._queued_job_id]
+            queued.full = _widen_full(queued.full, full)
+            queued.due_only = queued.due_only and due_only
+            queued.cancel_requested = False  # 取り消し後に改めて要求された場合
+            queued.updated_at = datetime.now().isoformat()
+            logger.info(f"Sync job {queued.job_id} queued, sharing it with {trigger} request")
+            return queued
+
+        queued = self._new_job(full, due_only, trigger, status="pending")
+        self._queued_job_id = queued.job_id
+        self._tasks[queued.job_id] = asyncio.create_task(
+            self._run(thread_manager, queued, after=self._tasks.get(running.job_id))
+        )
+        logger.info(f"Sync job {queued.job_id} queued after {running.job_id} ({trigger})")
+        return queued
+
+    async def _run(
+        self,
+        thread_manager: ThreadManager,
+        job: SyncJobStatus,
+        after: Optional[asyncio.Task] = None
+    ) -> None:
+        if after is not None:
+            # 先行ジョブの終了を待ってから開始する (_run は例外を送出しない)
+            await asyncio.wait([after])
+            job.started_at = datetime.now().isoformat()
+            job.status = "running"
+
+        try:
+            if job.cancel_requested:
+                job.status = "cancelled"
+            else:
+                result = await thread_manager.sync_all_threads(
+                    full=job.full, due_only=job.due_only, job=job
+                )
+                # 集計値は sync_all_threads の結果で確定させる
+                for key, value in result.items():
+                    setattr(job, key, value)
+                job.status = "cancelled" if job.cancel_requested else "completed"
+        except Exception as e:
+            logger.error(f"Sync job {job.job_id} failed: {e}")
+            job.status = "error"
+            job.error_message = str(e)
+        finally:
+            job.current_threads = []
+            job.completed_at = datetime.now().isoformat()
+            job.updated_at = job.completed_at
+            if self._current_job_id == job.job_id:
+                # 予約済みの後続ジョブがあれば、間に別のジョブが始まらないようすぐに引き継ぐ
+                self._current_job_id = self._queued_job_id
+                self._queued_job_id = None
+            self._tasks.pop(job.job_id, None)
+
+        logger.info(
+            f"Sync job {job.job_id} {job.status}: {job.done_threads}/{job.target_threads} threads"
+        )
+
+    async def wait(self, job_id: str) -> Optional[SyncJobStatus]:
+        """ジョブの終了を待つ (待っている側が取り消されてもジョブは止めない)"""
+        task = self._tasks.get(job_id)
+        if task is not None:
+            await asyncio.shield(task)
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[SyncJobStatus]:
+        """ジョブの取り消しを要求 (同期中のスレッドが終わり次第止まる。予約中なら開始しない)"""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        if job.status not in TERMINAL_SYNC_JOB_STATUSES and not job.cancel_requested:
+            job.cancel_requested = True
+            job.updated_at = datetime.now().isoformat()
+            logger.info(f"Sync job {job_id} cancellation requested")
+        return job
@@ -0,0 +1,202 @@
+"""スレッドごとの同期間隔の決定 (活動度に応じた適応スケジューリング)"""
+import math
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+
+from models.thread import Thread
+from repositories.sync_schedule_repository import SyncScheduleRepository
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 活動度 (新着メッセージ数の指数減衰和) が半分になるまでの時間
+ACTIVITY_HALF_LIFE_HOURS = 24
+
+# 活動中のスレッドの同期間隔 (SyncConfig.sync_interval_minutes の既定値と同じ)
+DEFAULT_BASE_INTERVAL_MINUTES = 30
+# 活発なスレッドの最短間隔 (ファストレーン)
+DEFAULT_MIN_INTERVAL_MINUTES = 5
+# 休眠中のスレッドの最長間隔
+DEFAULT_MAX_INTERVAL_HOURS = 24
+
+# 休眠中の間隔を倍にしていく回数の上限 (オーバーフロー防止)
+MAX_IDLE_STREAK = 20
+
+
+class SyncScheduler:
+    """スレッドごとに次回の同期日時を決める
+
+    同期のたびに新着メッセージから活動度 (半減期 ACTIVITY_HALF_LIFE_HOURS の
+    指数減衰和) を更新し、次の間隔を決める。
+
+    - 活動度 >= 1: base / 活動度 (min_interval_minutes まで短縮。下限に達したものは hot)
+    - 活動度 < 1: 新着の無い同期が続くたびに base から倍にする (max_interval_hours まで。dormant)
+
+    未登録のスレッドはすぐに同期対象になる。最後のメッセージから長く経っている
+    スレッドは、その期間に応じた長い間隔から始める。
+    """
+
+    def __init__(
+        self,
+        schedule_repo: SyncScheduleRepository,
+        base_interval_minutes: int = DEFAULT_BASE_INTERVAL_MINUTES,
+        min_interval_minutes: int = DEFAULT_MIN_INTERVAL_MINUTES,
+        max_interval_hours: int = DEFAULT_MAX_INTERVAL_HOURS
+    ):
+        self.schedule_repo = schedule_repo
+        self.base_interval_minutes = base_interval_minutes
+        self.min_interval_minutes = min_interval_minutes
+        self.max_interval_hours = max_interval_hours
+
+    @staticmethod
+    def _decay(activity: float, elapsed: timedelta) -> float:
+        hours = max(elapsed.total_seconds(), 0) / 3600
+        return activity * 0.5 ** (hours / ACTIVITY_HALF_LIFE_HOURS)
+
+    def _seed_idle_streak(self, thread: Thread, now: datetime) -> int:
+        """未登録スレッドの初期値: 最後のメッセージからの経過時間が base の何倍か (log2)"""
+        if not thread.last_message_ts:
+            return 0
+        quiet = now - datetime.fromtimestamp(float(thread.last_message_ts))
+        ratio = quiet.total_seconds() / 60 / max(self.base_interval_minutes, 1)
+        if ratio < 2:
+            return 0
+        return min(int(math.log2(ratio)), MAX_IDLE_STREAK)
+
+    def _interval(self, activity: float, idle_streak: int) -> tuple:
+        """活動度と連続した空振り回数から (間隔(分), 区分) を決める"""
+        base = max(self.base_interval_minutes, self.min_interval_minutes)
+        if activity >= 1:
+            minutes = max(self.min_interval_minutes, base / activity)
+            return minutes, "hot" if minutes <= self.min_interval_minutes else "active"
+
+        minutes = min(base * 2 ** idle_streak, self.max_interval_hours * 60)
+        return max(minutes, self.min_interval_minutes), "dormant" if idle_streak > 0 else "active"
+
+    def record(
+        self,
+        thread: Thread,
+        new_message_ts: Iterable[str] = (),
+        checked_at: Optional[datetime] = None,
+        full_synced_at: Optional[datetime] = None
+    ) -> dict:
+        """同期 (または変更なしの確認) の結果から次回の同期日時を決める
+
+        Args:
+            thread: 同期したスレッド (同期前の状態)
+            new_message_ts: 今回新たに取得したメッセージの ts
+            checked_at: 確認した日時 (省略時は現在時刻)
+            full_synced_at: 全件取得で内容に変化が無いことを確認した日時
+                (スレッドを書き込まずに全件同期の日時を記録する)
+
+        Returns:
+            更新したスケジュール
+        """
+        now = checked_at or datetime.now()
+        entry = self.schedule_repo.get(thread.id)
+        if entry is None:
+            activity = 0.0
+            idle_streak = self._seed_idle_streak(thread, now)
+            last_full_sync_at = None
+        else:
+            activity = self._decay(entry["activity"], now - datetime.fromisoformat(entry["activity_at"]))
+            idle_streak = entry["idle_streak"]
+            last_full_sync_at = entry.get("last_full_sync_at")
+        if full_synced_at is not None:
+            last_full_sync_at = full_synced_at.isoformat()
+
+        # 古いメッセージ (初回取得分など) は経過時間に応じて小さく数える
+        recent = sum(
+            self._decay(1.0, now - datetime.fromtimestamp(float(ts))) for ts in new_message_ts
+        )
+        activity += recent
+
+        if recent >= 0.5:
+            idle_streak = 0
+        elif activity < 1:
+            idle_streak = min(idle_streak + 1, MAX_IDLE_STREAK)
+
+        minutes, tier = self._interval(activity, idle_streak)
+        entry = {
+            "activity": round(activity, 4),
+            "activity_at": now.isoformat(),
+            "idle_streak": idle_streak,
+            "interval_minutes": round(minutes, 2),
+            "tier": tier,
+            "last_checked_at": now.isoformat(),
+            "next_due_at": (now + timedelta(minutes=minutes)).isoformat(),
+            "last_full_sync_at": last_full_sync_at,
+        }
+        self.schedule_repo.put(thread.id, entry)
+        return entry
+
+    def get_last_full_sync(self, thread_id: str) -> Optional[datetime]:
+        """変化なしを確認した最後の全件同期の日時 (記録が無ければNone)"""
+        entry = self.schedule_repo.get(thread_id)
+        if entry is None or not entry.get("last_full_sync_at"):
+            return None
+        return datetime.fromisoformat(entry["last_full_sync_at"])
+
+    def is_due(self, thread: Thread, now: Optional[datetime] = None) -> bool:
+        """次回の同期日時を過ぎているか (未登録のスレッドは常に True)"""
+        entry = self.schedule_repo.get(thread.id)
+        if entry is None:
+            return True
+        return datetime.fromisoformat(entry["next_due_at"]) <= (now or datetime.now())
+
+    def select_due(self, threads: List[Thread], now: Optional[datetime] = None) -> List[Thread]:
+        """同期日時を過ぎたスレッドだけを選ぶ (threads の順序を保つ)"""
+        now = now or datetime.now()
+        return [thread for thread in threads if self.is_due(thread, now)]
+
+    def forget(self, thread_id: str) -> None:
+        """削除したスレッドのスケジュールを破棄"""
+        self.schedule_repo.delete(thread_id)
+
+    def prune(self, threads: List[Thread]) -> int:
+        """threads に含まれないスレッドのスケジュールを削除
+
+        Returns:
+            削除した件数
+        """
+        removed = self.schedule_repo.prune(thread.id for thread in threads)
+        if removed:
+            logger.info(f"同期スケジュールから{removed}件を削除しました")
+        return removed
+
+    def get_schedule(self, threads: List[Thread], now: Optional[datetime] = None) -> List[dict]:
+        """スレッドごとのスケジュール (次回の同期日時が近い順。読み取りのみ)"""
+        now = now or datetime.now()
+
+        schedule = []
+        for thread in threads:
+            entry = self.schedule_repo.get(thread.id)
+            if entry is None:
+                schedule.append({
+                    "thread_id": thread.id,
+                    "title": thread.title,
+                    "tier": "new",
+                    "activity": 0.0,
+                    "idle_streak": 0,
+                    "interval_minutes": None,
+                    "last_checked_at": None,
+                    "next_due_at": None,
+                    "due": True,
+                })
+                continue
+
+            activity = self._decay(entry["activity"], now - datetime.fromisoformat(entry["activity_at"]))
+            schedule.append({
+                "thread_id": thread.id,
+                "title": thread.title,
+                "tier": entry["tier"],
+                "activity": round(activity, 4),
+                "idle_streak": entry["idle_streak"],
+                "interval_minutes": entry["interval_minutes"],
+                "last_checked_at": entry["last_checked_at"],
+                "next_due_at": entry["next_due_at"],
+                "due": datetime.fromisoformat(entry["next_due_at"]) <= now,
+            })
+
+        schedule.sort(key=lambda item: item["next_due_at"] or "")
+        return schedule
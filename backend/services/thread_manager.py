@@ -1,16 +1,31 @@
+import asyncio
+import hashlib
+from collections import defaultdict
 from pathlib import Path
-from typing import List, Optional
-from datetime import datetime
+from typing import List, Optional, Union
+from datetime import datetime, timedelta
 
 from models.thread import Thread, ThreadCreate, ThreadUpdate
 from models.message import Message
+from models.sync_job import SyncJobStatus
 from repositories.thread_repository import ThreadRepository
 from repositories.message_repository import MessageRepository
-from services.slack_client import SlackClient
+from repositories.summary_repository import SummaryRepository
+from services.slack_client import SlackClient, retry_budget
+from services.sync_scheduler import SyncScheduler
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# 全件取得による再同期 (編集・削除・リアクションの反映) の間隔
+DEFAULT_FULL_RECONCILE_HOURS = 24
+
+# 全スレッド同期で同時に処理するスレッド数
+DEFAULT_SYNC_CONCURRENCY = 4
+
+# 変更検出でチャンネル履歴をたどる最大ページ数 (1ページ200件)
+CHANNEL_SCAN_MAX_PAGES = 5
+
 
 class ThreadManager:
     """スレッド管理サービス"""
@@ -19,19 +34,42 @@ class ThreadManager:
         self,
         thread_repo: ThreadRepository,
         message_repo: MessageRepository,
-        slack_client: SlackClient
+        slack_client: SlackClient,
+        summary_repo: Optional[SummaryRepository] = None,
+        full_reconcile_hours: int = DEFAULT_FULL_RECONCILE_HOURS,
+        sync_concurrency: int = DEFAULT_SYNC_CONCURRENCY,
+        scheduler: Optional[SyncScheduler] = None
     ):
         self.thread_repo = thread_repo
         self.message_repo = message_repo
         self.slack_client = slack_client
+        self.summary_repo = summary_repo
+        self.full_reconcile_hours = full_reconcile_hours
+        self.sync_concurrency = sync_concurrency
+        self.scheduler = scheduler
+
+    def _annotate_summaries(self, threads: List[Thread]) -> List[Thread]:
+        """要約インデックスから has_daily_summary / has_topic_summary を設定"""
+        if self.summary_repo is None:
+            return threads
+
+        index = self.summary_repo.get_index()
+        for thread in threads:
+            entry = index.get(thread.id)
+            thread.has_daily_summary = bool(entry and entry["has_daily_summary"])
+            thread.has_topic_summary = bool(entry and entry["has_topic_summary"])
+        return threads
 
     def get_all_threads(self) -> List[Thread]:
         """全スレッドを取得"""
-        return self.thread_repo.get_all()
+        return self._annotate_summaries(self.thread_repo.get_all())
 
     def get_thread_by_id(self, thread_id: str) -> Optional[Thread]:
         """IDでスレッドを取得"""
-        return self.thread_repo.get_by_id(thread_id)
+        thread = self.thread_repo.get_by_id(thread_id)
+        if thread is None:
+            return None
+        return self._annotate_summaries([thread])[0]
 
     def create_thread(self, thread_create: ThreadCreate) -> Thread:
         """新しいスレッドを作成"""
@@ -50,6 +88,10 @@ class ThreadManager:
         # メッセージデータを削除
         self.message_repo.delete(thread_id)
 
+        # 同期スケジュールを削除
+        if self.scheduler is not None:
+            self.scheduler.forget(thread_id)
+
         # スレッド情報を削除
         return self.thread_repo.delete(thread_id)
 
@@ -57,8 +99,40 @@ class ThreadManager:
         """スレッドを既読にする"""
         return self.thread_repo.mark_as_read(thread_id)
 
-    async def sync_thread_messages(self, thread_id: str) -> dict:
-        """スレッドのメッセージをSlackから同期"""
+    def _last_full_sync(self, thread: Thread) -> Optional[datetime]:
+        """最後に全件同期した日時
+
+        変化が無かった全件同期はスレッドを書き込まずにスケジュールへ記録するため、
+        スレッドの last_full_sync_at と新しい方を使う。
+        """
+        synced_at = thread.last_full_sync_at
+        if self.scheduler is not None:
+            recorded = self.scheduler.get_last_full_sync(thread.id)
+            if recorded is not None and (synced_at is None or recorded > synced_at):
+                synced_at = recorded
+        return synced_at
+
+    def _needs_full_sync(self, thread: Thread) -> bool:
+        """全件取得で同期すべきか (未取得・前回の全件同期から一定時間経過)"""
+        if self.full_reconcile_hours <= 0:
+            return True
+        last_full_sync_at = self._last_full_sync(thread)
+        if thread.last_message_ts is None or last_full_sync_at is None:
+            return True
+        elapsed = datetime.now() - last_full_sync_at
+        return elapsed >= timedelta(hours=self.full_reconcile_hours)
+
+    async def sync_thread_messages(self, thread_id: str, full: Optional[bool] = None) -> dict:
+        """スレッドのメッセージをSlackから同期
+
+        通常は last_message_ts より新しい返信だけを取得して追記する (差分同期)。
+        full_reconcile_hours ごとに全件を取得し直し、編集・削除・リアクションの
+        変更を反映する (全件同期)。
+
+        Args:
+            thread_id: スレッドID
+            full: True/False で全件/差分を強制する。省略時は自動判定
+        """
         logger.info(f"Syncing messages for thread: {thread_id}")
 
         # スレッド情報を取得
@@ -66,57 +140,271 @@ class ThreadManager:
         if thread is None:
             raise ValueError(f"Thread not found: {thread_id}")
 
-        # 既存のメッセージデータを取得
-        existing_messages = self.message_repo.get_by_thread_id(thread_id)
-        last_ts = thread.last_message_ts if thread.last_message_ts else thread.thread_ts
+        if full is None:
+            full = self._needs_full_sync(thread)
+        elif not full and thread.last_message_ts is None:
+            full = True
 
         try:
-            # Slackからメッセージを取得
-            messages = await self.slack_client.get_thread_messages(
-                thread.channel_id,
-                thread.thread_ts
-            )
-
-            # 新規メッセージをカウント
-            new_messages = [msg for msg in messages if msg.ts > last_ts]
-            new_message_count = len(new_messages)
+            if full:
+                result = await self._sync_full(thread)
+            else:
+                result = await self._sync_incremental(thread)
 
-            # メッセージを保存
-            self.message_repo.create_or_update(
-                thread_id=thread.id,
-                channel_id=thread.channel_id,
-                thread_ts=thread.thread_ts,
-                messages=messages
+            logger.info(
+                f"Synced {result['total_messages']} messages "
+                f"({result['new_messages']} new, {result['mode']}) for thread: {thread_id}"
             )
+            return result
 
-            # スレッドの統計情報を更新
-            latest_ts = messages[-1].ts if messages else thread.thread_ts
-            self.thread_repo.update_message_stats(
-                thread_id=thread.id,
-                message_count=len(messages),
-                new_message_count=new_message_count,
-                last_message_ts=latest_ts
-            )
+        except Exception as e:
+            logger.error(f"Failed to sync thread {thread_id}: {e}")
+            raise
 
-            logger.info(
-                f"Synced {len(messages)} messages "
-                f"({new_message_count} new) for thread: {thread_id}"
-            )
+    async def _sync_full(self, thread: Thread) -> dict:
+        """全件を取得して保存済みメッセージと突き合わせる"""
+        last_ts = thread.last_message_ts if thread.last_message_ts else thread.thread_ts
+        synced_at = datetime.now()
+
+        # Slackからメッセージを取得
+        messages = await self.slack_client.get_thread_messages(
+            thread.channel_id,
+            thread.thread_ts
+        )
 
+        # 前回の全件同期と同じ内容なら、メッセージもスレッド統計も書き込まない
+        # (全件同期の日時はスケジューラがあればそちらに記録する)
+        digest = self._message_digest(messages)
+        if thread.message_digest is not None and digest == thread.message_digest:
+            if self.scheduler is not None:
+                self.scheduler.record(thread, (), full_synced_at=synced_at)
+            else:
+                self.thread_repo.mark_full_synced(thread.id, synced_at)
             return {
-                "thread_id": thread_id,
+                "thread_id": thread.id,
                 "total_messages": len(messages),
-                "new_messages": new_message_count,
+                "new_messages": 0,
+                "mode": "full",
+                "modified": False,
+                "synced_at": synced_at.isoformat()
+            }
+
+        # 新規メッセージをカウント
+        new_messages = [msg for msg in messages if msg.ts > last_ts]
+        new_message_count = len(new_messages)
+        # 新着が無ければ未読件数は既読にするまで残す (差分同期と同じ)
+        stored_new_count = new_message_count or thread.new_message_count
+
+        # メッセージを保存 (編集・削除も反映される)
+        self.message_repo.create_or_update(
+            thread_id=thread.id,
+            channel_id=thread.channel_id,
+            thread_ts=thread.thread_ts,
+            messages=messages
+        )
+
+        # スレッドの統計情報を更新
+        latest_ts = messages[-1].ts if messages else thread.thread_ts
+        self.thread_repo.update_message_stats(
+            thread_id=thread.id,
+            message_count=len(messages),
+            new_message_count=stored_new_count,
+            last_message_ts=latest_ts,
+            last_full_sync_at=synced_at,
+            message_digest=digest
+        )
+        self._record_activity(thread, new_messages)
+
+        return {
+            "thread_id": thread.id,
+            "total_messages": len(messages),
+            "new_messages": new_message_count,
+            "mode": "full",
+            "modified": True,
+            "synced_at": synced_at.isoformat()
+        }
+
+    async def _sync_incremental(self, thread: Thread) -> dict:
+        """last_message_ts より新しい返信だけを取得して追記する"""
+        messages = await self.slack_client.get_thread_messages(
+            thread.channel_id,
+            thread.thread_ts,
+            oldest=thread.last_message_ts
+        )
+
+        self._record_activity(thread, messages)
+
+        # 新着が無ければメッセージもスレッド統計も書き込まない
+        if not messages:
+            return {
+                "thread_id": thread.id,
+                "total_messages": thread.message_count,
+                "new_messages": 0,
+                "mode": "incremental",
+                "modified": False,
                 "synced_at": datetime.now().isoformat()
             }
 
-        except Exception as e:
-            logger.error(f"Failed to sync thread {thread_id}: {e}")
-            raise
+        total_messages = self.message_repo.append_messages(
+            thread_id=thread.id,
+            channel_id=thread.channel_id,
+            thread_ts=thread.thread_ts,
+            messages=messages
+        )
+
+        # 追記した内容は前回のダイジェストと一致しないため、次の全件同期で書き直す
+        self.thread_repo.update_message_stats(
+            thread_id=thread.id,
+            message_count=total_messages,
+            new_message_count=len(messages),
+            last_message_ts=messages[-1].ts,
+            message_digest=None
+        )
 
-    async def sync_all_threads(self) -> dict:
-        """全スレッドを同期（アーカイブ済みは除外）"""
-        logger.info("Syncing all threads")
+        return {
+            "thread_id": thread.id,
+            "total_messages": total_messages,
+            "new_messages": len(messages),
+            "mode": "incremental",
+            "modified": True,
+            "synced_at": datetime.now().isoformat()
+        }
+
+    @staticmethod
+    def _message_digest(messages: List[Message]) -> str:
+        """メッセージ一覧 (ts順) の内容のダイジェスト"""
+        digest = hashlib.sha256()
+        for msg in sorted(messages, key=lambda m: m.ts):
+            digest.update(msg.model_dump_json().encode("utf-8"))
+            digest.update(b"\n")
+        return digest.hexdigest()
+
+    def _record_activity(self, thread: Thread, new_messages: List[Message]) -> None:
+        """新着メッセージをスケジューラに伝え、次回の同期日時を決めさせる"""
+        if self.scheduler is not None:
+            self.scheduler.record(thread, (msg.ts for msg in new_messages))
+
+    def _report_progress(
+        self,
+        job: Optional[SyncJobStatus],
+        thread: Thread,
+        result: Union[dict, Exception]
+    ) -> None:
+        """1スレッド分の同期結果をジョブの進捗に反映"""
+        if job is None:
+            return
+
+        if thread.id in job.current_threads:
+            job.current_threads.remove(thread.id)
+        job.done_threads += 1
+        if isinstance(result, Exception):
+            job.failed += 1
+            job.errors.append({"thread_id": thread.id, "error": str(result)})
+        else:
+            job.synced += 1
+            job.modified += int(result["modified"])
+            job.new_messages_total += result["new_messages"]
+        if job.target_threads:
+            job.progress_percent = job.done_threads / job.target_threads * 100
+        job.updated_at = datetime.now().isoformat()
+
+    async def _sync_threads_concurrently(
+        self,
+        threads: List[Thread],
+        full: Optional[bool] = None,
+        job: Optional[SyncJobStatus] = None
+    ) -> List[Union[dict, Exception, None]]:
+        """最大 sync_concurrency 件ずつ並行して同期する
+
+        1スレッドの失敗は他のスレッドに影響しない。job を渡した場合は
+        進捗を反映し、job.cancel_requested が立った時点で未着手のスレッドを
+        同期せずに終える (実行中のスレッドは最後まで同期する)。
+
+        Returns:
+            threads と同じ順序の同期結果 (失敗したスレッドは例外、取り消したスレッドはNone)
+        """
+        semaphore = asyncio.Semaphore(max(1, self.sync_concurrency))
+
+        async def sync_one(thread: Thread) -> Union[dict, Exception, None]:
+            async with semaphore:
+                if job is not None:
+                    if job.cancel_requested:
+                        return None
+                    job.current_threads.append(thread.id)
+                try:
+                    result = await self.sync_thread_messages(thread.id, full=full)
+                except Exception as e:
+                    logger.error(f"Failed to sync thread {thread.id}: {e}")
+                    result = e
+                self._report_progress(job, thread, result)
+                return result
+
+        return await asyncio.gather(*(sync_one(thread) for thread in threads))
+
+    async def _select_changed_threads(self, threads: List[Thread]) -> List[Thread]:
+        """返信が増えた可能性のあるスレッドだけを選ぶ
+
+        チャンネルごとに conversations.history を1回 (最大 CHANNEL_SCAN_MAX_PAGES
+        ページ) 取得し、親メッセージの latest_reply が保存済みの last_message_ts
+        より新しいスレッドを選ぶ。全件同期の時期が来たスレッド・親メッセージを
+        確認できなかったスレッド・履歴を取得できなかったチャンネルのスレッドは
+        常に選ぶ。
+
+        Returns:
+            threads の順序を保った、同期が必要なスレッド
+        """
+        by_channel: dict = defaultdict(list)
+        for thread in threads:
+            by_channel[thread.channel_id].append(thread)
+
+        selected_ids = set()
+        for channel_id, channel_threads in by_channel.items():
+            to_check = {}
+            for thread in channel_threads:
+                if self._needs_full_sync(thread):
+                    selected_ids.add(thread.id)
+                else:
+                    to_check[thread.thread_ts] = thread
+            if not to_check:
+                continue
+
+            try:
+                latest_replies, _ = await self.slack_client.get_thread_latest_replies(
+                    channel_id, to_check.keys(), max_pages=CHANNEL_SCAN_MAX_PAGES
+                )
+            except Exception as e:
+                logger.warning(f"Failed to scan channel {channel_id}, syncing all its threads: {e}")
+                selected_ids.update(thread.id for thread in to_check.values())
+                continue
+
+            for thread_ts, thread in to_check.items():
+                latest_reply = latest_replies.get(thread_ts)
+                if latest_reply is None or float(latest_reply) > float(thread.last_message_ts):
+                    selected_ids.add(thread.id)
+
+        return [thread for thread in threads if thread.id in selected_ids]
+
+    async def sync_all_threads(
+        self,
+        full: Optional[bool] = None,
+        due_only: bool = False,
+        job: Optional[SyncJobStatus] = None
+    ) -> dict:
+        """全スレッドを同期（アーカイブ済みは除外）
+
+        先にチャンネル履歴で返信の有無を確認し (_select_changed_threads)、
+        変化の無いスレッドは返信を取得しない (skipped)。残りは最大
+        sync_concurrency 件を並行して同期する。Slack APIのレート制限は
+        SlackClient のものを全スレッドで共有する。
+
+        Args:
+            full: True で全スレッドを全件同期する。省略時はスレッドごとに自動判定
+            due_only: True の場合、スケジューラの次回同期日時を過ぎたスレッドだけを
+                同期する (それ以外は deferred)
+            job: 進捗を反映するジョブ。cancel_requested で未着手のスレッドを取り消せる
+                (cancelled)
+        """
+        logger.info("Syncing all threads" + (" (due only)" if due_only else ""))
 
         # アーカイブされていないスレッドのみを取得
         all_threads = self.thread_repo.get_all()
@@ -126,26 +414,63 @@ class ThreadManager:
             "total_threads": len(threads),
             "synced": 0,
             "failed": 0,
+            "skipped": 0,
+            "deferred": 0,
+            "cancelled": 0,
+            "modified": 0,
             "new_messages_total": 0,
             "errors": []
         }
 
-        for thread in threads:
-            try:
-                sync_result = await self.sync_thread_messages(thread.id)
-                results["synced"] += 1
-                results["new_messages_total"] += sync_result["new_messages"]
-            except Exception as e:
+        # スレッドの統計更新は変更のあったものだけを最後にまとめて書き込む
+        # (遅延するのはこのジョブの更新だけで、並行するAPIリクエストの書き込みはすぐ保存される)
+        # Slack APIのリトライ枠は全スレッドで共有する
+        with self.thread_repo.batch(), retry_budget():
+            # ユーザー名簿が古ければ先に一括取得しておく (期限内なら何もしない)
+            await self.slack_client.prefetch_users()
+            candidates = threads
+            if due_only and self.scheduler is not None:
+                candidates = self.scheduler.select_due(threads)
+                results["deferred"] = len(threads) - len(candidates)
+            targets = candidates if full else await self._select_changed_threads(candidates)
+            results["skipped"] = len(candidates) - len(targets)
+
+            # 変化の無かったスレッドも確認済みとしてスケジュールを進める
+            target_ids = {thread.id for thread in targets}
+            for thread in candidates:
+                if thread.id not in target_ids:
+                    self._record_activity(thread, [])
+            if job is not None:
+                job.total_threads = results["total_threads"]
+                job.deferred = results["deferred"]
+                job.skipped = results["skipped"]
+                job.target_threads = len(targets)
+                job.updated_at = datetime.now().isoformat()
+            sync_results = await self._sync_threads_concurrently(targets, full=full, job=job)
+
+        # 削除・アーカイブされたスレッドのスケジュールを片付ける
+        if self.scheduler is not None:
+            self.scheduler.prune(threads)
+
+        # 結果はスレッド一覧の順序で集計する
+        for thread, sync_result in zip(targets, sync_results):
+            if sync_result is None:
+                results["cancelled"] += 1
+            elif isinstance(sync_result, Exception):
                 results["failed"] += 1
                 results["errors"].append({
                     "thread_id": thread.id,
-                    "error": str(e)
+                    "error": str(sync_result)
                 })
-                logger.error(f"Failed to sync thread {thread.id}: {e}")
+            else:
+                results["synced"] += 1
+                results["modified"] += int(sync_result["modified"])
+                results["new_messages_total"] += sync_result["new_messages"]
 
         logger.info(
-            f"Sync completed: {results['synced']} succeeded, "
-            f"{results['failed']} failed"
+            f"Sync completed: {results['synced']} checked ({results['modified']} modified), "
+            f"{results['failed']} failed, {results['skipped']} unchanged, "
+            f"{results['deferred']} not due, {results['cancelled']} cancelled"
         )
         return results
 
@@ -166,23 +491,31 @@ class ThreadManager:
         date_to: Optional[str] = None
     ) -> List[Thread]:
         """スレッドをフィルタリング"""
-        from datetime import datetime
-        threads = self.thread_repo.get_all()
+        from datetime import datetime, timedelta
 
-        # タグフィルタ
-        if tags:
-            threads = [
-                t for t in threads
-                if any(tag in t.tags for tag in tags)
-            ]
-
-        # 既読/未読フィルタ
-        if is_read is not None:
-            threads = [t for t in threads if t.is_read == is_read]
+        # 日付範囲 (updated_atを基準)。終了日は23:59:59まで含める
+        updated_from = None
+        updated_to = None
+        if date_from:
+            try:
+                updated_from = datetime.fromisoformat(date_from.replace('Z', '+00:00')).replace(tzinfo=None)
+            except ValueError:
+                pass  # 不正な日付形式の場合はスキップ
+        if date_to:
+            try:
+                updated_to = datetime.fromisoformat(date_to.replace('Z', '+00:00')).replace(tzinfo=None)
+                updated_to = updated_to + timedelta(days=1, microseconds=-1)
+            except ValueError:
+                pass  # 不正な日付形式の場合はスキップ
 
-        # アーカイブフィルタ
-        if is_archived is not None:
-            threads = [t for t in threads if t.is_archived == is_archived]
+        # タグ・既読・アーカイブ・日付はリポジトリ側のインデックスで絞り込む
+        threads = self.thread_repo.find(
+            tags=tags,
+            is_read=is_read,
+            is_archived=is_archived,
+            updated_from=updated_from,
+            updated_to=updated_to
+        )
 
         # 検索フィルタ (タイトル、要約)
         if search:
@@ -193,31 +526,7 @@ class ThreadManager:
                    search_lower in t.summary.topic.lower()
             ]
 
-        # 日付範囲フィルタ (updated_atを基準)
-        if date_from:
-            try:
-                date_from_dt = datetime.fromisoformat(date_from.replace('Z', '+00:00'))
-                threads = [
-                    t for t in threads
-                    if datetime.fromisoformat(t.updated_at.replace('Z', '+00:00')) >= date_from_dt
-                ]
-            except (ValueError, AttributeError):
-                pass  # 不正な日付形式の場合はスキップ
-
-        if date_to:
-            try:
-                # 終了日は23:59:59まで含める
-                date_to_dt = datetime.fromisoformat(date_to.replace('Z', '+00:00'))
-                from datetime import timedelta
-                date_to_dt = date_to_dt + timedelta(days=1, microseconds=-1)
-                threads = [
-                    t for t in threads
-                    if datetime.fromisoformat(t.updated_at.replace('Z', '+00:00')) <= date_to_dt
-                ]
-            except (ValueError, AttributeError):
-                pass  # 不正な日付形式の場合はスキップ
-
-        return threads
+        return self._annotate_summaries(threads)
 
     def sort_threads(
         self,
@@ -0,0 +1,77 @@
+"""
+レート制限 (TokenBucket) のテスト
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).parent))
+
+import pytest
+
+from services.rate_limiter import TokenBucket
+
+
+class FakeClock:
+    """sleep() で時刻を進める TokenBucket 用の時計 (実際には待たない)"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+        await asyncio.sleep(0)  # 待っている間に他のタスクを動かす
+
+
+def _make_bucket(clock: FakeClock) -> TokenBucket:
+    return TokenBucket(rate_per_minute=600, capacity=1, clock=clock, sleep=clock.sleep)  # 0.1秒に1個
+
+
+def test_acquire_waits_for_refill():
+    """トークンが無い場合は補充されるまで待つ"""
+    async def run():
+        clock = FakeClock()
+        bucket = _make_bucket(clock)
+        first = await bucket.acquire()
+        second = await bucket.acquire()
+        return clock, first, second
+
+    clock, first, second = asyncio.run(run())
+    assert first == 0.0
+    assert second == pytest.approx(0.1)
+    assert clock.sleeps == [pytest.approx(0.1)]
+    assert clock.now == pytest.approx(0.1)
+
+
+def test_defer_while_waiting_is_honoured():
+    """待機中に defer() された場合は延長された時刻まで待つ"""
+    async def run():
+        clock = FakeClock()
+        bucket = _make_bucket(clock)
+        await bucket.acquire()
+
+        waiter = asyncio.create_task(bucket.acquire())
+        await asyncio.sleep(0)  # waiter は補充まで0.1秒の待機に入る
+
+        deferred_at = clock.now
+        bucket.defer(0.3)  # 429 の Retry-After 相当
+        waited = await waiter
+        return clock, waited, clock.now - deferred_at
+
+    clock, waited, elapsed = asyncio.run(run())
+    # 最初の0.1秒の待機の後、defer() から0.3秒待ち直す
+    assert clock.sleeps == [pytest.approx(0.1), pytest.approx(0.3)]
+    assert elapsed == pytest.approx(0.3)
+    assert waited == pytest.approx(0.4)
+
+
+if __name__ == "__main__":
+    test_acquire_waits_for_refill()
+    test_defer_while_waiting_is_honoured()
+    print("OK")
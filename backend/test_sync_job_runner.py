@@ -0,0 +1,147 @@
+"""
+全スレッド同期ジョブ (SyncJobRunner / POST /api/sync/all) のテスト
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).parent))
+
+import httpx
+from fastapi import FastAPI
+
+from api import sync
+from services.sync_job_runner import SyncJobRunner
+
+
+class BlockingThreadManager:
+    """release() されるまで終わらない sync_all_threads を持つ ThreadManager の代わり"""
+
+    def __init__(self):
+        self.calls = []
+        self._released = asyncio.Event()
+
+    def release(self):
+        self._released.set()
+
+    async def sync_all_threads(self, full=None, due_only=False, job=None):
+        self.calls.append({"full": full, "due_only": due_only})
+        await self._released.wait()
+        return {"total_threads": 0, "synced": 0}
+
+
+def test_start_reuses_running_job_with_same_options():
+    """同じ条件の開始要求には実行中のジョブを返す"""
+    async def run():
+        manager = BlockingThreadManager()
+        runner = SyncJobRunner()
+        first = runner.start(manager, full=True)
+        second = runner.start(manager, full=True, trigger="scheduled")
+        manager.release()
+        await runner.wait(first.job_id)
+        return manager, first, second
+
+    manager, first, second = asyncio.run(run())
+    assert second.job_id == first.job_id
+    assert len(manager.calls) == 1
+    assert first.status == "completed"
+
+
+def test_start_shares_running_job_that_covers_request():
+    """より広い条件のジョブが実行中なら、狭い要求 (定期同期の due_only) もそれを共有する"""
+    async def run():
+        manager = BlockingThreadManager()
+        runner = SyncJobRunner()
+        manual = runner.start(manager, full=None)
+        scheduled = runner.start(manager, due_only=True, trigger="scheduled")
+        manager.release()
+        await runner.wait(manual.job_id)
+        return manager, manual, scheduled
+
+    manager, manual, scheduled = asyncio.run(run())
+    assert scheduled.job_id == manual.job_id
+    assert manager.calls == [{"full": None, "due_only": False}]
+
+
+def test_start_queues_follow_up_when_running_job_is_narrower():
+    """定期同期 (due_only) の実行中に手動の全スレッド同期を要求すると後続ジョブとして予約される"""
+    async def run():
+        manager = BlockingThreadManager()
+        runner = SyncJobRunner()
+        scheduled = runner.start(manager, due_only=True, trigger="scheduled")
+        manual = runner.start(manager)
+        # 予約済みの後続ジョブは条件を広げて共有する
+        forced = runner.start(manager, full=True)
+        statuses = (scheduled.status, manual.status)
+
+        manager.release()
+        await runner.wait(scheduled.job_id)
+        # 引き継ぎ中に来た要求も後続ジョブを共有する (重ねて実行しない)
+        again = runner.start(manager, full=True)
+        await runner.wait(manual.job_id)
+        return manager, scheduled, manual, forced, again, statuses
+
+    manager, scheduled, manual, forced, again, statuses = asyncio.run(run())
+    assert statuses == ("running", "pending")
+    assert forced.job_id == manual.job_id
+    assert again.job_id == manual.job_id
+    assert manual.status == "completed"
+    assert manager.calls == [
+        {"full": None, "due_only": True},
+        {"full": True, "due_only": False},
+    ]
+
+
+def test_cancel_queued_job_skips_it():
+    """予約中に取り消したジョブは開始しない"""
+    async def run():
+        manager = BlockingThreadManager()
+        runner = SyncJobRunner()
+        scheduled = runner.start(manager, due_only=True, trigger="scheduled")
+        manual = runner.start(manager)
+        runner.cancel(manual.job_id)
+        manager.release()
+        await runner.wait(manual.job_id)
+        return manager, manual
+
+    manager, manual = asyncio.run(run())
+    assert manual.status == "cancelled"
+    assert len(manager.calls) == 1
+
+
+def test_sync_all_api_returns_follow_up_job_during_scheduled_run():
+    """POST /api/sync/all は定期同期 (due_only) の実行中なら後続ジョブを返し、終了後に実行する"""
+    async def run():
+        manager = BlockingThreadManager()
+        runner = SyncJobRunner()
+        sync.set_thread_manager(manager)
+        sync.set_sync_job_runner(runner)
+        app = FastAPI()
+        app.include_router(sync.router)
+
+        scheduled = runner.start(manager, due_only=True, trigger="scheduled")
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            queued = await client.post("/api/sync/all")
+            same = await client.post("/api/sync/all")
+            manager.release()
+            await runner.wait(queued.json()["job_id"])
+            polled = await client.get(f"/api/sync/jobs/{queued.json()['job_id']}")
+        return scheduled, queued, same, polled
+
+    scheduled, queued, same, polled = asyncio.run(run())
+    assert queued.status_code == 200
+    assert queued.json()["status"] == "pending"
+    assert queued.json()["job_id"] != scheduled.job_id
+    assert same.json()["job_id"] == queued.json()["job_id"]
+    assert polled.json()["status"] == "completed"
+
+
+if __name__ == "__main__":
+    test_start_reuses_running_job_with_same_options()
+    test_start_shares_running_job_that_covers_request()
+    test_start_queues_follow_up_when_running_job_is_narrower()
+    test_cancel_queued_job_skips_it()
+    test_sync_all_api_returns_follow_up_job_during_scheduled_run()
+    print("OK")
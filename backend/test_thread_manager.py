@@ -0,0 +1,189 @@
+"""
+スレッド同期 (ThreadManager) の書き込みに関するテスト
+"""
+import asyncio
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).parent))
+
+from models.message import Message
+from models.thread import ThreadCreate
+from repositories.message_repository import MessageRepository
+from repositories.sync_schedule_repository import SyncScheduleRepository
+from repositories.thread_repository import ThreadRepository
+from services.sync_scheduler import SyncScheduler
+from services.thread_manager import ThreadManager
+from utils.file_handler import FileHandler
+
+
+class FakeSlackClient:
+    """毎回同じ返信を返す SlackClient の代わり"""
+
+    def __init__(self, messages):
+        self.messages = messages
+
+    async def prefetch_users(self, force=False):
+        return 0
+
+    async def get_thread_messages(self, channel_id, thread_ts, oldest=None):
+        if oldest is None:
+            return list(self.messages)
+        return [msg for msg in self.messages if msg.ts > oldest]
+
+
+def _make_manager(data_dir: Path, scheduler: bool = True):
+    thread_repo = ThreadRepository(data_dir)
+    thread = thread_repo.create(ThreadCreate(
+        channel_id="C001",
+        thread_ts="1700000000.000100",
+        title="テストスレッド"
+    ))
+    messages = [
+        Message(
+            ts=f"17000000{i:02d}.000100",
+            user="U001",
+            text=f"message {i}",
+            created_at=datetime(2023, 11, 14, 22, 13, i),
+        )
+        for i in range(3)
+    ]
+    manager = ThreadManager(
+        thread_repo=thread_repo,
+        message_repo=MessageRepository(data_dir),
+        slack_client=FakeSlackClient(messages),
+        scheduler=SyncScheduler(SyncScheduleRepository(data_dir)) if scheduler else None,
+    )
+    return manager, thread
+
+
+def _mtimes(data_dir: Path, thread_id: str) -> dict:
+    paths = [
+        data_dir / "threads" / f"{thread_id}.json",
+        data_dir / "messages" / f"{thread_id}_messages.jsonl",
+        data_dir / "messages" / f"{thread_id}_messages.meta.json",
+    ]
+    return {path.name: path.stat().st_mtime_ns for path in paths}
+
+
+def test_unchanged_full_sync_does_not_write_thread_files():
+    """内容が変わらない全件同期ではスレッド・メッセージのファイルを書き込まない"""
+    async def run(data_dir: Path):
+        manager, thread = _make_manager(data_dir)
+        first = await manager.sync_thread_messages(thread.id, full=True)
+        before = _mtimes(data_dir, thread.id)
+        time.sleep(0.01)
+
+        second = await manager.sync_thread_messages(thread.id, full=True)
+        third = await manager.sync_all_threads(full=True)
+        FileHandler.flush_pending_writes()
+        return manager, thread, first, second, third, before
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp)
+        manager, thread, first, second, third, before = asyncio.run(run(data_dir))
+
+        assert first["modified"] is True
+        assert second["modified"] is False
+        assert third["modified"] == 0
+        assert _mtimes(data_dir, thread.id) == before
+
+        # 全件同期の日時はスケジュールに記録され、次回の全件同期の判定に使われる
+        stored = manager.thread_repo.get_by_id(thread.id)
+        recorded = manager.scheduler.get_last_full_sync(thread.id)
+        assert recorded is not None and recorded > stored.last_full_sync_at
+        assert manager._last_full_sync(stored) == recorded
+
+
+def test_unchanged_full_sync_without_scheduler_keeps_updated_at():
+    """スケジューラが無い場合は last_full_sync_at だけを updated_at を変えずに保存する"""
+    async def run(data_dir: Path):
+        manager, thread = _make_manager(data_dir, scheduler=False)
+        await manager.sync_thread_messages(thread.id, full=True)
+        synced = manager.thread_repo.get_by_id(thread.id)
+        result = await manager.sync_all_threads(full=True)
+        return manager, synced, result
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manager, synced, result = asyncio.run(run(Path(tmp)))
+
+        assert result["modified"] == 0
+        stored = ThreadRepository(Path(tmp)).get_by_id(synced.id)
+        assert stored.updated_at == synced.updated_at
+        assert stored.last_full_sync_at > synced.last_full_sync_at
+
+
+def test_sync_without_new_messages_keeps_new_message_count():
+    """新着の無い同期は差分同期・全件同期とも new_message_count を既読にするまで残す"""
+    async def run(data_dir: Path):
+        manager, thread = _make_manager(data_dir)
+        await manager.sync_thread_messages(thread.id, full=True)
+        first = manager.thread_repo.get_by_id(thread.id).new_message_count
+
+        await manager.sync_thread_messages(thread.id, full=False)
+        incremental = manager.thread_repo.get_by_id(thread.id).new_message_count
+
+        # 新着は無いが内容の変わった全件同期 (編集の反映)
+        manager.slack_client.messages[0] = manager.slack_client.messages[0].model_copy(
+            update={"text": "edited"}
+        )
+        result = await manager.sync_thread_messages(thread.id, full=True)
+        full = manager.thread_repo.get_by_id(thread.id).new_message_count
+
+        manager.thread_repo.mark_as_read(thread.id)
+        await manager.sync_thread_messages(thread.id, full=True)
+        return first, incremental, full, result, manager.thread_repo.get_by_id(thread.id)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        first, incremental, full, result, read = asyncio.run(run(Path(tmp)))
+
+        assert first == 2  # 親メッセージは数えない
+        assert incremental == 2
+        assert result["modified"] is True and result["new_messages"] == 0
+        assert full == 2
+        assert read.new_message_count == 0 and read.is_read
+
+
+def test_batch_does_not_defer_concurrent_writes():
+    """同期ジョブの batch() 中でも、他のタスク (APIリクエスト) の統計更新はすぐに保存する"""
+    async def run(data_dir: Path):
+        thread_repo = ThreadRepository(data_dir)
+        job_thread = thread_repo.create(ThreadCreate(channel_id="C001", thread_ts="1.0", title="job"))
+        api_thread = thread_repo.create(ThreadCreate(channel_id="C001", thread_ts="2.0", title="api"))
+        in_batch = asyncio.Event()
+        written = asyncio.Event()
+
+        async def job():
+            with thread_repo.batch():
+                thread_repo.update_message_stats(job_thread.id, 3, 3, "3.0")
+                in_batch.set()
+                await written.wait()
+                return ThreadRepository(data_dir).get_by_id(job_thread.id).message_count
+
+        async def api_request():
+            await in_batch.wait()
+            thread_repo.update_message_stats(api_thread.id, 5, 5, "5.0")
+            written.set()
+
+        deferred_count, _ = await asyncio.gather(job(), api_request())
+        return job_thread, api_thread, deferred_count
+
+    with tempfile.TemporaryDirectory() as tmp:
+        job_thread, api_thread, deferred_count = asyncio.run(run(Path(tmp)))
+
+        stored = ThreadRepository(Path(tmp))
+        assert deferred_count == 0
+        assert stored.get_by_id(api_thread.id).message_count == 5
+        assert stored.get_by_id(job_thread.id).message_count == 3
+
+
+if __name__ == "__main__":
+    test_unchanged_full_sync_does_not_write_thread_files()
+    test_unchanged_full_sync_without_scheduler_keeps_updated_at()
+    test_sync_without_new_messages_keeps_new_message_count()
+    test_batch_does_not_defer_concurrent_writes()
+    print("OK")
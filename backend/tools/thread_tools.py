@@ -2,105 +2,108 @@
 Claude Agent SDK用のツール定義
 スレッドデータの検索・読み込み機能を提供
 """
-import json
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+from models.config import Settings
+from repositories.storage import StorageRepositories, create_repositories
+
+# 依存性注入用 (未設定の場合は設定に従って初回利用時に作成する)
+storage: Optional[StorageRepositories] = None
+
+
+def set_storage(repositories: StorageRepositories):
+    """リポジトリを設定"""
+    global storage
+    storage = repositories
+
+
+def _get_storage() -> StorageRepositories:
+    """リポジトリを取得"""
+    global storage
+    if storage is None:
+        settings = Settings()
+        storage = create_repositories(Path(settings.data_dir), settings.storage_backend)
+    return storage
 
-DATA_DIR = Path("data")
 
 def read_thread_info(thread_id: str) -> Dict[str, Any]:
     """スレッド情報を読み込む"""
-    file_path = DATA_DIR / "threads" / f"{thread_id}.json"
-    if not file_path.exists():
+    thread = _get_storage().thread_repo.get_by_id(thread_id)
+    if thread is None:
         return {"error": "Thread not found"}
 
-    with open(file_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return thread.model_dump(mode="json")
 
 def read_messages(thread_id: str) -> Dict[str, Any]:
     """メッセージデータを読み込む"""
-    file_path = DATA_DIR / "messages" / f"{thread_id}_messages.json"
-    if not file_path.exists():
+    message_list = _get_storage().message_repo.get_by_thread_id(thread_id)
+    if message_list is None:
         return {"error": "Messages not found"}
 
-    with open(file_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return message_list.model_dump(mode="json")
 
 def read_summary(thread_id: str, summary_type: str) -> Dict[str, Any]:
     """要約データを読み込む (daily or topic)"""
-    file_path = DATA_DIR / "summaries" / f"{thread_id}_{summary_type}.json"
-    if not file_path.exists():
+    summary = _get_storage().summary_repo.get(thread_id)
+    if summary is None:
+        return {"error": "Summary not found"}
+
+    if summary_type == "daily":
+        summaries = summary.daily_summaries
+    elif summary_type == "topic":
+        summaries = summary.topic_summaries
+    else:
+        return {"error": f"Unknown summary type: {summary_type}"}
+
+    if not summaries:
         return {"error": "Summary not found"}
 
-    with open(file_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return {
+        "thread_id": summary.thread_id,
+        "summary_type": summary_type,
+        "summaries": [item.model_dump(mode="json") for item in summaries],
+        "last_updated": summary.last_updated.isoformat(),
+    }
 
 def search_threads(keyword: str) -> List[Dict[str, Any]]:
     """キーワードでスレッドを検索"""
-    threads_dir = DATA_DIR / "threads"
+    keyword = keyword.lower()
     results = []
 
-    if not threads_dir.exists():
-        return results
+    for thread in _get_storage().thread_repo.get_all():
+        # タイトル、要約、タグで検索
+        search_text = " ".join([
+            thread.title.lower(),
+            (thread.summary.topic or "").lower(),
+            " ".join(thread.tags).lower()
+        ])
 
-    for thread_file in threads_dir.glob("*.json"):
-        try:
-            with open(thread_file, "r", encoding="utf-8") as f:
-                thread = json.load(f)
-                
-                # タイトル、要約、タグで検索
-                search_text = " ".join([
-                    thread.get("title", "").lower(),
-                    thread.get("summary", {}).get("topic", "").lower(),
-                    " ".join(thread.get("tags", [])).lower()
-                ])
-                
-                if keyword.lower() in search_text:
-                    results.append(thread)
-        except (json.JSONDecodeError, IOError):
-            continue
+        if keyword in search_text:
+            results.append(thread.model_dump(mode="json"))
 
     return results
 
 def list_all_threads() -> List[Dict[str, Any]]:
     """全スレッド一覧を取得"""
-    threads_dir = DATA_DIR / "threads"
-    threads = []
-
-    if not threads_dir.exists():
-        return threads
-
-    for thread_file in threads_dir.glob("*.json"):
-        try:
-            with open(thread_file, "r", encoding="utf-8") as f:
-                threads.append(json.load(f))
-        except (json.JSONDecodeError, IOError):
-            continue
-
-    return threads
+    return [thread.model_dump(mode="json") for thread in _get_storage().thread_repo.get_all()]
 
 def search_messages_content(keyword: str) -> List[Dict[str, Any]]:
     """メッセージ内容をキーワードで検索"""
-    messages_dir = DATA_DIR / "messages"
+    repositories = _get_storage()
+    keyword = keyword.lower()
     results = []
 
-    if not messages_dir.exists():
-        return results
-
-    for message_file in messages_dir.glob("*_messages.json"):
+    for thread in repositories.thread_repo.get_all():
         try:
-            with open(message_file, "r", encoding="utf-8") as f:
-                messages_data = json.load(f)
-                thread_id = message_file.stem.replace("_messages", "")
-                
-                for message in messages_data.get("messages", []):
-                    if keyword.lower() in message.get("text", "").lower():
-                        results.append({
-                            "thread_id": thread_id,
-                            "message": message,
-                            "match_text": message.get("text", "")
-                        })
-        except (json.JSONDecodeError, IOError):
+            for message in repositories.message_repo.iter_messages(thread.id):
+                if keyword in message.text.lower():
+                    results.append({
+                        "thread_id": thread.id,
+                        "message": message.model_dump(mode="json"),
+                        "match_text": message.text
+                    })
+        except (ValueError, IOError):
             continue
 
-    return results
\ No newline at end of file
+    return results
@@ -1,8 +1,171 @@
+import asyncio
+import atexit
 import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Dict, IO, Iterator, Optional, Tuple
 import shutil
-from datetime import datetime
+from datetime import date, datetime
+
+from pydantic import BaseModel
+
+from utils.logger import get_logger
+
+try:
+    import orjson
+except ImportError:  # orjson は任意依存 (pip install orjson で高速化)
+    orjson = None
+
+# 同一パスへの連続した書き込みをまとめる時間窓（秒）
+COALESCE_DELAY_SECONDS = 0.5
+
+logger = get_logger(__name__)
+
+# Trueの場合、機械向けファイルも含め全て整形済み形式で書き込む (デバッグ用)
+_force_pretty = False
+
+
+def _json_default(value: Any) -> Any:
+    """標準のJSONで扱えない値の変換"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    return str(value)
+
+
+def dumps_json(data: Any, pretty: bool = True) -> bytes:
+    """JSONをUTF-8バイト列にシリアライズする
+
+    pydanticモデルは model_dump_json で直接エンコードし、それ以外は
+    orjson があれば orjson、無ければ標準の json を使う。
+    pretty=False の場合は空白なしのコンパクトな出力になる。
+    """
+    pretty = pretty or _force_pretty
+    if isinstance(data, BaseModel):
+        return data.model_dump_json(indent=2 if pretty else None).encode("utf-8")
+
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=_json_default, option=option)
+
+    if pretty:
+        text = json.dumps(data, ensure_ascii=False, indent=2, default=_json_default)
+    else:
+        text = json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=_json_default)
+    return text.encode("utf-8")
+
+
+def loads_json(raw: bytes) -> Any:
+    """JSONをデシリアライズする (整形済み・コンパクトのどちらも読める)"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+class WriteCoalescer:
+    """同一パスへの短時間の連続書き込みを1回のディスク書き込みにまとめる
+
+    イベントループ上から呼ばれた場合は最新のデータだけを保持し、
+    最初の書き込みから delay 秒後にまとめて書き出す。
+    イベントループ外から呼ばれた場合は即座に書き込む。
+    データは予約した時点でシリアライズするため、呼び出し側がその後に
+    dictを変更しても書き込まれる内容は変わらない。書き出しに失敗した
+    データは破棄せずに残し、delay 秒後に再度書き出す。
+    """
+
+    def __init__(self, delay: float = COALESCE_DELAY_SECONDS):
+        self.delay = delay
+        # path -> シリアライズ済みのデータ
+        self._pending: Dict[Path, bytes] = {}
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        file_path: Path,
+        data: Any,
+        pretty: bool = True,
+        delay: Optional[float] = None
+    ) -> None:
+        """書き込みを予約する"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if loop is None:
+            self.discard(file_path)
+            FileHandler._write_json_now(file_path, data, pretty)
+            return
+
+        payload = FileHandler._serialize(file_path, data, pretty)
+        with self._lock:
+            is_first = file_path not in self._pending
+            self._pending[file_path] = payload
+
+        if is_first:
+            loop.call_later(self.delay if delay is None else delay, self.flush, file_path)
+
+    def get_pending(self, file_path: Path) -> Tuple[bool, Any]:
+        """未書き込みのデータを取得 (存在有無, データ)"""
+        with self._lock:
+            payload = self._pending.get(file_path)
+        if payload is None:
+            return False, None
+        return True, loads_json(payload)
+
+    def pending_paths(self) -> list[Path]:
+        """未書き込みのパス一覧を取得"""
+        with self._lock:
+            return list(self._pending)
+
+    def discard(self, file_path: Path) -> None:
+        """未書き込みのデータを破棄"""
+        with self._lock:
+            self._pending.pop(file_path, None)
+
+    def flush(self, file_path: Optional[Path] = None) -> None:
+        """未書き込みのデータを書き出す (file_path省略時は全件)"""
+        with self._lock:
+            if file_path is None:
+                items = list(self._pending.items())
+                self._pending.clear()
+            elif file_path in self._pending:
+                items = [(file_path, self._pending.pop(file_path))]
+            else:
+                items = []
+
+        for path, payload in items:
+            try:
+                FileHandler._write_bytes_now(path, payload)
+            except IOError as e:
+                logger.error(f"{e} (will retry)")
+                self._requeue(path, payload)
+
+    def _requeue(self, file_path: Path, payload: bytes) -> None:
+        """書き出しに失敗したデータを戻し、delay 秒後に再度書き出す
+
+        その間に新しいデータが予約されていればそちらを優先する。
+        """
+        with self._lock:
+            if file_path in self._pending:
+                return
+            self._pending[file_path] = payload
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # イベントループ外 (終了時など) では次の flush に任せる
+        loop.call_later(self.delay, self.flush, file_path)
+
+
+_coalescer = WriteCoalescer()
+atexit.register(_coalescer.flush)
 
 
 class FileHandler:
@@ -15,32 +178,118 @@ class FileHandler:
 
     @staticmethod
     def read_json(file_path: Path) -> Optional[dict]:
-        """JSONファイルを読み込む"""
+        """JSONファイルを読み込む (未書き込みのまとめ書きデータがあればそちらを返す)"""
+        found, pending = _coalescer.get_pending(file_path)
+        if found:
+            return pending
+
         if not file_path.exists():
             return None
 
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                return json.load(f)
+            with open(file_path, "rb") as f:
+                return loads_json(f.read())
         except json.JSONDecodeError as e:
             raise ValueError(f"Invalid JSON in {file_path}: {e}")
         except Exception as e:
             raise IOError(f"Failed to read {file_path}: {e}")
 
     @staticmethod
-    def write_json(file_path: Path, data: Any) -> None:
-        """JSONファイルに書き込む"""
+    @contextmanager
+    def atomic_open(file_path: Path, mode: str = "w") -> Iterator[IO]:
+        """一時ファイルに書き込み、fsync後に os.replace で置き換える
+
+        Args:
+            file_path: 書き込み先
+            mode: "w" (テキスト, UTF-8) または "wb" (バイナリ)
+        """
         FileHandler.ensure_dir(file_path.parent)
+        fd, tmp_name = tempfile.mkstemp(
+            dir=file_path.parent, prefix=f".{file_path.name}.", suffix=".tmp"
+        )
+        try:
+            # mkstemp は 0600 で作成するため、既存ファイルの権限を引き継ぐ
+            try:
+                file_mode = file_path.stat().st_mode & 0o777
+            except FileNotFoundError:
+                file_mode = 0o644
+            os.fchmod(fd, file_mode)
+            encoding = None if "b" in mode else "utf-8"
+            with os.fdopen(fd, mode, encoding=encoding) as f:
+                yield f
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_name, file_path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except FileNotFoundError:
+                pass
+            raise
 
+    @staticmethod
+    def _serialize(file_path: Path, data: Any, pretty: bool = True) -> bytes:
+        """書き込むデータをシリアライズ"""
         try:
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2, default=str)
+            return dumps_json(data, pretty)
         except Exception as e:
             raise IOError(f"Failed to write {file_path}: {e}")
 
+    @staticmethod
+    def _write_bytes_now(file_path: Path, payload: bytes) -> None:
+        """シリアライズ済みのデータをアトミックに書き込む"""
+        try:
+            with FileHandler.atomic_open(file_path, "wb") as f:
+                f.write(payload)
+        except Exception as e:
+            raise IOError(f"Failed to write {file_path}: {e}")
+
+    @staticmethod
+    def _write_json_now(file_path: Path, data: Any, pretty: bool = True) -> None:
+        """JSONファイルをアトミックに書き込む"""
+        FileHandler._write_bytes_now(file_path, FileHandler._serialize(file_path, data, pretty))
+
+    @staticmethod
+    def write_json(
+        file_path: Path,
+        data: Any,
+        coalesce: bool = False,
+        pretty: bool = True,
+        delay: Optional[float] = None
+    ) -> None:
+        """JSONファイルに書き込む
+
+        Args:
+            file_path: 書き込み先
+            data: 書き込むデータ (dict/list または pydanticモデル)
+            coalesce: Trueの場合、短時間の連続書き込みを1回にまとめる
+                      (進捗・状態ファイルなど頻繁に更新されるファイル向け)
+            pretty: Falseの場合はインデントなしのコンパクトな形式で書き込む
+                    (人が直接読まない機械向けファイル向け)
+            delay: coalesce時にまとめる時間窓（秒）。省略時は COALESCE_DELAY_SECONDS
+        """
+        if coalesce:
+            _coalescer.submit(file_path, data, pretty, delay)
+            return
+
+        _coalescer.discard(file_path)
+        FileHandler._write_json_now(file_path, data, pretty)
+
+    @staticmethod
+    def set_pretty_output(enabled: bool) -> None:
+        """機械向けファイルも整形済み形式で書き込むかを設定"""
+        global _force_pretty
+        _force_pretty = enabled
+
+    @staticmethod
+    def flush_pending_writes() -> None:
+        """まとめ書き待ちのデータを全て書き出す (終了時など)"""
+        _coalescer.flush()
+
     @staticmethod
     def delete_file(file_path: Path) -> bool:
         """ファイルを削除する"""
+        _coalescer.discard(file_path)
         if not file_path.exists():
             return False
 
@@ -52,11 +301,15 @@ class FileHandler:
 
     @staticmethod
     def list_files(directory: Path, pattern: str = "*.json") -> list[Path]:
-        """ディレクトリ内のファイル一覧を取得"""
+        """ディレクトリ内のファイル一覧を取得 (まとめ書き待ちのファイルも含む)"""
+        pending = {
+            path for path in _coalescer.pending_paths()
+            if path.parent == directory and path.match(pattern)
+        }
         if not directory.exists():
-            return []
+            return sorted(pending)
 
-        return sorted(directory.glob(pattern))
+        return sorted(set(directory.glob(pattern)) | pending)
 
     @staticmethod
     def backup_file(file_path: Path) -> Optional[Path]:
@@ -7,6 +7,8 @@ import type {
   Message,
   SyncResponse,
   SyncConfig,
+  SyncScheduleEntry,
+  SyncJobStatus,
   ThreadSummary,
   SummaryResponse,
   QueryRequest,
@@ -98,9 +100,28 @@ export const threadsApi = {
     return response.data;
   },
 
-  // 全スレッド同期
-  syncAll: async (): Promise<any> => {
-    const response = await api.post('/api/sync/all');
+  // 全スレッド同期（バックグラウンドジョブを開始。実行中のジョブが兼ねる場合はそのジョブ、
+  // 兼ねない場合はその終了後に始まる後続ジョブ (status: pending) を返す）
+  syncAll: async (): Promise<SyncJobStatus> => {
+    const response = await api.post<SyncJobStatus>('/api/sync/all');
+    return response.data;
+  },
+
+  // 同期ジョブのステータス取得
+  getSyncJob: async (jobId: string): Promise<SyncJobStatus> => {
+    const response = await api.get<SyncJobStatus>(`/api/sync/jobs/${jobId}`);
+    return response.data;
+  },
+
+  // 同期ジョブの取り消し
+  cancelSyncJob: async (jobId: string): Promise<SyncJobStatus> => {
+    const response = await api.post<SyncJobStatus>(`/api/sync/jobs/${jobId}/cancel`);
+    return response.data;
+  },
+
+  // スレッドごとの同期スケジュール
+  getSyncSchedule: async (): Promise<SyncScheduleEntry[]> => {
+    const response = await api.get<SyncScheduleEntry[]>('/api/sync/schedule');
     return response.data;
   },
 
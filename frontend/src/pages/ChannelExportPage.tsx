@@ -514,6 +514,14 @@ function ChannelExportPage() {
         {currentJob?.status === 'running' && (
           <div className="progress-bar-container">
             <p>ダウンロード中... {Math.round(currentJob.progress_percent)}%</p>
+            {currentJob.current_channel_name && (
+              <p className="progress-detail">
+                {currentJob.current_channel_name}
+                {' '}({(currentJob.completed_channels ?? 0) + 1}/{currentJob.total_channels ?? 0}チャンネル,
+                {' '}チャンク {currentJob.chunks_completed ?? 0}/{currentJob.total_chunks ?? 0},
+                {' '}{currentJob.messages_fetched ?? 0}件取得)
+              </p>
+            )}
             <div className="progress-bar">
               <div
                 className="progress-bar-fill"
@@ -10,7 +10,7 @@ import { ViewSelector } from '../components/ViewSelector';
 import { ViewFormModal } from '../components/ViewFormModal';
 import { ViewManagementModal } from '../components/ViewManagementModal';
 import { SlackCredentialsModal } from '../components/SlackCredentialsModal';
-import type { Thread, ViewFilters, ViewSort, ThreadView, SyncConfig } from '../types';
+import type { Thread, ViewFilters, ViewSort, ThreadView, SyncConfig, SyncJobStatus } from '../types';
 import dayjs from 'dayjs';
 import relativeTime from 'dayjs/plugin/relativeTime';
 import 'dayjs/locale/ja';
@@ -64,6 +64,9 @@ export default function ThreadListPage() {
   // 同期設定状態
   const [showSyncSettings, setShowSyncSettings] = useState(false);
 
+  // 全スレッド同期ジョブ
+  const [syncJob, setSyncJob] = useState<SyncJobStatus | null>(null);
+
   // React Query クライアント
   const queryClient = useQueryClient();
 
@@ -154,15 +157,48 @@ export default function ThreadListPage() {
 
   const handleSyncAll = async () => {
     try {
-      await threadsApi.syncAll();
-      refetch();
-      // タグ選択肢も最新にする
-      queryClient.invalidateQueries({ queryKey: ['all-threads-for-tags'] });
+      setSyncJob(await threadsApi.syncAll());
     } catch (err) {
       console.error('Sync failed:', err);
     }
   };
 
+  const handleCancelSync = async () => {
+    if (!syncJob) return;
+    try {
+      setSyncJob(await threadsApi.cancelSyncJob(syncJob.job_id));
+    } catch (err) {
+      console.error('Failed to cancel sync:', err);
+    }
+  };
+
+  // 同期ジョブが実行中・実行待ちの間
+  const syncInProgress = syncJob?.status === 'running' || syncJob?.status === 'pending';
+
+  // 同期ジョブが終わるまで進捗をポーリングし、終わったら一覧を更新する
+  // (定期同期の実行中に開始した場合は、その終了後に始まる後続ジョブを待つ)
+  useEffect(() => {
+    if (!syncJob || !syncInProgress) return;
+
+    const jobId = syncJob.job_id;
+    const interval = setInterval(async () => {
+      try {
+        const job = await threadsApi.getSyncJob(jobId);
+        setSyncJob(job);
+        if (job.status !== 'running' && job.status !== 'pending') {
+          clearInterval(interval);
+          refetch();
+          // タグ選択肢も最新にする
+          queryClient.invalidateQueries({ queryKey: ['all-threads-for-tags'] });
+        }
+      } catch {
+        // ポーリングエラーは無視
+      }
+    }, 2000);
+
+    return () => clearInterval(interval);
+  }, [syncJob?.job_id, syncJob?.status]);
+
   const handleSortChange = (column: string) => {
     if (sortBy === column) {
       // 同じカラムをクリックしたら、順序を反転
@@ -416,9 +452,26 @@ export default function ThreadListPage() {
           <button onClick={handleCreateClick} className="btn btn-primary">
             新規スレッド追加
           </button>
-<button onClick={handleSyncAll} className="btn btn-secondary">
-            全スレッド同期
+<button
+            onClick={handleSyncAll}
+            className="btn btn-secondary"
+            disabled={syncInProgress}
+          >
+            {syncJob?.status === 'running'
+              ? `同期中 ${syncJob.done_threads}/${syncJob.target_threads}`
+              : syncJob?.status === 'pending'
+                ? '同期待ち (定期同期の終了後に開始)'
+                : '全スレッド同期'}
           </button>
+          {syncJob && syncInProgress && (
+            <button
+              onClick={handleCancelSync}
+              className="btn btn-secondary"
+              disabled={syncJob.cancel_requested}
+            >
+              {syncJob.cancel_requested ? '中止しています...' : '同期を中止'}
+            </button>
+          )}
           <button
             onClick={() => setShowSyncSettings(!showSyncSettings)}
             className={`btn btn-secondary ${syncConfig?.auto_sync_enabled ? 'btn-active' : ''}`}
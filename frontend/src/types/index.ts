@@ -12,6 +12,8 @@ export interface Thread {
   last_message_ts: string | null;
   message_count: number;
   new_message_count: number;
+  last_full_sync_at?: string | null;
+  message_digest?: string | null;
   is_read: boolean;
   is_archived: boolean;
   has_daily_summary: boolean;
@@ -94,6 +96,8 @@ export interface SyncResponse {
   thread_id: string;
   total_messages: number;
   new_messages: number;
+  mode?: 'full' | 'incremental';
+  modified?: boolean;
   synced_at: string;
 }
 
@@ -101,6 +105,49 @@ export interface SyncConfig {
   auto_sync_enabled: boolean;
   sync_interval_minutes: number;
   last_sync_at: string | null;
+  full_reconcile_hours?: number;
+  sync_concurrency?: number;
+  adaptive_sync_enabled?: boolean;
+  min_sync_interval_minutes?: number;
+  max_sync_interval_hours?: number;
+}
+
+export interface SyncJobStatus {
+  job_id: string;
+  trigger: 'manual' | 'scheduled';
+  full: boolean | null;
+  due_only: boolean;
+  status: 'pending' | 'running' | 'completed' | 'cancelled' | 'error';
+  started_at: string;
+  completed_at: string | null;
+  updated_at: string | null;
+  cancel_requested: boolean;
+  target_threads: number;
+  done_threads: number;
+  progress_percent: number;
+  current_threads: string[];
+  total_threads: number;
+  synced: number;
+  modified: number;
+  failed: number;
+  skipped: number;
+  deferred: number;
+  cancelled: number;
+  new_messages_total: number;
+  errors: { thread_id: string; error: string }[];
+  error_message: string | null;
+}
+
+export interface SyncScheduleEntry {
+  thread_id: string;
+  title: string;
+  tier: 'new' | 'hot' | 'active' | 'dormant';
+  activity: number;
+  idle_streak: number;
+  interval_minutes: number | null;
+  last_checked_at: string | null;
+  next_due_at: string | null;
+  due: boolean;
 }
 
 // 要約関連の型
@@ -160,6 +207,11 @@ export interface AppConfig {
     auto_sync_enabled: boolean;
     sync_interval_minutes: number;
     last_sync_at: string | null;
+    full_reconcile_hours?: number;
+    sync_concurrency?: number;
+    adaptive_sync_enabled?: boolean;
+    min_sync_interval_minutes?: number;
+    max_sync_interval_hours?: number;
   };
   llm: {
     chatgpt_api_key: string | null;
@@ -254,6 +306,15 @@ export interface DownloadJobStatus {
   channels: ChannelDownloadState[];
   current_channel: string | null;
   progress_percent: number;
+  current_channel_name?: string | null;
+  total_channels?: number;
+  completed_channels?: number;
+  chunks_completed?: number;
+  total_chunks?: number;
+  pages_fetched?: number;
+  messages_fetched?: number;
+  threads_fetched?: number;
+  updated_at?: string | null;
 }
 
 export interface ChannelExportStatus {